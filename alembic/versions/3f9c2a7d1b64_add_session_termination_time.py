@@ -0,0 +1,32 @@
+"""Add session termination time
+
+Revision ID: 3f9c2a7d1b64
+Revises: 76dda91c7bd4
+Create Date: 2026-10-17 11:20:41.512307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d1b64'
+down_revision: Union[str, Sequence[str], None] = '76dda91c7bd4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('session', sa.Column('terminated_at', sa.DateTime(timezone=True), nullable=True))
+    # Sessions terminated before column existed are considered terminated at migration time
+    op.execute("UPDATE session SET terminated_at = now() WHERE is_alive = false")
+    op.create_index('ix_session_terminated_at', 'session', ['terminated_at', 'session_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_session_terminated_at', table_name='session')
+    op.drop_column('session', 'terminated_at')
@@ -0,0 +1,43 @@
+"""Store password hashing settings
+
+Revision ID: 9a41d6e3c8f2
+Revises: 3f9c2a7d1b64
+Create Date: 2026-10-17 14:02:17.904415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a41d6e3c8f2'
+down_revision: Union[str, Sequence[str], None] = '3f9c2a7d1b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Hashes are stored with settings that produced them, existing ones are updated on next login
+    op.alter_column(
+        'credentials',
+        'password',
+        existing_type=sa.String(length=64),
+        type_=sa.String(length=255),
+        existing_nullable=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Previous version verifies hashes with configured settings only, so settings are stripped
+    op.execute("UPDATE credentials SET password = split_part(password, '$', 3) WHERE password LIKE 'pbkdf2\\_%'")
+    op.alter_column(
+        'credentials',
+        'password',
+        existing_type=sa.String(length=255),
+        type_=sa.String(length=64),
+        existing_nullable=True
+    )
@@ -0,0 +1,84 @@
+"""Add indexes for hot lookups
+
+Revision ID: b7e4c1d9a2f5
+Revises: 9a41d6e3c8f2
+Create Date: 2026-10-17 18:41:09.215730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4c1d9a2f5'
+down_revision: Union[str, Sequence[str], None] = '9a41d6e3c8f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so tables stay writable, which can't be done inside transaction.
+    # Index left invalid by interrupted build has to be dropped before retrying
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_session_alive_session_id',
+            'session',
+            ['session_id'],
+            unique=False,
+            postgresql_include=['user_id'],
+            postgresql_where=sa.text('is_alive IS TRUE'),
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.create_index(
+            'ix_assigned_roles_role_id',
+            'assigned_roles',
+            ['role_id', 'user_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.create_index(
+            'ix_roles_permissions_resource_id',
+            'roles_permissions',
+            ['resource_id'],
+            unique=False,
+            postgresql_include=['role_id', 'can_view_resource', 'can_edit_resource'],
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+        op.create_index(
+            'ix_resource_author_id',
+            'resource',
+            ['author_id', 'resource_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_resource_author_id', table_name='resource', postgresql_concurrently=True, if_exists=True)
+        op.drop_index(
+            'ix_roles_permissions_resource_id',
+            table_name='roles_permissions',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+        op.drop_index(
+            'ix_assigned_roles_role_id',
+            table_name='assigned_roles',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
+        op.drop_index(
+            'ix_session_alive_session_id',
+            table_name='session',
+            postgresql_concurrently=True,
+            if_exists=True
+        )
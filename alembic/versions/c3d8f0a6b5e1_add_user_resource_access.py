@@ -0,0 +1,59 @@
+"""Add user resource access
+
+Revision ID: c3d8f0a6b5e1
+Revises: b7e4c1d9a2f5
+Create Date: 2026-10-17 20:12:47.508311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d8f0a6b5e1'
+down_revision: Union[str, Sequence[str], None] = 'b7e4c1d9a2f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_resource_access',
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('resource_id', sa.Integer(), nullable=False),
+        sa.Column('can_view', sa.Boolean(), nullable=False),
+        sa.Column('can_edit', sa.Boolean(), nullable=False),
+        sa.ForeignKeyConstraint(['resource_id'], ['resource.resource_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['user.user_id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'resource_id')
+    )
+    # Access of existing users is filled from authorship and permissions of assigned roles
+    op.execute(
+        """
+        INSERT INTO user_resource_access (user_id, resource_id, can_view, can_edit)
+        SELECT author_id, resource_id, TRUE, TRUE FROM resource
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO user_resource_access (user_id, resource_id, can_view, can_edit)
+        SELECT assigned_roles.user_id,
+               roles_permissions.resource_id,
+               bool_or(roles_permissions.can_view_resource),
+               bool_or(roles_permissions.can_edit_resource)
+        FROM assigned_roles
+        JOIN roles_permissions ON roles_permissions.role_id = assigned_roles.role_id
+        JOIN resource ON resource.resource_id = roles_permissions.resource_id
+        WHERE resource.author_id <> assigned_roles.user_id
+        GROUP BY assigned_roles.user_id, roles_permissions.resource_id
+        HAVING bool_or(roles_permissions.can_view_resource) OR bool_or(roles_permissions.can_edit_resource)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_resource_access')
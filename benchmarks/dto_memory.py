@@ -0,0 +1,105 @@
+"""
+Compares memory, allocations and time of building a page of users as pydantic models,
+as DTOs were before, and as slotted dataclasses, which storage builds now.
+
+Rows are shaped as rows of user details columns, with roles and permissions aggregated as JSON,
+and dataclasses are built from them the same way repository builds them.
+
+Usage: python benchmarks/dto_memory.py --users 1000 --roles 3
+"""
+import argparse
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from demo_api.dto import Role, UserDetailed, UserPermissions
+
+
+class RoleModel(BaseModel):
+    role_id: int
+    role_name: str = Field(min_length=1, max_length=64)
+
+
+class UserPermissionsModel(BaseModel):
+    edit_roles: bool = Field(default=False)
+    view_all_resources: bool = Field(default=False)
+    administrate_users: bool = Field(default=False)
+    administrate_resources: bool = Field(default=False)
+
+
+class UserDetailedModel(BaseModel):
+    user_id: uuid.UUID
+    name: str = Field(min_length=1, max_length=255)
+    surname: str = Field(min_length=1, max_length=255)
+    third_name: Optional[str] = Field(min_length=1, max_length=255)
+    is_active: bool
+    roles: list[RoleModel]
+    user_permissions: UserPermissionsModel
+
+
+def make_rows(users: int, roles: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "user_id": uuid.uuid4(),
+            "name": f"Name {i}",
+            "surname": f"Surname {i}",
+            "third_name": None,
+            "is_active": True,
+            "roles": [{"role_id": role_id, "role_name": f"role {role_id}"} for role_id in range(roles)],
+            "user_permissions": {
+                "edit_roles": False,
+                "view_all_resources": True,
+                "administrate_users": False,
+                "administrate_resources": False
+            }
+        }
+        for i in range(users)
+    ]
+
+
+def build_user(row: dict[str, Any]) -> UserDetailed:
+    return UserDetailed(
+        user_id=row["user_id"],
+        name=row["name"],
+        surname=row["surname"],
+        third_name=row["third_name"],
+        is_active=row["is_active"],
+        roles=[Role(**role) for role in row["roles"]],
+        user_permissions=UserPermissions(**row["user_permissions"])
+    )
+
+
+def measure(name: str, build_page: Callable[[list[dict[str, Any]]], list[Any]], rows: list[dict[str, Any]]) -> None:
+    # Caches filled on first use aren't counted as memory of page
+    build_page(rows[:1])
+    tracemalloc.start()
+    page: list[Any] = build_page(rows)
+    retained, peak = tracemalloc.get_traced_memory()
+    live_blocks: int = len(tracemalloc.take_snapshot().traces)
+    tracemalloc.stop()
+
+    started_at: float = time.perf_counter()
+    build_page(rows)
+    elapsed: float = time.perf_counter() - started_at
+
+    print(
+        f"{name:>12}: {len(page)} users, {retained / 1024:8.1f}KiB retained, {peak / 1024:8.1f}KiB peak, "
+        f"{live_blocks:7d} live blocks, {elapsed * 1000:6.2f}ms"
+    )
+
+
+def main(args: argparse.Namespace) -> None:
+    rows: list[dict[str, Any]] = make_rows(args.users, args.roles)
+
+    measure("pydantic", lambda page_rows: [UserDetailedModel.model_validate(row) for row in page_rows], rows)
+    measure("dataclasses", lambda page_rows: [build_user(row) for row in page_rows], rows)
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--roles", type=int, default=3)
+    main(parser.parse_args())
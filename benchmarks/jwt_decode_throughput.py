@@ -0,0 +1,58 @@
+"""
+Compares session token decoding throughput with per request key derivation
+and with keys prepared once in JWTKeyRing.
+
+Usage: python benchmarks/jwt_decode_throughput.py --tokens 100000
+"""
+import argparse
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import jwt
+
+from demo_api.api.services.jwt_key_ring import JWTKeyRing
+from demo_api.utils.config_schema import AppConfig, load_config
+
+
+def measure(name: str, decode: Callable[[str], dict[str, Any]], token: str, count: int) -> None:
+    started_at: float = time.perf_counter()
+    for _ in range(count):
+        decode(token)
+
+    elapsed: float = time.perf_counter() - started_at
+    print(f"{name:>26}: {count / elapsed:10.0f} tokens/s ({elapsed / count * 1e6:.2f}us per token)")
+
+
+def main(args: argparse.Namespace) -> None:
+    config: AppConfig = load_config(Path(args.config))
+    key_ring: JWTKeyRing = JWTKeyRing.from_config(config.security)
+    token: str = key_ring.encode(
+        {
+            "exp": datetime.now(tz=timezone.utc) + timedelta(hours=1),
+            "user_id": "8c7d43c5-2c30-4bd4-a6a6-4ef7a1b4ffc1",
+            "created_at": datetime.now(tz=timezone.utc).isoformat(),
+            "session_id": "0" * 32,
+            "is_alive": True
+        }
+    )
+
+    def decode_with_derivation(encoded: str) -> dict[str, Any]:
+        payload: dict[str, Any] = jwt.decode(
+            encoded,
+            hashlib.sha256(config.security.jwt_signing_secret.encode("utf-8")).hexdigest(),
+            algorithms=["HS256"]
+        )
+        return payload
+
+    measure("per request key derivation", decode_with_derivation, token, args.tokens)
+    measure("prepared key ring", key_ring.decode, token, args.tokens)
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--config", default="config.toml")
+    main(parser.parse_args())
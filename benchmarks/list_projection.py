@@ -0,0 +1,174 @@
+"""
+Compares throughput of listing resources through ORM entities and through column projection.
+
+ORM path loads resources and permissions of their roles as entities with relationship loading,
+as listings did before, while projection path is the one used by repository, which selects only
+columns of DTO with permissions aggregated by database.
+
+Resources are generated in a transaction, which is rolled back at the end, so the database
+configured for the application is left as it was.
+
+Usage: python benchmarks/list_projection.py --config config.toml --rows 100000 --roles 5 --page-size 100
+"""
+import argparse
+import asyncio
+import secrets
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from demo_api.dto import (
+    CreateRoleRequest,
+    HashingSettings,
+    ResourceDetails,
+    ResourcePermissionsDetails,
+    Role,
+    User,
+    UserPermissions,
+)
+from demo_api.dto.user_registration import UserRegistration
+from demo_api.storage.sqla_implementation.engine import create_database_engine
+from demo_api.storage.sqla_implementation.loading_profiles import RESOURCE_DETAILS_PROFILE
+from demo_api.storage.sqla_implementation.resource_repository_sqla import ResourceRepositorySQLA
+from demo_api.storage.sqla_implementation.roles_repository_sqla import RolesRepositorySQLA
+from demo_api.storage.sqla_implementation.tables import ResourceTable, RolesPermissionsTable
+from demo_api.storage.sqla_implementation.transaction import TransactionSQLA
+from demo_api.storage.sqla_implementation.users_repository_sqla import UsersRepositorySQLA
+from demo_api.utils.config_schema import AppConfig, load_config
+
+
+async def list_resources_orm(
+    transaction: TransactionSQLA, limit: int, after_resource_id: Optional[int]
+) -> list[ResourceDetails]:
+    query = (
+        select(ResourceTable)
+        .options(*RESOURCE_DETAILS_PROFILE)
+        .limit(limit)
+        .order_by(ResourceTable.resource_id.desc())
+    )
+    if after_resource_id is not None:
+        query = query.where(ResourceTable.resource_id < after_resource_id)
+
+    async with transaction as tr:
+        resources: list[ResourceDetails] = [
+            ResourceDetails(
+                resource_id=resource_record.resource_id,
+                author_id=resource_record.author_id,
+                content=resource_record.content,
+                roles_permissions=[
+                    ResourcePermissionsDetails(
+                        role_id=role_permissions.role_id,
+                        role_name=role_permissions.role.role_name,
+                        can_edit_resource=role_permissions.can_edit_resource,
+                        can_view_resource=role_permissions.can_view_resource
+                    )
+                    for role_permissions in resource_record.roles_permissions
+                ]
+            )
+            for resource_record in (await tr.scalars(query)).all()
+        ]
+        # Entities aren't kept between pages, same as in separate requests
+        tr.expunge_all()
+
+    return resources
+
+
+async def measure(
+    list_page: Callable[[int, Optional[int]], Awaitable[list[ResourceDetails]]], rows: int, page_size: int
+) -> float:
+    listed: int = 0
+    after_resource_id: Optional[int] = None
+    started_at: float = time.perf_counter()
+    while listed < rows:
+        page: list[ResourceDetails] = await list_page(page_size, after_resource_id)
+        if not page:
+            break
+
+        listed += len(page)
+        after_resource_id = page[-1].resource_id
+
+    return listed / (time.perf_counter() - started_at)
+
+
+async def main(args: argparse.Namespace) -> None:
+    config: AppConfig = load_config(args.config)
+    engine: AsyncEngine = create_database_engine(config.db_settings)
+    session_maker: async_sessionmaker[AsyncSession] = async_sessionmaker(engine, expire_on_commit=False)
+    transaction: TransactionSQLA = TransactionSQLA(session_maker, commit_on_exit=False)
+    resources_repo: ResourceRepositorySQLA = ResourceRepositorySQLA(transaction)
+    roles_repo: RolesRepositorySQLA = RolesRepositorySQLA(transaction)
+
+    try:
+        author: User = await UsersRepositorySQLA(transaction).register_user(
+            UserRegistration(
+                email=f"projection_{secrets.token_hex(8)}@example.com",
+                name="Projection",
+                surname="Benchmark",
+                third_name=None,
+                password=f"BenchPass1{secrets.token_hex(8)}"
+            ),
+            UserPermissions(),
+            HashingSettings(config.security.password_hash_algorithm, 1000)
+        )
+        roles: list[Role] = [
+            await roles_repo.create_role(CreateRoleRequest(role_name=f"projection_{secrets.token_hex(8)}"))
+            for _ in range(args.roles)
+        ]
+
+        started_at: float = time.perf_counter()
+        async with transaction as tr:
+            numbers = func.generate_series(1, args.rows).column_valued("n")
+            await tr.execute(
+                insert(ResourceTable).from_select(
+                    ["author_id", "content"],
+                    select(literal(author.user_id), func.concat("resource ", numbers))
+                )
+            )
+            newest_id: int = (await tr.scalar(select(func.max(ResourceTable.resource_id)))) or 0
+            for role in roles:
+                await tr.execute(
+                    insert(RolesPermissionsTable).from_select(
+                        ["role_id", "resource_id", "can_view_resource", "can_edit_resource"],
+                        select(
+                            literal(role.role_id),
+                            ResourceTable.resource_id,
+                            literal(True),
+                            literal(False)
+                        ).where(ResourceTable.resource_id > newest_id - args.rows)
+                    )
+                )
+
+        print(
+            f"generated {args.rows} resources with {args.roles} roles permissions each "
+            f"in {time.perf_counter() - started_at:.1f}s"
+        )
+
+        by_orm: float = await measure(
+            lambda limit, after_resource_id: list_resources_orm(transaction, limit, after_resource_id),
+            args.rows,
+            args.page_size
+        )
+        by_projection: float = await measure(
+            lambda limit, after_resource_id: resources_repo.list_resources(limit, 0, after_resource_id),
+            args.rows,
+            args.page_size
+        )
+        print(f"{'orm':>12} {by_orm:>12.0f} rows/s")
+        print(f"{'projection':>12} {by_projection:>12.0f} rows/s")
+
+    finally:
+        await transaction.rollback()
+        await transaction.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=Path, default=Path("config.toml"))
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--roles", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=100)
+    asyncio.run(main(parser.parse_args()))
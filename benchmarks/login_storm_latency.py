@@ -0,0 +1,84 @@
+"""
+Measures latency of regular requests while a burst of logins is being hashed.
+
+Regular requests are simulated by coroutines which only need the event loop for a moment,
+so their latency shows how long the loop was blocked. Compares hashing inline in the loop
+with hashing in a process pool, the same way UsersRepositorySQLA does.
+
+Usage: python benchmarks/login_storm_latency.py --logins 32 --iterations 500000 --workers 4
+"""
+import argparse
+import asyncio
+import secrets
+import statistics
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+from demo_api.dto import HashingSettings
+from demo_api.storage.protocol import UsersRepository
+
+
+async def regular_request(issued_at: float, latencies: list[float]) -> None:
+    await asyncio.sleep(0)
+    latencies.append(time.perf_counter() - issued_at)
+
+
+async def login_inline(settings: HashingSettings) -> None:
+    UsersRepository._hash_password(secrets.token_hex(8), secrets.token_hex(16), settings)
+
+
+async def login_in_executor(settings: HashingSettings, executor: Executor) -> None:
+    await UsersRepository._hash_password_in_executor(
+        secrets.token_hex(8), secrets.token_hex(16), settings, executor
+    )
+
+
+async def run_storm(
+    settings: HashingSettings,
+    logins: int,
+    executor: Executor | None
+) -> list[float]:
+    latencies: list[float] = []
+    if executor is None:
+        storm = [asyncio.create_task(login_inline(settings)) for _ in range(logins)]
+
+    else:
+        storm = [asyncio.create_task(login_in_executor(settings, executor)) for _ in range(logins)]
+
+    while not all(task.done() for task in storm):
+        issued_at: float = time.perf_counter()
+        await asyncio.gather(*(regular_request(issued_at, latencies) for _ in range(10)))
+        await asyncio.sleep(0.001)
+
+    await asyncio.gather(*storm)
+    return latencies
+
+
+def report(name: str, latencies: list[float]) -> None:
+    quantiles: list[float] = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:>14}: requests={len(latencies):>6} "
+        f"p50={quantiles[49] * 1000:8.2f}ms p99={quantiles[98] * 1000:8.2f}ms "
+        f"max={max(latencies) * 1000:8.2f}ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings: HashingSettings = HashingSettings(args.algorithm, args.iterations)
+    report("inline", await run_storm(settings, args.logins, None))
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        # Warm up workers, so process startup is not measured
+        await asyncio.gather(
+            *(login_in_executor(HashingSettings(args.algorithm, 1000), executor) for _ in range(args.workers))
+        )
+        report("process pool", await run_storm(settings, args.logins, executor))
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=500_000)
+    parser.add_argument("--algorithm", default="sha3-256")
+    parser.add_argument("--workers", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,121 @@
+"""
+Measures overhead of collecting metrics on requests to the application.
+
+Same requests of a logged in user are sent to two applications, built from the same config
+with metrics enabled and disabled, in alternating order, so both see the same state of database
+and machine. Application with disabled metrics records nothing: neither requests, nor waits for
+database connections, nor hashing of passwords. Requests are sent in process through ASGI transport,
+without network, which makes overhead of metrics most visible.
+
+Medians across rounds are reported, as well as median of overheads of rounds, where each round
+compares applications, which ran one right after another. Cost of single histogram observation
+is reported as well.
+
+Requires database from config, same as tests.
+
+Usage: python benchmarks/metrics_overhead.py --config tests/test_config.toml --rounds 60 --requests 200
+"""
+import argparse
+import asyncio
+import secrets
+import statistics
+import time
+import timeit
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from demo_api.api.server import setup_app
+from demo_api.utils.config_schema import AppConfig, load_config
+from demo_api.utils.metrics import Histogram
+
+PATHS: tuple[str, ...] = ("/api/users/me", "/api/resources?limit=10")
+
+
+async def make_client(stack: AsyncExitStack, config: AppConfig) -> AsyncClient:
+    app: FastAPI = setup_app(config)
+    await stack.enter_async_context(app.router.lifespan_context(app))
+    return await stack.enter_async_context(AsyncClient(transport=ASGITransport(app), base_url="https://testserver"))
+
+
+async def login(client: AsyncClient, email: str, password: str) -> None:
+    response = await client.post("/api/login", json={"email": email, "password": password})
+    response.raise_for_status()
+
+
+async def requests_per_second(client: AsyncClient, requests: int) -> float:
+    started_at: float = time.perf_counter()
+    for i in range(requests):
+        response = await client.get(PATHS[i % len(PATHS)])
+        response.raise_for_status()
+
+    return requests / (time.perf_counter() - started_at)
+
+
+async def main(args: argparse.Namespace) -> None:
+    enabled_config: AppConfig = load_config(args.config)
+    enabled_config.metrics.enabled = True
+    disabled_config: AppConfig = load_config(args.config)
+    disabled_config.metrics.enabled = False
+
+    email: str = f"metrics_{secrets.token_hex(4)}@example.com"
+    password: str = "MetricsBench12Pass"
+
+    async with AsyncExitStack() as stack:
+        enabled: AsyncClient = await make_client(stack, enabled_config)
+        disabled: AsyncClient = await make_client(stack, disabled_config)
+        response = await enabled.post(
+            "/api/register",
+            json={
+                "email": email, "name": "Metrics", "surname": "Benchmark", "third_name": None,
+                "password": password, "password_again": password
+            }
+        )
+        response.raise_for_status()
+        await login(enabled, email, password)
+        await login(disabled, email, password)
+
+        # Warm up caches and connections of both applications
+        await requests_per_second(enabled, args.requests)
+        await requests_per_second(disabled, args.requests)
+
+        enabled_rates: list[float] = []
+        disabled_rates: list[float] = []
+        for round_number in range(args.rounds):
+            # Order is swapped every round, so neither application benefits from going first
+            if round_number % 2:
+                disabled_rates.append(await requests_per_second(disabled, args.requests))
+                enabled_rates.append(await requests_per_second(enabled, args.requests))
+
+            else:
+                enabled_rates.append(await requests_per_second(enabled, args.requests))
+                disabled_rates.append(await requests_per_second(disabled, args.requests))
+
+    enabled_rate: float = statistics.median(enabled_rates)
+    disabled_rate: float = statistics.median(disabled_rates)
+    round_overheads: list[float] = [
+        disabled / enabled - 1 for disabled, enabled in zip(disabled_rates, enabled_rates)
+    ]
+    print(
+        f"median of {args.rounds} rounds: disabled {disabled_rate:7.1f} req/s, enabled {enabled_rate:7.1f} req/s, "
+        f"overhead {(disabled_rate / enabled_rate - 1) * 100:5.2f}%"
+    )
+    print(
+        f"overhead of rounds: median {statistics.median(round_overheads) * 100:5.2f}%, "
+        f"min {min(round_overheads) * 100:5.2f}%, max {max(round_overheads) * 100:5.2f}%"
+    )
+
+    histogram: Histogram = Histogram((0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+    observations: int = 1_000_000
+    elapsed: float = timeit.timeit(lambda: histogram.observe(0.02), number=observations)
+    print(f"single histogram observation: {elapsed / observations * 1e9:.1f}ns")
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=Path, default=Path("tests/test_config.toml"))
+    parser.add_argument("--rounds", type=int, default=60)
+    parser.add_argument("--requests", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
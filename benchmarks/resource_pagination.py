@@ -0,0 +1,101 @@
+"""
+Compares latency of fetching deep pages of resources by offset and by keyset cursor.
+
+Resources are generated in a transaction, which is rolled back at the end, so the database
+configured for the application is left as it was.
+
+Usage: python benchmarks/resource_pagination.py --config config.toml --rows 10000000 --page-size 100
+"""
+import argparse
+import asyncio
+import secrets
+import statistics
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from demo_api.dto import HashingSettings, User, UserPermissions
+from demo_api.dto.user_registration import UserRegistration
+from demo_api.storage.sqla_implementation.engine import create_database_engine
+from demo_api.storage.sqla_implementation.resource_repository_sqla import ResourceRepositorySQLA
+from demo_api.storage.sqla_implementation.tables import ResourceTable
+from demo_api.storage.sqla_implementation.transaction import TransactionSQLA
+from demo_api.storage.sqla_implementation.users_repository_sqla import UsersRepositorySQLA
+from demo_api.utils.config_schema import AppConfig, load_config
+
+
+async def measure(fetch_page: Callable[[], Awaitable[object]], repeats: int) -> float:
+    latencies: list[float] = []
+    for _ in range(repeats):
+        started_at: float = time.perf_counter()
+        await fetch_page()
+        latencies.append(time.perf_counter() - started_at)
+
+    return statistics.median(latencies)
+
+
+async def main(args: argparse.Namespace) -> None:
+    config: AppConfig = load_config(args.config)
+    engine: AsyncEngine = create_database_engine(config.db_settings)
+    session_maker: async_sessionmaker[AsyncSession] = async_sessionmaker(engine, expire_on_commit=False)
+    transaction: TransactionSQLA = TransactionSQLA(session_maker, commit_on_exit=False)
+    resources_repo: ResourceRepositorySQLA = ResourceRepositorySQLA(transaction)
+
+    try:
+        author: User = await UsersRepositorySQLA(transaction).register_user(
+            UserRegistration(
+                email=f"pagination_{secrets.token_hex(8)}@example.com",
+                name="Pagination",
+                surname="Benchmark",
+                third_name=None,
+                password=f"BenchPass1{secrets.token_hex(8)}"
+            ),
+            UserPermissions(),
+            HashingSettings(config.security.password_hash_algorithm, 1000)
+        )
+
+        started_at: float = time.perf_counter()
+        async with transaction as tr:
+            numbers = func.generate_series(1, args.rows).column_valued("n")
+            await tr.execute(
+                insert(ResourceTable).from_select(
+                    ["author_id", "content"],
+                    select(literal(author.user_id), func.concat("resource ", numbers))
+                )
+            )
+            newest_id: int = (await tr.scalar(select(func.max(ResourceTable.resource_id)))) or 0
+
+        print(f"generated {args.rows} resources in {time.perf_counter() - started_at:.1f}s")
+        print(f"{'page':>10} {'offset':>12} {'keyset':>12}")
+
+        page: int = 1
+        while page * args.page_size <= args.rows:
+            skipped: int = (page - 1) * args.page_size
+            # Generated identifiers are sequential, so last identifier of previous page is known
+            after_resource_id: int = newest_id - skipped + 1
+
+            by_offset: float = await measure(
+                lambda: resources_repo.list_resources(args.page_size, skipped), args.repeats
+            )
+            by_keyset: float = await measure(
+                lambda: resources_repo.list_resources(args.page_size, 0, after_resource_id), args.repeats
+            )
+            print(f"{page:>10} {by_offset * 1000:>10.2f}ms {by_keyset * 1000:>10.2f}ms")
+            page *= 10
+
+    finally:
+        await transaction.rollback()
+        await transaction.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=Path, default=Path("config.toml"))
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,91 @@
+"""
+Compares throughput of encoding responses of hot endpoints through FastAPI response model
+and through DTOResponse.
+
+FastAPI path validates returned DTOs against response model of endpoint and encodes them
+with JSONResponse, as it does for endpoints returning models, while DTOResponse
+serializes DTOs into bytes with pydantic directly.
+
+Usage: python benchmarks/response_encoding.py --page-size 100 --repeats 2000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from demo_api.api.services.dto_response import DTOResponse
+from demo_api.dto import ResourceDetails, ResourcePermissionsDetails, Role, UserDetailed, UserPermissions
+
+
+def make_user() -> UserDetailed:
+    return UserDetailed(
+        user_id=uuid.uuid4(),
+        name="Name",
+        surname="Surname",
+        third_name="Third name",
+        is_active=True,
+        roles=[Role(role_id=role_id, role_name=f"role {role_id}") for role_id in range(3)],
+        user_permissions=UserPermissions()
+    )
+
+
+def make_resource(resource_id: int) -> ResourceDetails:
+    return ResourceDetails(
+        resource_id=resource_id,
+        author_id=uuid.uuid4(),
+        content=f"resource {resource_id}",
+        roles_permissions=[
+            ResourcePermissionsDetails(
+                role_id=role_id, role_name=f"role {role_id}", can_view_resource=True, can_edit_resource=False
+            )
+            for role_id in range(3)
+        ]
+    )
+
+
+def fastapi_encoder(response_model: Any) -> Callable[[Any], Awaitable[bytes]]:
+    route: APIRoute = APIRoute("/", lambda: None, response_model=response_model)
+
+    async def encode(content: Any) -> bytes:
+        return JSONResponse(await serialize_response(field=route.response_field, response_content=content)).body
+
+    return encode
+
+
+async def dto_encoder(content: Any) -> bytes:
+    return DTOResponse(content).body
+
+
+async def measure(encode: Callable[[Any], Awaitable[bytes]], content: Any, repeats: int) -> float:
+    started_at: float = time.perf_counter()
+    for _ in range(repeats):
+        await encode(content)
+
+    return repeats / (time.perf_counter() - started_at)
+
+
+async def main(args: argparse.Namespace) -> None:
+    endpoints: list[tuple[str, Any, Any]] = [
+        ("GET /users/me", UserDetailed, make_user()),
+        ("GET /users", list[UserDetailed], [make_user() for _ in range(args.page_size)]),
+        ("GET /resources", list[ResourceDetails], [make_resource(i) for i in range(args.page_size)]),
+    ]
+
+    print(f"{'endpoint':>16} {'fastapi':>14} {'dto response':>14}")
+    for name, response_model, content in endpoints:
+        assert await fastapi_encoder(response_model)(content) == await dto_encoder(content)
+
+        by_fastapi: float = await measure(fastapi_encoder(response_model), content, args.repeats)
+        by_dto_response: float = await measure(dto_encoder, content, args.repeats)
+        print(f"{name:>16} {by_fastapi:>10.0f} rps {by_dto_response:>10.0f} rps")
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,67 @@
+"""
+Measures memory footprint, filling time and lookup latency of revoked sessions filter,
+as well as its false positive rate, when it holds given amount of terminated sessions.
+
+Usage: python benchmarks/revoked_sessions_filter.py --sessions 10000000 --lookups 1000000
+"""
+import argparse
+import secrets
+import time
+import uuid
+from datetime import datetime, timezone
+
+from demo_api.use_cases import RevokedSessionsFilter
+
+
+def measure_lookups(name: str, revoked_sessions: RevokedSessionsFilter, session_ids: list[str]) -> int:
+    positives: int = 0
+    started_at: float = time.perf_counter()
+    for session_id in session_ids:
+        positives += revoked_sessions.might_be_revoked(session_id)
+
+    elapsed: float = time.perf_counter() - started_at
+    print(f"{name:>18}: {elapsed / len(session_ids) * 1e6:.2f}us per lookup")
+    return positives
+
+
+def main(args: argparse.Namespace) -> None:
+    revoked_sessions: RevokedSessionsFilter = RevokedSessionsFilter.open(
+        f"bench_{uuid.uuid4().hex[:16]}",
+        args.sessions,
+        args.false_positive_rate,
+        604800
+    )
+    try:
+        print(
+            f"shared memory: {revoked_sessions.memory.size / 2 ** 20:.1f}MiB for two generations of "
+            f"{args.sessions} sessions, {revoked_sessions.hash_count} hash functions"
+        )
+
+        terminated_at: datetime = datetime.now(tz=timezone.utc)
+        revoked_ids: list[str] = []
+        started_at: float = time.perf_counter()
+        for _ in range(args.sessions):
+            session_id: str = secrets.token_hex(16)
+            revoked_sessions.add(session_id, terminated_at)
+            if len(revoked_ids) < args.lookups:
+                revoked_ids.append(session_id)
+
+        elapsed: float = time.perf_counter() - started_at
+        print(f"{'fill':>18}: {elapsed:.1f}s ({args.sessions / elapsed:.0f} sessions/s)")
+
+        measure_lookups("revoked session", revoked_sessions, revoked_ids)
+        positives: int = measure_lookups(
+            "alive session", revoked_sessions, [secrets.token_hex(16) for _ in range(args.lookups)]
+        )
+        print(f"{'false positives':>18}: {positives / args.lookups:.4%}")
+
+    finally:
+        revoked_sessions.close()
+
+
+if __name__ == "__main__":
+    parser: argparse.ArgumentParser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=10_000_000)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--false-positive-rate", type=float, default=0.001)
+    main(parser.parse_args())
@@ -2,6 +2,7 @@ import argparse
 from pathlib import Path
 
 from demo_api.fake_data_setup import setup_fake_data
+from demo_api.utils.hashing_calibration import calibrate_hashing
 from demo_api.utils.config_schema import AppConfig, load_config
 from demo_api.api.server import main
 
@@ -16,12 +17,40 @@ parser.add_argument(
     action="store_true",
     dest="create_data"
 )
+parser.add_argument(
+    "--calibrate-hashing",
+    default=False,
+    action="store_true",
+    dest="calibrate_hashing",
+    help="Benchmarks password hashing and reports iterations that hit target latency"
+)
+parser.add_argument(
+    "--target-hash-latency-ms",
+    default=250.0,
+    type=float,
+    dest="target_hash_latency_ms",
+    help="Desired time of hashing one password during calibration"
+)
+parser.add_argument(
+    "--write-config",
+    default=False,
+    action="store_true",
+    dest="write_config",
+    help="Writes calibrated iterations into config.toml"
+)
+
+# Guarded since hashing worker processes may import main module when spawned
+if __name__ == "__main__":
+    config_path: Path = Path("config.toml")
+    config: AppConfig = load_config(config_path)
+    args: argparse.Namespace = parser.parse_args()
+
+    if args.create_data:
+        setup_fake_data(config)
 
-config: AppConfig = load_config(Path("config.toml"))
-args: argparse.Namespace = parser.parse_args()
+    elif args.calibrate_hashing:
+        calibrate_hashing(config, config_path, args.target_hash_latency_ms, args.write_config)
 
-if args.create_data:
-    setup_fake_data(config)
+    else:
+        main(config)
 
-else:
-    main(config)
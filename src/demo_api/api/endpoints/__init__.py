@@ -1,6 +1,7 @@
-from .api_router import api
+from .api_router import api, metrics
 
 
 __all__ = (
     "api",
+    "metrics",
 )
@@ -1,5 +1,10 @@
 from dishka.integrations.fastapi import DishkaRoute
+from fastapi import Depends
 from fastapi.routing import APIRouter
 
+from demo_api.api.services.unit_of_work import commit_unit_of_work
 
-api = APIRouter(prefix="/api", route_class=DishkaRoute)
+
+api = APIRouter(prefix="/api", route_class=DishkaRoute, dependencies=[Depends(commit_unit_of_work)])
+# Metrics are served outside of API prefix, where collectors expect them, and don't touch database
+metrics = APIRouter(route_class=DishkaRoute)
@@ -0,0 +1,60 @@
+from dishka import FromDishka
+from fastapi import Depends, HTTPException
+from typing_extensions import Annotated
+
+from demo_api.api.services import authentication_service
+from demo_api.dto import ResourceAccessCheck, UserDetailed
+from demo_api.storage.exceptions import NotFoundError
+from demo_api.use_cases import ResourceUseCases, UserUseCases
+from .api_router import api
+from .dto import AuthorizationCheckRequest
+from ..services.authentication_service import UserAuthenticatedData
+
+
+@api.post(
+    "/authz/check",
+    description="Checks which of resources user can view or edit, answering many resources at once",
+    tags=["Authorization"],
+    responses={
+        200: {
+            "description": "Resources allowed for each of requested actions"
+        },
+        403: {
+            "description": "User doesn't have permission for checking access of other users"
+        },
+        404: {
+            "description": "User whose access is checked was not found"
+        },
+    }
+)
+async def check_authorization(
+    user_session: Annotated[
+        UserAuthenticatedData,
+        Depends(
+            authentication_service.authenticate_by_session_token
+        )
+    ],
+    resource_use_case: FromDishka[ResourceUseCases],
+    user_use_case: FromDishka[UserUseCases],
+    check_request: AuthorizationCheckRequest
+) -> ResourceAccessCheck:
+    user: UserDetailed = user_session.user
+
+    try:
+        if check_request.user_id is not None and check_request.user_id != user.user_id:
+            # Checked before fetching user, so existence of users isn't revealed
+            resource_use_case.authorize_access_check(user_session.user, check_request.user_id)
+            user = await user_use_case.get_user(check_request.user_id)
+
+        return await resource_use_case.check_resources_access(
+            user_session.user,
+            user,
+            check_request.resource_ids,
+            check_request.actions
+        )
+
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="User can't check access of other users")
+
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail="User not found")
@@ -1,9 +1,20 @@
+from typing import Optional
+
 from dishka import FromDishka
 from fastapi import Depends, HTTPException, Query
 from pydantic import Field
 from typing_extensions import Annotated
 
 from demo_api.api.services import authentication_service
+from demo_api.api.services.dto_response import DTOResponse
+from demo_api.api.services.jwt_key_ring import JWTKeyRing
+from demo_api.api.services.ndjson_stream import NDJSONResponse
+from demo_api.api.services.pagination_cursor import (
+    NEXT_CURSOR_HEADER,
+    ResourcesCursor,
+    decode_cursor,
+    encode_cursor
+)
 from demo_api.dto import Resource, ResourceDetails, ResourcePermissionsUpdate
 from demo_api.storage.exceptions import DataIntegrityError, NotFoundError
 from demo_api.use_cases import ResourceUseCases
@@ -16,9 +27,13 @@ from ..services.authentication_service import UserAuthenticatedData
     "/resources",
     description="Fetches a list of resources",
     tags=["Resources"],
+    response_model=list[ResourceDetails],
     responses={
         200: {
-            "description": "List of all resources"
+            "description": "List of resources, with cursor of next page in X-Next-Cursor header if page is full"
+        },
+        400: {
+            "description": "Pagination cursor is invalid"
         },
         403: {
             "description": "User doesn't have permission for fetching all resources"
@@ -33,28 +48,75 @@ async def get_list_of_resources(
         )
     ],
     resource_use_case: FromDishka[ResourceUseCases],
+    key_ring: FromDishka[JWTKeyRing],
     limit: Annotated[int, Query(ge=1, le=500)] = 100,
     offset: Annotated[int, Query(ge=0)] = 0,
-    list_all: Annotated[bool, Query()] = False
-) -> list[ResourceDetails]:
+    list_all: Annotated[bool, Query()] = False,
+    cursor: Annotated[Optional[str], Query(max_length=1024)] = None
+) -> DTOResponse:
+    resources_cursor: Optional[ResourcesCursor] = decode_cursor(key_ring, ResourcesCursor, cursor)
+    after_resource_id: Optional[int] = (
+        resources_cursor.after_resource_id if resources_cursor is not None else None
+    )
+
     try:
         if list_all:
-            return await resource_use_case.list_all_resources(
+            resources: list[ResourceDetails] = await resource_use_case.list_all_resources(
                 user_session.user,
                 limit,
-                offset
+                offset,
+                after_resource_id
             )
 
         else:
-            return await resource_use_case.list_available_resources(
+            resources = await resource_use_case.list_available_resources(
                 user_session.user,
                 limit,
-                offset
+                offset,
+                after_resource_id
             )
 
     except PermissionError:
         raise HTTPException(status_code=403, detail="User can't view all resources")
 
+    headers: dict[str, str] = {}
+    if len(resources) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            key_ring, ResourcesCursor(after_resource_id=resources[-1].resource_id)
+        )
+
+    return DTOResponse(resources, headers=headers)
+
+
+@api.get(
+    "/resources/export",
+    description="Streams all resources as newline delimited JSON, one resource per line",
+    tags=["Resources"],
+    response_class=NDJSONResponse,
+    responses={
+        200: {
+            "description": "Resources are streamed while they are being fetched"
+        },
+        403: {
+            "description": "User doesn't have permission for fetching all resources"
+        },
+    }
+)
+async def export_resources(
+    user_session: Annotated[
+        UserAuthenticatedData,
+        Depends(
+            authentication_service.authenticate_by_session_token
+        )
+    ],
+    resource_use_case: FromDishka[ResourceUseCases]
+) -> NDJSONResponse:
+    try:
+        return NDJSONResponse(resource_use_case.export_resources(user_session.user))
+
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="User can't view all resources")
+
 
 @api.post(
     "/resources",
@@ -94,6 +156,7 @@ async def create_resource(
     "/resources/{resource_id}",
     description="Fetches specific resource",
     tags=["Resources"],
+    response_model=ResourceDetails,
     responses={
         200: {
             "description": "Resource details found"
@@ -115,11 +178,13 @@ async def get_resource_by_id(
     ],
     resource_use_case: FromDishka[ResourceUseCases],
     resource_id: int,
-) -> ResourceDetails:
+) -> DTOResponse:
     try:
-        return await resource_use_case.get_resource_by_id(
-            user_session.user,
-            resource_id
+        return DTOResponse(
+            await resource_use_case.get_resource_by_id(
+                user_session.user,
+                resource_id
+            )
         )
 
     except PermissionError:
@@ -1,8 +1,12 @@
+from .authorization_check_request import AuthorizationCheckRequest
+from .json_web_key_set import JSONWebKeySet
 from .resource_permissions_modified import ResourcePermissionsModified
 from .user_changed_password import UserChangedPassword
 from .user_terminated import UserTerminated
 
 __all__ = (
+    "AuthorizationCheckRequest",
+    "JSONWebKeySet",
     "ResourcePermissionsModified",
     "UserTerminated",
     "UserChangedPassword"
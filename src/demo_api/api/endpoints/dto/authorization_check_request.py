@@ -0,0 +1,15 @@
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from demo_api.dto import ResourceAction
+
+
+class AuthorizationCheckRequest(BaseModel):
+    user_id: Optional[UUID] = Field(
+        default=None,
+        description="User whose access is checked, if it's not the one owning the session"
+    )
+    resource_ids: list[int] = Field(min_length=1, max_length=1000)
+    actions: list[ResourceAction] = Field(default=["view"], min_length=1, max_length=2)
@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+
+
+class JSONWebKeySet(BaseModel):
+    keys: list[dict[str, str]]
@@ -0,0 +1,24 @@
+from dishka import FromDishka
+from fastapi import Response
+
+from demo_api.api.services.jwt_key_ring import JWTKeyRing
+from .api_router import api
+from .dto import JSONWebKeySet
+
+
+@api.get(
+    "/.well-known/jwks.json",
+    description="Publishes public keys for verifying session tokens signed with EdDSA",
+    tags=["Account management"],
+    responses={
+        200: {
+            "description": "Set of public keys"
+        },
+    }
+)
+async def get_json_web_key_set(
+    key_ring: FromDishka[JWTKeyRing],
+    response: Response
+) -> JSONWebKeySet:
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return JSONWebKeySet(keys=key_ring.public_keys)
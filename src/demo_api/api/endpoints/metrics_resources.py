@@ -0,0 +1,58 @@
+from dishka import FromDishka
+from starlette.responses import PlainTextResponse
+
+from demo_api.api.services.login_admission import LoginAdmissionController, LoginAdmissionStatistics
+from demo_api.storage.sqla_implementation.engine import ConnectionPoolStatistics
+from demo_api.use_cases import SessionCache, SessionCacheStatistics
+from demo_api.utils.metrics import REGISTRY, render_value
+from .api_router import metrics
+
+PROMETHEUS_MEDIA_TYPE: str = "text/plain; version=0.0.4"
+
+
+@metrics.get(
+    "/metrics",
+    description="Reports metrics of current process in Prometheus text format",
+    include_in_schema=False,
+    response_class=PlainTextResponse
+)
+async def get_metrics(
+    pool_statistics: FromDishka[ConnectionPoolStatistics],
+    session_cache: FromDishka[SessionCache],
+    login_admission: FromDishka[LoginAdmissionController]
+) -> PlainTextResponse:
+    cache_statistics: SessionCacheStatistics = session_cache.statistics()
+    admission_statistics: LoginAdmissionStatistics = login_admission.statistics()
+    cache_lookups: int = cache_statistics.hits + cache_statistics.misses
+
+    # Counters kept by components themselves are read when metrics are requested
+    values: list[tuple[str, str, str, float]] = [
+        ("db_pool_size", "gauge", "Connections kept open by database pool", pool_statistics.size),
+        ("db_pool_checked_out", "gauge", "Connections in use", pool_statistics.checked_out),
+        ("db_pool_overflow", "gauge", "Connections opened above pool size", pool_statistics.overflow),
+        ("db_pool_checkouts_total", "counter", "Connections taken from pool", pool_statistics.checkouts),
+        ("db_pool_timeouts_total", "counter", "Connections not received in time", pool_statistics.timeouts),
+        ("session_cache_hits_total", "counter", "Sessions authenticated from cache", cache_statistics.hits),
+        ("session_cache_misses_total", "counter", "Sessions fetched from database", cache_statistics.misses),
+        (
+            "session_cache_hit_ratio", "gauge", "Share of sessions authenticated from cache",
+            cache_statistics.hits / cache_lookups if cache_lookups else 0
+        ),
+        ("session_cache_evictions_total", "counter", "Sessions evicted from full cache", cache_statistics.evictions),
+        ("session_cache_size", "gauge", "Sessions in cache", cache_statistics.size),
+        ("login_admitted_total", "counter", "Logins and registrations admitted", admission_statistics.admitted),
+        (
+            "login_rate_limited_total", "counter", "Logins and registrations rejected by rate limits",
+            admission_statistics.rate_limited
+        ),
+        (
+            "login_rejected_by_full_queue_total", "counter", "Logins and registrations rejected by full queue",
+            admission_statistics.rejected_by_full_queue
+        ),
+        ("login_queue_depth", "gauge", "Logins and registrations waiting for hashing", admission_statistics.queue_depth),
+    ]
+
+    return PlainTextResponse(
+        REGISTRY.render() + "".join(render_value(*value) for value in values),
+        media_type=PROMETHEUS_MEDIA_TYPE
+    )
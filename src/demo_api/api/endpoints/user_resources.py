@@ -1,11 +1,17 @@
+from typing import Optional
 from uuid import UUID
 
 from dishka import FromDishka
-from fastapi import Depends, HTTPException, Query
-from starlette.responses import PlainTextResponse
+from fastapi import Depends, HTTPException, Query, Request
+from starlette.responses import PlainTextResponse, Response
 from typing_extensions import Annotated
 
 from demo_api.api.services import authentication_service
+from demo_api.api.services.dto_response import DTOResponse
+from demo_api.api.services.jwt_key_ring import JWTKeyRing
+from demo_api.api.services.login_admission import LoginAdmissionController
+from demo_api.api.services.ndjson_stream import NDJSONResponse
+from demo_api.api.services.pagination_cursor import NEXT_CURSOR_HEADER, UsersCursor, decode_cursor, encode_cursor
 from demo_api.dto import (
     HashingSettings,
     PasswordUpdate, SessionData,
@@ -27,9 +33,13 @@ from ..services.authentication_service import UserAuthenticatedData
     "/users",
     description="Fetches list of users",
     tags=["Administrative", "User"],
+    response_model=list[UserDetailed],
     responses={
         200: {
-            "description": "Users list fetched"
+            "description": "Users list fetched, with cursor of next page in X-Next-Cursor header if page is full"
+        },
+        400: {
+            "description": "Pagination cursor is invalid"
         },
         403: {
             "description": "User doesn't have permission for viewing all users"
@@ -38,6 +48,7 @@ from ..services.authentication_service import UserAuthenticatedData
 )
 async def get_users(
     user_use_case: FromDishka[UserUseCases],
+    key_ring: FromDishka[JWTKeyRing],
     user_session_data: Annotated[
         UserAuthenticatedData,
         Depends(
@@ -46,13 +57,59 @@ async def get_users(
     ],
     limit: Annotated[int, Query(ge=1, le=1000)] = 100,
     offset: Annotated[int, Query(ge=0)] = 0,
-    include_deactivated: Annotated[bool, Query()] = False
-) -> list[UserDetailed]:
+    include_deactivated: Annotated[bool, Query()] = False,
+    cursor: Annotated[Optional[str], Query(max_length=1024)] = None
+) -> DTOResponse:
+    users_cursor: Optional[UsersCursor] = decode_cursor(key_ring, UsersCursor, cursor)
+
     try:
-        return await user_use_case.list_users(
+        users: list[UserDetailed] = await user_use_case.list_users(
             user_session_data.user,
-            limit, offset, include_deactivated
+            limit, offset, include_deactivated,
+            users_cursor.after_user_id if users_cursor is not None else None
+        )
+
+    except PermissionError:
+        raise HTTPException(
+            status_code=403,
+            detail="User does not have permissions to view all users"
+        )
+
+    headers: dict[str, str] = {}
+    if len(users) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            key_ring, UsersCursor(after_user_id=users[-1].user_id)
+        )
+
+    return DTOResponse(users, headers=headers)
+
+
+@api.get(
+    "/users/export",
+    description="Streams all users as newline delimited JSON, one user per line",
+    tags=["Administrative", "User"],
+    response_class=NDJSONResponse,
+    responses={
+        200: {
+            "description": "Users are streamed while they are being fetched"
+        },
+        403: {
+            "description": "User doesn't have permission for viewing all users"
+        },
+    }
+)
+async def export_users(
+    user_use_case: FromDishka[UserUseCases],
+    user_session_data: Annotated[
+        UserAuthenticatedData,
+        Depends(
+            authentication_service.authenticate_by_session_token
         )
+    ],
+    include_deactivated: Annotated[bool, Query()] = False
+) -> NDJSONResponse:
+    try:
+        return NDJSONResponse(user_use_case.export_users(user_session_data.user, include_deactivated))
 
     except PermissionError:
         raise HTTPException(
@@ -65,6 +122,7 @@ async def get_users(
     "/users/me",
     description="Fetches current user",
     tags=["User"],
+    response_model=UserDetailed,
     responses={
         200: {
             "description": "Users information"
@@ -78,14 +136,15 @@ async def get_current_user(
             authentication_service.authenticate_by_session_token
         )
     ]
-) -> UserDetailed:
-    return user_session_data.user
+) -> DTOResponse:
+    return DTOResponse(user_session_data.user)
 
 
 @api.get(
     "/users/{user_id}",
     description="Fetches user by their ID",
     tags=["User"],
+    response_model=UserDetailed,
     responses={
         200: {
             "description": "Fetched user successfully"
@@ -104,9 +163,9 @@ async def get_user_by_id(
             authentication_service.authenticate_by_session_token
         )
     ]
-) -> UserDetailed:
+) -> DTOResponse:
     try:
-        return await user_use_case.get_user(user_id)
+        return DTOResponse(await user_use_case.get_user(user_id))
 
     except NotFoundError:
         raise HTTPException(
@@ -126,25 +185,35 @@ async def get_user_by_id(
         400: {
             "description": "User provided invalid credentials"
         },
+        429: {
+            "description": "Too many login attempts from client or for email"
+        },
+        503: {
+            "description": "Too many logins are waiting for password verification"
+        },
     }
 )
 async def authenticate_user(
     user_use_case: FromDishka[UserUseCases],
     app_config: FromDishka[AppConfig],
+    key_ring: FromDishka[JWTKeyRing],
     hashing_settings: FromDishka[HashingSettings],
+    login_admission: FromDishka[LoginAdmissionController],
+    request: Request,
     request_body: UserAuthentication
 ) -> PlainTextResponse:
     try:
-        session: SessionData = await user_use_case.login(
-            request_body,
-            hashing_settings
-        )
+        async with login_admission.admit(client_address(request), request_body.email):
+            session: SessionData = await user_use_case.login(
+                request_body,
+                hashing_settings
+            )
 
     except NotFoundError:
         raise HTTPException(status_code=400, detail="Invalid credentials")
 
     response: PlainTextResponse = PlainTextResponse(status_code=200, content="Ok")
-    token, expires_at = authentication_service.encode_user_session_token(app_config, session)
+    token, expires_at = authentication_service.encode_user_session_token(app_config, key_ring, session)
     response.set_cookie(
         "session",
         f"Bearer {token}",
@@ -153,9 +222,77 @@ async def authenticate_user(
         expires=expires_at
     )
 
+    if app_config.security.stateless_access_tokens:
+        set_access_token_cookie(
+            response,
+            app_config,
+            key_ring,
+            UserAuthenticatedData(
+                user=await user_use_case.get_user_by_session(session.session_id),
+                session=session
+            )
+        )
+
+    return response
+
+
+@api.post(
+    "/refresh",
+    description="Issues new short-lived access token for current session",
+    tags=["Account management", "User"],
+    responses={
+        200: {
+            "description": "Access token issued"
+        },
+        400: {
+            "description": "Stateless access tokens are disabled"
+        },
+        401: {
+            "description": "Session is not active anymore"
+        },
+    }
+)
+async def refresh_access_token(
+    app_config: FromDishka[AppConfig],
+    key_ring: FromDishka[JWTKeyRing],
+    user_session_data: Annotated[
+        UserAuthenticatedData,
+        Depends(
+            authentication_service.authenticate_by_refresh_token
+        )
+    ]
+) -> PlainTextResponse:
+    if not app_config.security.stateless_access_tokens:
+        raise HTTPException(status_code=400, detail="Stateless access tokens are disabled")
+
+    response: PlainTextResponse = PlainTextResponse(status_code=200, content="Ok")
+    set_access_token_cookie(response, app_config, key_ring, user_session_data)
+
     return response
 
 
+def client_address(request: Request) -> Optional[str]:
+    return request.client.host if request.client is not None else None
+
+
+def set_access_token_cookie(
+    response: Response,
+    app_config: AppConfig,
+    key_ring: JWTKeyRing,
+    user_session_data: UserAuthenticatedData
+) -> None:
+    token, expires_at = authentication_service.encode_user_access_token(
+        app_config, key_ring, user_session_data
+    )
+    response.set_cookie(
+        "access",
+        f"Bearer {token}",
+        secure=True,
+        httponly=True,
+        expires=expires_at
+    )
+
+
 @api.post(
     "/logout",
     description="Deauthenticates user from system",
@@ -185,6 +322,7 @@ async def logout_user(
         response = PlainTextResponse(status_code=400, content="Session has been terminated before")
 
     response.delete_cookie("session")
+    response.delete_cookie("access")
     return response
 
 
@@ -200,15 +338,24 @@ async def logout_user(
         400: {
             "description": "Users email is already used"
         },
+        429: {
+            "description": "Too many registration attempts from client or for email"
+        },
+        503: {
+            "description": "Too many registrations are waiting for password hashing"
+        },
     }
 )
 async def register_user(
     user_use_case: FromDishka[UserUseCases],
     hashing_settings: FromDishka[HashingSettings],
+    login_admission: FromDishka[LoginAdmissionController],
+    request: Request,
     user_data: UserRegistrationForm
 ) -> User:
     try:
-        return await user_use_case.register_user(user_data, hashing_settings)
+        async with login_admission.admit(client_address(request), user_data.email):
+            return await user_use_case.register_user(user_data, hashing_settings)
 
     except DataIntegrityError:
         raise HTTPException(status_code=400, detail="User with provided email is already registered")
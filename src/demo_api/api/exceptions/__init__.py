@@ -1,7 +1,13 @@
+from .bad_pagination_cursor import BadPaginationCursor
 from .bad_token_payload import BadTokenPayload
+from .hashing_queue_full import HashingQueueFull
+from .too_many_requests import TooManyRequests
 from .unauthorized_resource_access import UnauthorizedResourceAccess
 
 __all__ = (
+    "BadPaginationCursor",
     "BadTokenPayload",
+    "HashingQueueFull",
+    "TooManyRequests",
     "UnauthorizedResourceAccess",
 )
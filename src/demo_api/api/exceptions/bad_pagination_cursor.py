@@ -0,0 +1,9 @@
+from fastapi import HTTPException
+
+
+class BadPaginationCursor(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            detail="Pagination cursor is invalid",
+            status_code=400
+        )
@@ -0,0 +1,10 @@
+from fastapi import HTTPException
+
+
+class HashingQueueFull(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            detail="Server is busy processing other requests, try again later",
+            status_code=503,
+            headers={"Retry-After": "1"}
+        )
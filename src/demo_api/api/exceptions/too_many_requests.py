@@ -0,0 +1,12 @@
+import math
+
+from fastapi import HTTPException
+
+
+class TooManyRequests(HTTPException):
+    def __init__(self, retry_after_in_seconds: float):
+        super().__init__(
+            detail="Too many attempts, try again later",
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after_in_seconds)))}
+        )
@@ -18,3 +18,6 @@ class APIKeyCookie401(APIKeyCookie):
 cookie_scheme: APIKeyCookie = APIKeyCookie401(
     name="session", description="Users session token"
 )
+access_cookie_scheme: APIKeyCookie = APIKeyCookie(
+    name="access", description="Users short-lived access token", auto_error=False
+)
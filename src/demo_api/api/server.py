@@ -1,35 +1,115 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator
+
 import uvicorn
 from dishka import AsyncContainer, make_async_container
 from dishka.integrations.fastapi import setup_dishka
 from fastapi import FastAPI
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 from starlette.middleware.cors import CORSMiddleware
 
 from demo_api.api.endpoints import (
     api,
+    metrics,
     user_resources, # noqa: F401 user for assigning user resource
     business_resources, # noqa: F401 user for assigning business resource
-    roles_resources # noqa: F401 user for assigning roles resource
+    roles_resources, # noqa: F401 user for assigning roles resource
+    keys_resources, # noqa: F401 user for assigning keys resource
+    authorization_resources, # noqa: F401 user for assigning authorization resource
+    metrics_resources # noqa: F401 user for assigning metrics resource
+)
+from demo_api.api.services.app_metrics import (
+    POOL_CHECKOUT_WAIT,
+    MetricsMiddleware,
+    count_request_queries,
+    monitor_event_loop_lag,
 )
+from demo_api.api.services.pagination_cursor import NEXT_CURSOR_HEADER
+from demo_api.storage.sqla_implementation.engine import create_database_engine
+from demo_api.use_cases import UserUseCases
 from demo_api.utils.config_schema import AppConfig
 from demo_api.utils.providers import AppConfigProvider, DatabaseSQLAReposProvider, UseCaseProvider
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+async def refresh_revoked_sessions(container: AsyncContainer, interval_in_seconds: float) -> None:
+    """
+    Periodically fetches terminated sessions into revoked sessions filter shared by workers.
+
+    :param container: Application dependencies container.
+    :param interval_in_seconds: Time between refreshes.
+    :return: Nothing.
+    """
+    while True:
+        try:
+            async with container() as request_container:
+                user_use_case: UserUseCases = await request_container.get(UserUseCases)
+                await user_use_case.refresh_revoked_sessions()
+
+        except Exception:
+            logger.exception("Failed to refresh revoked sessions")
+
+        await asyncio.sleep(interval_in_seconds)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    container: AsyncContainer = app.state.dishka_container
+    app_config: AppConfig = await container.get(AppConfig)
+    refresh_tasks: list[asyncio.Task[None]] = []
+
+    if app_config.security.revoked_sessions_filter_capacity > 0:
+        refresh_tasks.append(
+            asyncio.create_task(
+                refresh_revoked_sessions(
+                    container,
+                    app_config.security.revoked_sessions_refresh_interval_in_seconds
+                )
+            )
+        )
+
+    if app_config.metrics.enabled:
+        refresh_tasks.append(
+            asyncio.create_task(
+                monitor_event_loop_lag(app_config.metrics.event_loop_lag_interval_in_seconds)
+            )
+        )
+
+    yield
+
+    for refresh_task in refresh_tasks:
+        refresh_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await refresh_task
+
+    # Releases application scoped dependencies, such as hashing workers
+    await container.close()
+
+
 def setup_app(config: AppConfig) -> FastAPI:
     app: FastAPI = FastAPI(
         title="Demo API of resource management",
         host=config.host,
-        port=config.port
+        port=config.port,
+        lifespan=lifespan
     )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=config.security.allowed_cors_domains,
         allow_credentials=True,
         allow_methods=["*"],
-        allow_headers=["*"]
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER]
     )
 
-    engine: AsyncEngine = create_async_engine(config.db_settings.connection_string)
+    engine: AsyncEngine = create_database_engine(
+        config.db_settings,
+        checkout_wait=POOL_CHECKOUT_WAIT if config.metrics.enabled else None
+    )
 
     container: AsyncContainer = make_async_container(
         AppConfigProvider(config),
@@ -39,6 +119,12 @@ def setup_app(config: AppConfig) -> FastAPI:
     setup_dishka(container=container, app=app)
     app.include_router(api)
 
+    if config.metrics.enabled:
+        count_request_queries(engine)
+        app.include_router(metrics)
+        # Added last, so it wraps other middlewares and measures them too
+        app.add_middleware(MetricsMiddleware)
+
     return app
 
 
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from contextvars import ContextVar, Token
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from demo_api.storage.protocol import PasswordHashingMetrics
+from demo_api.utils.metrics import REGISTRY, Gauge, Histogram, MetricFamily
+
+# Metrics of storage are passed into engine and repositories only when metrics are enabled
+
+REQUEST_DURATION: MetricFamily[Histogram] = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time of handling HTTP requests, including sending response body",
+    label_names=("method", "route", "status")
+)
+REQUESTS_IN_FLIGHT: Gauge = REGISTRY.gauge(
+    "http_requests_in_flight", "HTTP requests being handled"
+).labels()
+QUERIES_PER_REQUEST: Histogram = REGISTRY.histogram(
+    "db_queries_per_request",
+    "Database statements executed while handling HTTP request",
+    upper_bounds=(0, 1, 2, 3, 5, 8, 13, 21, 34)
+).labels()
+EVENT_LOOP_LAG: Histogram = REGISTRY.histogram(
+    "event_loop_lag_seconds",
+    "Delay of waking up on event loop after sleeping for configured interval",
+    upper_bounds=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+).labels()
+POOL_CHECKOUT_WAIT: Histogram = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds", "Time waited for connection from database pool"
+).labels()
+PASSWORD_HASHING: PasswordHashingMetrics = PasswordHashingMetrics(
+    duration=REGISTRY.histogram(
+        "password_hashing_duration_seconds",
+        "Time of hashing passwords, including waiting for free hashing worker",
+        upper_bounds=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    ).labels(),
+    in_progress=REGISTRY.gauge(
+        "password_hashing_in_progress", "Passwords being hashed or waiting for hashing worker"
+    ).labels()
+)
+
+# Statements of a request are counted into list of single counter, set for task handling request
+_request_queries: ContextVar[Optional[list[int]]] = ContextVar("request_queries", default=None)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status and amount of database statements of HTTP requests.
+
+    Requests are labeled by path template of matched route, so amount of labels doesn't
+    depend on requested paths.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status: int = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+            await send(message)
+
+        queries: list[int] = [0]
+        queries_token: Token[Optional[list[int]]] = _request_queries.set(queries)
+        REQUESTS_IN_FLIGHT.inc()
+        started_at: float = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+
+        finally:
+            duration: float = time.perf_counter() - started_at
+            REQUESTS_IN_FLIGHT.dec()
+            _request_queries.reset(queries_token)
+
+            route: Optional[BaseRoute] = scope.get("route")
+            REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status)
+            ).observe(duration)
+            QUERIES_PER_REQUEST.observe(queries[0])
+
+
+def count_request_queries(engine: AsyncEngine) -> None:
+    """
+    Makes engine count statements executed while handling requests.
+
+    :param engine: Engine of application.
+    :return: Nothing.
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", _count_query)
+
+
+def _count_query(*_: Any) -> None:
+    queries: Optional[list[int]] = _request_queries.get()
+    if queries is not None:
+        queries[0] += 1
+
+
+async def monitor_event_loop_lag(interval_in_seconds: float) -> None:
+    """
+    Periodically measures how late event loop wakes up after sleeping,
+    which shows how long loop is blocked by running code.
+
+    :param interval_in_seconds: Time between measurements.
+    :return: Nothing.
+    """
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    while True:
+        started_at: float = loop.time()
+        await asyncio.sleep(interval_in_seconds)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - started_at - interval_in_seconds))
@@ -1,6 +1,5 @@
-import hashlib
-
 from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
 
 import jwt
 from dishka import FromDishka
@@ -10,7 +9,8 @@ from pydantic import BaseModel, ValidationError
 from typing_extensions import Any
 
 from demo_api.api.exceptions import BadTokenPayload
-from demo_api.api.security_definition import cookie_scheme
+from demo_api.api.security_definition import access_cookie_scheme, cookie_scheme
+from demo_api.api.services.jwt_key_ring import JWTKeyRing
 from demo_api.dto import SessionData, UserDetailed
 from demo_api.storage.exceptions import NotFoundError
 from demo_api.use_cases import UserUseCases
@@ -22,33 +22,73 @@ class UserAuthenticatedData(BaseModel):
     session: SessionData
 
 
+class AccessTokenPayload(UserAuthenticatedData):
+    typ: Literal["access"]
+
+
 @inject
 async def authenticate_by_session_token(
     app_config: FromDishka[AppConfig],
+    key_ring: FromDishka[JWTKeyRing],
     user_use_case: FromDishka[UserUseCases],
     session_token: str = Depends(cookie_scheme),
+    access_token: Optional[str] = Depends(access_cookie_scheme),
 ) -> UserAuthenticatedData:
     """
     Authenticates user by supplied token.
 
+    If stateless access tokens are enabled and valid access token is supplied,
+    user is authenticated without accessing database, unless its session might have been terminated.
+
     :param app_config: App configuration.
+    :param key_ring: Keys for verifying tokens.
     :param user_use_case: Users use cases.
     :param session_token: Supplied jwt token.
+    :param access_token: Supplied short-lived access token.
     :return: User data and current session.
     """
+    if app_config.security.stateless_access_tokens and access_token is not None:
+        try:
+            payload: AccessTokenPayload = AccessTokenPayload.model_validate(
+                key_ring.decode(access_token.removeprefix("Bearer "))
+            )
+            if not user_use_case.might_be_revoked(payload.session.session_id):
+                return UserAuthenticatedData(user=payload.user, session=payload.session)
+
+        except (ValidationError, jwt.InvalidTokenError):
+            # Expired or invalid access token falls back to session verification
+            pass
+
+    return await _authenticate_by_session(key_ring, user_use_case, session_token)
+
+
+@inject
+async def authenticate_by_refresh_token(
+    key_ring: FromDishka[JWTKeyRing],
+    user_use_case: FromDishka[UserUseCases],
+    session_token: str = Depends(cookie_scheme),
+) -> UserAuthenticatedData:
+    """
+    Authenticates user by session token only, checking that session is still alive.
+
+    :param key_ring: Keys for verifying tokens.
+    :param user_use_case: Users use cases.
+    :param session_token: Supplied jwt token.
+    :return: User data and current session.
+    """
+    return await _authenticate_by_session(key_ring, user_use_case, session_token)
+
+
+async def _authenticate_by_session(
+    key_ring: JWTKeyRing,
+    user_use_case: UserUseCases,
+    session_token: str
+) -> UserAuthenticatedData:
     try:
-        payload: dict[str, Any] = jwt.decode(
-            session_token.removeprefix("Bearer "),
-            hashlib.sha256(app_config.security.jwt_signing_secret.encode("utf-8")).hexdigest(),
-            algorithms=["HS256"]
-        )
+        payload: dict[str, Any] = key_ring.decode(session_token.removeprefix("Bearer "))
         session: SessionData = SessionData.model_validate(payload)
 
-    except (
-        ValidationError,
-        jwt.ExpiredSignatureError,
-        jwt.exceptions.InvalidSignatureError
-    ) as err:
+    except (ValidationError, jwt.InvalidTokenError) as err:
         raise BadTokenPayload() from err
 
     try:
@@ -65,12 +105,14 @@ async def authenticate_by_session_token(
 
 def encode_user_session_token(
     app_config: AppConfig,
+    key_ring: JWTKeyRing,
     session_data: SessionData
 ) -> tuple[str, datetime]:
     """
     Encodes session data as JWT token.
 
     :param app_config: Application configuration.
+    :param key_ring: Keys for signing tokens.
     :param session_data: Users token data.
     :return: Encoded token and when it expires.
     """
@@ -78,11 +120,35 @@ def encode_user_session_token(
         seconds=app_config.security.access_token_alive_time_in_seconds
     )
     expires_at: datetime = datetime.now(tz=timezone.utc) + time_alive
-    return jwt.encode(
+    return key_ring.encode(
         {
             "exp": expires_at,
             **session_data.model_dump(mode="json")
-        },
-        hashlib.sha256(app_config.security.jwt_signing_secret.encode("utf-8")).hexdigest(),
-        algorithm="HS256",
+        }
+    ), expires_at
+
+
+def encode_user_access_token(
+    app_config: AppConfig,
+    key_ring: JWTKeyRing,
+    authenticated_data: UserAuthenticatedData
+) -> tuple[str, datetime]:
+    """
+    Encodes user permissions, roles and session as short-lived JWT access token.
+
+    :param app_config: Application configuration.
+    :param key_ring: Keys for signing tokens.
+    :param authenticated_data: User and session to embed into token.
+    :return: Encoded token and when it expires.
+    """
+    time_alive: timedelta = timedelta(
+        seconds=app_config.security.stateless_access_token_alive_time_in_seconds
+    )
+    expires_at: datetime = datetime.now(tz=timezone.utc) + time_alive
+    return key_ring.encode(
+        {
+            "exp": expires_at,
+            "typ": "access",
+            **authenticated_data.model_dump(mode="json")
+        }
     ), expires_at
@@ -0,0 +1,26 @@
+from typing import Any, Mapping
+
+from pydantic_core import to_json
+from starlette.responses import Response
+
+
+class DTOResponse(Response):
+    """
+    JSON response of trusted DTOs, which are serialized by pydantic directly into bytes.
+
+    Response returned from endpoint isn't validated against response model nor passed through
+    generic JSON encoder, so it must only carry DTOs built by use cases,
+    and endpoint must declare response model to keep it in API schema.
+    """
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None
+    ):
+        super().__init__(content, status_code, headers)
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
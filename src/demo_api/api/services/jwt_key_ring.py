@@ -0,0 +1,145 @@
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+from jwt.algorithms import OKPAlgorithm
+
+from demo_api.utils.config_schema import DEFAULT_JWT_KEY_ID, JWTSigningKey, Security
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    """
+    Prepared key for signing and verifying tokens.
+    """
+    kid: str
+    algorithm: str
+    signing_key: Any
+    verifying_key: Any
+
+
+class JWTKeyRing:
+    """
+    Keys for signing and verifying session tokens, prepared once on startup.
+
+    Tokens are signed with an active key and verified with any key that is not retired,
+    so secrets can be rotated without terminating existing sessions.
+    Public parts of asymmetric keys are published, so other services can verify tokens locally.
+    """
+
+    def __init__(self, keys: Iterable[JWTKey], active_kid: str):
+        self.keys: dict[str, JWTKey] = {key.kid: key for key in keys}
+        self.active_key: JWTKey = self.keys[active_kid]
+        # Headers of issued tokens are always the same for a key,
+        # so key can be picked without parsing header
+        self._keys_by_header_segment: dict[str, JWTKey] = {
+            self._encode_with(key, {}).partition(".")[0]: key
+            for key in self.keys.values()
+        }
+        self.public_keys: list[dict[str, str]] = [
+            {
+                **OKPAlgorithm.to_jwk(key.verifying_key, as_dict=True),
+                "kid": key.kid,
+                "alg": key.algorithm,
+                "use": "sig"
+            }
+            for key in self.keys.values()
+            if key.algorithm == "EdDSA"
+        ]
+
+    @classmethod
+    def from_config(cls, security: Security) -> "JWTKeyRing":
+        """
+        Builds key ring from security settings.
+
+        :param security: Security settings of application.
+        :return: Key ring with all keys that are not retired.
+        """
+        configured_keys: list[JWTSigningKey] = [
+            JWTSigningKey(kid=DEFAULT_JWT_KEY_ID, secret=security.jwt_signing_secret),
+            *security.jwt_signing_keys
+        ]
+
+        return cls(
+            (
+                cls._prepare_key(key)
+                for key in configured_keys
+                if key.kid not in security.jwt_retired_key_ids
+            ),
+            security.jwt_active_key_id
+        )
+
+    def encode(self, payload: dict[str, Any]) -> str:
+        """
+        Signs payload with active key.
+
+        :param payload: Token claims.
+        :return: Encoded token.
+        """
+        return self._encode_with(self.active_key, payload)
+
+    def decode(self, token: str) -> dict[str, Any]:
+        """
+        Verifies token with key it was signed with.
+
+        Tokens without key ID are verified with the default key.
+
+        :param token: Encoded token.
+        :return: Token claims.
+        :raise jwt.InvalidTokenError: If token is malformed, expired, or signed with unknown key.
+        """
+        key: JWTKey | None = self._keys_by_header_segment.get(token.partition(".")[0])
+        if key is None:
+            kid: Any = jwt.get_unverified_header(token).get("kid", DEFAULT_JWT_KEY_ID)
+            key = self.keys.get(kid) if isinstance(kid, str) else None
+
+        if key is None:
+            raise jwt.InvalidTokenError("Token is signed with unknown key")
+
+        payload: dict[str, Any] = jwt.decode(
+            token,
+            key.verifying_key,
+            algorithms=[key.algorithm]
+        )
+        return payload
+
+    @staticmethod
+    def _encode_with(key: JWTKey, payload: dict[str, Any]) -> str:
+        return jwt.encode(
+            payload,
+            key.signing_key,
+            algorithm=key.algorithm,
+            headers={"kid": key.kid}
+        )
+
+    @classmethod
+    def _prepare_key(cls, key: JWTSigningKey) -> JWTKey:
+        if key.algorithm == "EdDSA" and key.private_key_file is not None:
+            return cls._load_ed25519_key(key.kid, key.private_key_file)
+
+        if key.algorithm == "HS256" and key.secret is not None:
+            return cls._derive_hmac_key(key.kid, key.secret)
+
+        raise ValueError(f"JWT key {key.kid!r} has no key material for {key.algorithm}")
+
+    @staticmethod
+    def _derive_hmac_key(kid: str, secret: str) -> JWTKey:
+        key: bytes = hashlib.sha256(secret.encode("utf-8")).hexdigest().encode("utf-8")
+        return JWTKey(kid=kid, algorithm="HS256", signing_key=key, verifying_key=key)
+
+    @staticmethod
+    def _load_ed25519_key(kid: str, private_key_file: Path) -> JWTKey:
+        private_key: Any = load_pem_private_key(private_key_file.read_bytes(), password=None)
+        if not isinstance(private_key, Ed25519PrivateKey):
+            raise ValueError(f"JWT key {kid!r} in {private_key_file} is not an Ed25519 private key")
+
+        return JWTKey(
+            kid=kid,
+            algorithm="EdDSA",
+            signing_key=private_key,
+            verifying_key=private_key.public_key()
+        )
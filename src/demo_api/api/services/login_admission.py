@@ -0,0 +1,184 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Optional
+
+from demo_api.api.exceptions import HashingQueueFull, TooManyRequests
+from demo_api.utils.config_schema import Security
+
+
+@dataclass(frozen=True)
+class LoginAdmissionStatistics:
+    """
+    Snapshot of login admission counters.
+    """
+    admitted: int
+    rate_limited: int
+    rejected_by_full_queue: int
+    queue_depth: int
+    running: int
+    total_wait_time_in_seconds: float
+    max_wait_time_in_seconds: float
+
+
+class TokenBuckets:
+    """
+    Token buckets by key, bounded by amount of tracked keys.
+
+    Least recently used keys are dropped first, which only lets them start with full bucket again.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        burst: int,
+        max_keys: int,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate_per_second: float = rate_per_second
+        self.burst: int = burst
+        self.max_keys: int = max_keys
+        self.clock: Callable[[], float] = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def try_acquire(self, key: str) -> float:
+        """
+        Takes one token from bucket of a key.
+
+        :param key: Key to which rate is limited.
+        :return: Zero if token was taken, otherwise seconds until token is available.
+        """
+        now: float = self.clock()
+        tokens, updated_at = self._buckets.pop(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated_at) * self.rate_per_second)
+
+        retry_after: float = 0.0
+        if tokens >= 1:
+            tokens -= 1
+
+        else:
+            retry_after = (1 - tokens) / self.rate_per_second
+
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return retry_after
+
+
+class LoginAdmissionController:
+    """
+    Admits requests that hash passwords, so bursts of logins can't consume all hashing capacity.
+
+    Attempts are rate limited per client address and per email, and only limited amount of them
+    waits for hashing workers, while others are rejected right away.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        queue_size: int,
+        per_address: TokenBuckets,
+        per_email: TokenBuckets,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.queue_size: int = queue_size
+        self.per_address: TokenBuckets = per_address
+        self.per_email: TokenBuckets = per_email
+        self.clock: Callable[[], float] = clock
+        self._semaphore: asyncio.Semaphore = asyncio.Semaphore(concurrency)
+
+        self.pending: int = 0
+        self.running: int = 0
+        self.admitted: int = 0
+        self.rate_limited: int = 0
+        self.rejected_by_full_queue: int = 0
+        self.total_wait_time_in_seconds: float = 0.0
+        self.max_wait_time_in_seconds: float = 0.0
+
+    @classmethod
+    def from_config(cls, security: Security) -> "LoginAdmissionController":
+        """
+        Builds admission controller from security settings.
+
+        :param security: Security settings of application.
+        :return: Admission controller running as many hashes as there are hashing workers.
+        """
+        return cls(
+            security.password_hashing_workers,
+            security.login_queue_size,
+            TokenBuckets(
+                security.login_attempts_per_address_per_minute / 60,
+                security.login_attempts_burst_per_address,
+                security.login_rate_limit_tracked_keys
+            ),
+            TokenBuckets(
+                security.login_attempts_per_email_per_minute / 60,
+                security.login_attempts_burst_per_email,
+                security.login_rate_limit_tracked_keys
+            )
+        )
+
+    @asynccontextmanager
+    async def admit(self, client_address: Optional[str], email: str) -> AsyncIterator[None]:
+        """
+        Waits for turn to hash password.
+
+        :param client_address: Address of a client, if known.
+        :param email: Email for which password is hashed.
+        :return: Context in which password may be hashed.
+        :raise TooManyRequests: If client or email has exceeded amount of attempts.
+        :raise HashingQueueFull: If too many requests are already waiting.
+        """
+        retry_after: float = 0.0
+        if client_address is not None:
+            retry_after = self.per_address.try_acquire(client_address)
+
+        # Attempts from limited clients don't use up attempts of email
+        if retry_after == 0:
+            retry_after = self.per_email.try_acquire(email.lower())
+
+        if retry_after > 0:
+            self.rate_limited += 1
+            raise TooManyRequests(retry_after)
+
+        if self.pending - self.running >= self.queue_size:
+            self.rejected_by_full_queue += 1
+            raise HashingQueueFull()
+
+        self.pending += 1
+        enqueued_at: float = self.clock()
+        try:
+            async with self._semaphore:
+                wait_time: float = self.clock() - enqueued_at
+                self.admitted += 1
+                self.total_wait_time_in_seconds += wait_time
+                self.max_wait_time_in_seconds = max(self.max_wait_time_in_seconds, wait_time)
+
+                self.running += 1
+                try:
+                    yield
+
+                finally:
+                    self.running -= 1
+
+        finally:
+            self.pending -= 1
+
+    def statistics(self) -> LoginAdmissionStatistics:
+        """
+        Provides current values of admission counters.
+
+        :return: Counters snapshot.
+        """
+        return LoginAdmissionStatistics(
+            admitted=self.admitted,
+            rate_limited=self.rate_limited,
+            rejected_by_full_queue=self.rejected_by_full_queue,
+            queue_depth=self.pending - self.running,
+            running=self.running,
+            total_wait_time_in_seconds=self.total_wait_time_in_seconds,
+            max_wait_time_in_seconds=self.max_wait_time_in_seconds
+        )
@@ -0,0 +1,24 @@
+from contextlib import aclosing
+from typing import Any, AsyncGenerator, AsyncIterator
+
+from pydantic_core import to_json
+from starlette.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE: str = "application/x-ndjson"
+
+
+class NDJSONResponse(StreamingResponse):
+    """
+    Streams DTOs as newline delimited JSON, one DTO per line, while they are being fetched.
+    """
+    media_type = NDJSON_MEDIA_TYPE
+
+    def __init__(self, dtos: AsyncGenerator[Any, None], status_code: int = 200):
+        super().__init__(self._encode_lines(dtos), status_code)
+
+    @staticmethod
+    async def _encode_lines(dtos: AsyncGenerator[Any, None]) -> AsyncIterator[bytes]:
+        # Generator is closed even if client disconnects, so database cursor isn't left open
+        async with aclosing(dtos):
+            async for dto in dtos:
+                yield to_json(dto) + b"\n"
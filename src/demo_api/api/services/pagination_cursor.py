@@ -0,0 +1,54 @@
+from typing import Literal, Optional, TypeVar
+from uuid import UUID
+
+import jwt
+from pydantic import BaseModel, ValidationError
+
+from demo_api.api.exceptions import BadPaginationCursor
+from demo_api.api.services.jwt_key_ring import JWTKeyRing
+
+NEXT_CURSOR_HEADER: str = "X-Next-Cursor"
+
+
+class UsersCursor(BaseModel):
+    typ: Literal["users_cursor"] = "users_cursor"
+    after_user_id: UUID
+
+
+class ResourcesCursor(BaseModel):
+    typ: Literal["resources_cursor"] = "resources_cursor"
+    after_resource_id: int
+
+
+CursorT = TypeVar("CursorT", UsersCursor, ResourcesCursor)
+
+
+def encode_cursor(key_ring: JWTKeyRing, cursor: UsersCursor | ResourcesCursor) -> str:
+    """
+    Signs position in a listing, so clients can't forge it.
+
+    :param key_ring: Keys for signing tokens.
+    :param cursor: Position of last fetched record.
+    :return: Opaque cursor token.
+    """
+    return key_ring.encode(cursor.model_dump(mode="json"))
+
+
+def decode_cursor(key_ring: JWTKeyRing, cursor_type: type[CursorT], token: Optional[str]) -> Optional[CursorT]:
+    """
+    Verifies cursor token and reads position from it.
+
+    :param key_ring: Keys for verifying tokens.
+    :param cursor_type: Kind of cursor expected by listing.
+    :param token: Cursor token provided by client.
+    :return: Position in listing, if token was provided.
+    :raise BadPaginationCursor: If token is not a valid cursor of expected kind.
+    """
+    if token is None:
+        return None
+
+    try:
+        return cursor_type.model_validate(key_ring.decode(token))
+
+    except (ValidationError, jwt.InvalidTokenError) as err:
+        raise BadPaginationCursor() from err
@@ -0,0 +1,31 @@
+from typing import Any, AsyncIterator
+
+from dishka import FromDishka
+from dishka.integrations.fastapi import inject
+from fastapi import Request
+
+from demo_api.storage.protocol import TransactionManager
+
+
+@inject
+async def commit_unit_of_work(
+    transaction: FromDishka[TransactionManager[Any]],
+    request: Request
+) -> AsyncIterator[None]:
+    """
+    Commits changes made by all repositories while handling request, or rolls them back if handling has failed.
+
+    Runs before response is sent, so clients never see changes that are not committed yet.
+
+    :param transaction: Transaction shared by request.
+    :param request: Handled request, which holds container of request dependencies.
+    :return: Nothing.
+    """
+    try:
+        yield
+
+    except Exception:
+        await transaction.rollback()
+        raise
+
+    await transaction.commit()
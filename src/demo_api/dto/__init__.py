@@ -2,6 +2,7 @@ from .create_role_request import CreateRoleRequest
 from .hashing_settings import HashingSettings
 from .password_update import PasswordUpdate
 from .resource import Resource
+from .resource_access_check import ResourceAccessCheck, ResourceAction
 from .resource_details import ResourceDetails
 from .resource_permissions_details import ResourcePermissionsDetails
 from .resource_permissions_update import ResourcePermissionsUpdate
@@ -27,6 +28,8 @@ __all__ = (
     "SessionData",
     "Resource",
     "ResourceDetails",
+    "ResourceAccessCheck",
+    "ResourceAction",
     "ResourcePermissionsUpdate",
     "ResourcePermissionsDetails",
     "HashingSettings",
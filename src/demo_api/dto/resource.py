@@ -1,12 +1,15 @@
+from dataclasses import dataclass
+from typing import Annotated
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import Field
 
 
-class Resource(BaseModel):
+@dataclass(slots=True)
+class Resource:
     """
     Represents resource information.
     """
     resource_id: int
     author_id: UUID
-    content: str = Field(min_length=1, max_length=2048)
+    content: Annotated[str, Field(min_length=1, max_length=2048)]
@@ -0,0 +1,14 @@
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel
+
+ResourceAction = Literal["view", "edit"]
+
+
+class ResourceAccessCheck(BaseModel):
+    """
+    Represents resources, on which user is allowed to perform each of checked actions.
+    """
+    user_id: UUID
+    allowed: dict[ResourceAction, list[int]]
@@ -1,6 +1,9 @@
+from dataclasses import dataclass
+
 from .resource import Resource
 from .resource_permissions_details import ResourcePermissionsDetails
 
 
+@dataclass(slots=True)
 class ResourceDetails(Resource):
     roles_permissions: list[ResourcePermissionsDetails]
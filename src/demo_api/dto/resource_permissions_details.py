@@ -1,6 +1,9 @@
-from .resource_permissions_update import ResourcePermissionsUpdate
+from dataclasses import dataclass
 
 
-class ResourcePermissionsDetails(ResourcePermissionsUpdate):
+@dataclass(slots=True)
+class ResourcePermissionsDetails:
     role_id: int
     role_name: str
+    can_view_resource: bool
+    can_edit_resource: bool
@@ -1,6 +1,10 @@
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
+from typing import Annotated
 
+from pydantic import Field
 
-class Role(BaseModel):
+
+@dataclass(slots=True)
+class Role:
     role_id: int
-    role_name: str = Field(min_length=1, max_length=64)
+    role_name: Annotated[str, Field(min_length=1, max_length=64)]
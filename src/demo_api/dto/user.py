@@ -1,21 +1,17 @@
-from typing import Optional
+from dataclasses import dataclass
+from typing import Annotated, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import Field
 
 
-class User(BaseModel):
+@dataclass(slots=True)
+class User:
     """
     Represents user information.
     """
     user_id: UUID
-    name: str = Field(
-        min_length=1, max_length=255, description="Users name"
-    )
-    surname: str = Field(
-        min_length=1, max_length=255, description="Users surname"
-    )
-    third_name: Optional[str] = Field(
-        min_length=1, max_length=255, description="Users third name"
-    )
+    name: Annotated[str, Field(min_length=1, max_length=255, description="Users name")]
+    surname: Annotated[str, Field(min_length=1, max_length=255, description="Users surname")]
+    third_name: Annotated[Optional[str], Field(min_length=1, max_length=255, description="Users third name")]
     is_active: bool
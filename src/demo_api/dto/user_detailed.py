@@ -1,8 +1,11 @@
+from dataclasses import dataclass
+
 from .role import Role
 from .user import User
 from .user_permissions import UserPermissions
 
 
+@dataclass(slots=True)
 class UserDetailed(User):
     roles: list[Role]
     user_permissions: UserPermissions
@@ -1,12 +1,12 @@
+from dataclasses import dataclass
 
-from pydantic import BaseModel, Field
 
-
-class UserPermissions(BaseModel):
+@dataclass(slots=True)
+class UserPermissions:
     """
     Represents user permissions information.
     """
-    edit_roles: bool = Field(default=False)
-    view_all_resources: bool = Field(default=False)
-    administrate_users: bool = Field(default=False)
-    administrate_resources: bool = Field(default=False)
+    edit_roles: bool = False
+    view_all_resources: bool = False
+    administrate_users: bool = False
+    administrate_resources: bool = False
@@ -1,10 +1,11 @@
 import asyncio
 
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
 from demo_api.dto import CreateRoleRequest, HashingSettings, Resource, ResourcePermissionsUpdate, User, UserPermissions
 from demo_api.dto.user_registration import UserRegistration
 from demo_api.storage.protocol import ResourceRepository, RolesRepository, UsersRepository
+from demo_api.storage.sqla_implementation.engine import create_database_engine
 from demo_api.storage.sqla_implementation.resource_repository_sqla import ResourceRepositorySQLA
 from demo_api.storage.sqla_implementation.roles_repository_sqla import RolesRepositorySQLA
 from demo_api.storage.sqla_implementation.transaction import TransactionSQLA
@@ -15,10 +16,7 @@ from demo_api.utils.config_schema import AppConfig
 async def _setup_data(
     config: AppConfig
 ) -> None:
-    engine: AsyncEngine = create_async_engine(
-        config.db_settings.connection_string,
-        echo=False
-    )
+    engine: AsyncEngine = create_database_engine(config.db_settings, echo=False)
     session_maker: async_sessionmaker[
         AsyncSession
     ] = async_sessionmaker(
@@ -118,21 +116,25 @@ async def _setup_data(
         roles_user, "Hello to users with role 2!"
     )
 
-    await resources_repo.set_roles_permissions_on_resource(
-        resource_1.resource_id,
-        ResourcePermissionsUpdate(
-            role_id=role_1.role_id,
-            can_edit_resource=False,
-            can_view_resource=True
-        )
-    )
-    await resources_repo.set_roles_permissions_on_resource(
-        resource_2.resource_id,
-        ResourcePermissionsUpdate(
-            role_id=role_2.role_id,
-            can_edit_resource=True,
-            can_view_resource=True
-        )
+    await resources_repo.set_roles_permissions_on_resources(
+        [
+            (
+                resource_1.resource_id,
+                ResourcePermissionsUpdate(
+                    role_id=role_1.role_id,
+                    can_edit_resource=False,
+                    can_view_resource=True
+                )
+            ),
+            (
+                resource_2.resource_id,
+                ResourcePermissionsUpdate(
+                    role_id=role_2.role_id,
+                    can_edit_resource=True,
+                    can_view_resource=True
+                )
+            )
+        ]
     )
 
 
@@ -1,11 +1,12 @@
 from .resource_repository import ResourceRepository
 from .roles_repository import RolesRepository
 from .transaction_manager import TransactionManager
-from .users_repository import UsersRepository
+from .users_repository import PasswordHashingMetrics, UsersRepository
 
 __all__ = (
     "ResourceRepository",
     "RolesRepository",
     "UsersRepository",
+    "PasswordHashingMetrics",
     "TransactionManager"
 )
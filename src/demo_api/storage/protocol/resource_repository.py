@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Protocol, runtime_checkable
+from typing import AsyncGenerator, Optional, Protocol, Sequence, runtime_checkable
 from uuid import UUID
 
 from demo_api.dto import Resource, ResourceDetails, ResourcePermissionsUpdate, User
@@ -29,6 +29,19 @@ class ResourceRepository(Protocol):
         :raise NotFoundError: If resource is not in database.
         """
 
+    @abstractmethod
+    async def edit_resource_if_editable(self, resource_id: int, user_id: UUID, content: str) -> Resource:
+        """
+        Changes resource content, if user is its author or one of users roles allows editing it.
+
+        :param resource_id: ID of a resource to edit.
+        :param user_id: Users identifier.
+        :param content: New content of resource.
+        :return: Updated resource information.
+        :raise NotFoundError: If resource is not in database.
+        :raise PermissionError: If user can't edit this resource.
+        """
+
     @abstractmethod
     async def get_resource_by_id(self, resource_id: int) -> ResourceDetails:
         """
@@ -40,28 +53,86 @@ class ResourceRepository(Protocol):
         """
 
     @abstractmethod
-    async def list_resources(self, limit: int = 100, offset: int = 0) -> list[ResourceDetails]:
+    async def get_resource_if_viewable(self, resource_id: int, user_id: UUID) -> ResourceDetails:
         """
-        Lists resources.
+        Fetches resource by ID, if user is its author or one of users roles allows viewing or editing it.
+
+        :param resource_id: ID of resource to fetch.
+        :param user_id: Users identifier.
+        :return: Resource information.
+        :raise NotFoundError: If resource is not in database.
+        :raise PermissionError: If user can't view this resource.
+        """
+
+    @abstractmethod
+    async def is_resource_author(self, resource_id: int, user_id: UUID) -> bool:
+        """
+        Checks if resource is authored by user.
+
+        :param resource_id: ID of resource.
+        :param user_id: Users identifier.
+        :return: Is user an author of existing resource.
+        """
+
+    @abstractmethod
+    async def list_resources(
+        self, limit: int = 100, offset: int = 0, after_resource_id: Optional[int] = None
+    ) -> list[ResourceDetails]:
+        """
+        Lists resources, newest first.
 
         :param limit: Limits how many records to fetch.
         :param offset: How many records to skip.
+        :param after_resource_id: Fetch only resources older than this one, so pages are fetched by index.
         :return: List of resources with permissions details.
         """
 
+    @abstractmethod
+    def export_resources(self) -> AsyncGenerator[ResourceDetails, None]:
+        """
+        Streams all resources, newest first.
+
+        Resources are fetched from database in batches while iterating,
+        so memory used doesn't depend on amount of resources.
+
+        :return: Generator of resources with permissions details.
+        """
+
     @abstractmethod
     async def list_available_resources(
-        self, user_id: UUID, limit: int = 100, offset: int = 0
+        self, user_id: UUID, limit: int = 100, offset: int = 0, after_resource_id: Optional[int] = None
     ) -> list[ResourceDetails]:
         """
-        Fetches only available resources for specified user.
+        Fetches only available resources for specified user, newest first.
 
         :param user_id: Users identifier.
         :param limit: How many records to fetch.
         :param offset: How many records to skip.
+        :param after_resource_id: Fetch only resources older than this one, so pages are fetched by index.
         :return: List of resources with details about permissions.
         """
 
+    @abstractmethod
+    async def filter_existing_resources(self, resource_ids: Sequence[int]) -> list[int]:
+        """
+        Selects resources, which exist.
+
+        :param resource_ids: IDs of resources to check.
+        :return: IDs of existing resources in any order.
+        """
+
+    @abstractmethod
+    async def list_resources_access(
+        self, user_id: UUID, resource_ids: Sequence[int]
+    ) -> list[tuple[int, bool, bool]]:
+        """
+        Fetches access of user to resources, which user is author of or can view or edit by roles.
+
+        :param user_id: Users identifier.
+        :param resource_ids: IDs of resources to check.
+        :return: Resource ID, can view and can edit flags for accessible resources in any order.
+        """
+
     @abstractmethod
     async def set_roles_permissions_on_resource(
         self, resource_id: int, resource_permissions: ResourcePermissionsUpdate
@@ -73,3 +144,14 @@ class ResourceRepository(Protocol):
         :param resource_permissions: New permissions for a role to resource.
         :return: Has permissions been set.
         """
+
+    @abstractmethod
+    async def set_roles_permissions_on_resources(
+        self, resources_permissions: Sequence[tuple[int, ResourcePermissionsUpdate]]
+    ) -> bool:
+        """
+        Changes permissions of many roles to many resources at once.
+
+        :param resources_permissions: IDs of resources with new permissions for a role to each of them.
+        :return: Have all permissions been set, which doesn't happen if any role or resource is missing.
+        """
@@ -63,4 +63,5 @@ class RolesRepository(Protocol):
         :param user_id: User identifier.
         :param role_id: Role to remove from user.
         :return: Has role been removed.
+        :raise NotFoundError: If role isn't assigned to user.
         """
@@ -1,6 +1,6 @@
 from contextlib import AbstractAsyncContextManager
 from inspect import Traceback
-from typing import Any, Protocol, TypeVar, runtime_checkable
+from typing import Any, Callable, Protocol, TypeVar, runtime_checkable
 
 SessionObject = TypeVar("SessionObject", covariant=True)
 
@@ -33,3 +33,28 @@ class TransactionManager(Protocol[SessionObject], AbstractAsyncContextManager[An
         :return: Nothing.
         """
         return None
+
+    async def commit(self) -> None:
+        """
+        Commits changes made in transaction.
+
+        :return: Nothing.
+        """
+
+    async def rollback(self) -> None:
+        """
+        Discards changes made in transaction.
+
+        :return: Nothing.
+        """
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Registers callback, which runs once changes made so far are committed,
+        and is dropped if they are rolled back.
+
+        Used to update in-process state, such as caches, only after database has changed.
+
+        :param callback: Function to call after commit.
+        :return: Nothing.
+        """
@@ -1,11 +1,26 @@
+import asyncio
+import time
 from abc import abstractmethod
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import datetime
 from hashlib import pbkdf2_hmac
-from typing import Protocol, runtime_checkable
+from typing import AsyncGenerator, Optional, Protocol, runtime_checkable
 from uuid import UUID
 
 from demo_api.dto import HashingSettings, User, UserAuthentication, SessionData, UserDetailed, UserPermissions
 from demo_api.dto.user_registration import UserRegistration
 from demo_api.dto.user_update import UserUpdate
+from demo_api.utils.metrics import Gauge, Histogram
+
+
+@dataclass(frozen=True)
+class PasswordHashingMetrics:
+    """
+    Metrics, which hashing of passwords is recorded into, when metrics are collected.
+    """
+    duration: Histogram
+    in_progress: Gauge
 
 
 @runtime_checkable
@@ -15,8 +30,11 @@ class UsersRepository(Protocol):
         """
         Authorizes user by provided authentication request data.
 
+        Password is verified with settings it was hashed with,
+        and is rehashed in background if they differ from current settings.
+
         :param authentication_data: Authentication request data.
-        :param hashing_settings: Hashing settings for processing password.
+        :param hashing_settings: Current hashing settings.
         :return: Valid session data.
         :raise ValueError: Invalid authorization data provided.
         :raise NotFoundError: If no such user is registered.
@@ -59,19 +77,52 @@ class UsersRepository(Protocol):
         :return: Has sessions been successfully terminated.
         """
 
+    @abstractmethod
+    async def list_terminated_sessions(
+        self,
+        terminated_after: datetime,
+        after_session_id: str = "",
+        limit: int = 10_000
+    ) -> list[tuple[datetime, str]]:
+        """
+        Lists sessions terminated after specified moment, ordered by termination time and session.
+
+        :param terminated_after: Termination time from which sessions are listed.
+        :param after_session_id: Session after which sessions with same termination time are listed.
+        :param limit: How many records to fetch.
+        :return: Termination times and identifiers of sessions.
+        """
+
     @abstractmethod
     async def list_users(
-        self, limit: int = 100, offset: int = 0, include_deactivated: bool = False
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        include_deactivated: bool = False,
+        after_user_id: Optional[UUID] = None
     ) -> list[UserDetailed]:
         """
-        Lists registered users in system.
+        Lists registered users in system, ordered by their identifiers.
 
         :param limit: How many records to fetch.
         :param offset: How many records to skip.
         :param include_deactivated: Specifies if deactivated users are included.
+        :param after_user_id: Fetch only users following this one, so pages are fetched by index.
         :return: List of users objects.
         """
 
+    @abstractmethod
+    def export_users(self, include_deactivated: bool = False) -> AsyncGenerator[UserDetailed, None]:
+        """
+        Streams all registered users in system, ordered by their identifiers.
+
+        Users are fetched from database in batches while iterating,
+        so memory used doesn't depend on amount of users.
+
+        :param include_deactivated: Specifies if deactivated users are included.
+        :return: Generator of users objects.
+        """
+
     @abstractmethod
     async def get_user(self, user_id: UUID) -> UserDetailed:
         """
@@ -149,3 +200,78 @@ class UsersRepository(Protocol):
             salt.encode("utf-8"),
             hashing_settings.iterations_count
         ).hex()
+
+    @staticmethod
+    def _encode_password_hash(hashing_settings: HashingSettings, password_hash: str) -> str:
+        """
+        Encodes password hash together with settings that produced it.
+
+        :param hashing_settings: Settings used for hashing.
+        :param password_hash: Hash of password.
+        :return: Hash in format of pbkdf2_<algorithm>$<iterations>$<hash>.
+        """
+        return f"pbkdf2_{hashing_settings.hash_algorithm}${hashing_settings.iterations_count}${password_hash}"
+
+    @staticmethod
+    def _decode_password_hash(
+        encoded_hash: str,
+        default_settings: HashingSettings
+    ) -> tuple[HashingSettings, str]:
+        """
+        Decodes password hash and settings that produced it.
+
+        Hashes stored before settings were recorded are considered produced by default settings.
+
+        :param encoded_hash: Stored password hash.
+        :param default_settings: Settings for hashes without recorded settings.
+        :return: Hashing settings and hash of password.
+        """
+        scheme, separator, parameters = encoded_hash.partition("$")
+        if not separator or not scheme.startswith("pbkdf2_"):
+            return default_settings, encoded_hash
+
+        iterations, _, password_hash = parameters.partition("$")
+        return HashingSettings(scheme.removeprefix("pbkdf2_"), int(iterations)), password_hash
+
+    @classmethod
+    async def _hash_password_in_executor(
+        cls,
+        password: str,
+        salt: str,
+        hashing_settings: HashingSettings,
+        executor: Executor | None = None,
+        metrics: PasswordHashingMetrics | None = None
+    ) -> str:
+        """
+        Hashes password in executor, so event loop is not blocked by hashing.
+
+        :param password: Users password.
+        :param salt: Salt for hashing password.
+        :param hashing_settings: Settings for hashing.
+        :param executor: Executor for running hashing, default executor of loop is used if not provided.
+        :param metrics: Metrics to record hashing into, nothing is recorded if not provided.
+        :return: Resulting hash.
+        """
+        if metrics is None:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor,
+                cls._hash_password,
+                password,
+                salt,
+                hashing_settings
+            )
+
+        metrics.in_progress.inc()
+        started_at: float = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor,
+                cls._hash_password,
+                password,
+                salt,
+                hashing_settings
+            )
+
+        finally:
+            metrics.duration.observe(time.perf_counter() - started_at)
+            metrics.in_progress.dec()
@@ -0,0 +1,140 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Optional, cast
+from uuid import uuid4
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+from demo_api.utils.config_schema import DbSettings
+from demo_api.utils.metrics import Histogram
+
+
+@dataclass(frozen=True)
+class ConnectionPoolStatistics:
+    """
+    Snapshot of database connection pool counters.
+    """
+    size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    total_wait_time_in_seconds: float
+    max_wait_time_in_seconds: float
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Connection pool, which counts how long connections are waited for.
+
+    Wait time includes opening new connections, when pool is not filled yet.
+    Distribution of wait times is recorded into checkout_wait histogram, if it's set.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts: int = 0
+        self.timeouts: int = 0
+        self.total_wait_time_in_seconds: float = 0.0
+        self.max_wait_time_in_seconds: float = 0.0
+        self.checkout_wait: Optional[Histogram] = None
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started_at: float = time.perf_counter()
+        try:
+            connection: ConnectionPoolEntry = super()._do_get()
+
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+
+        finally:
+            wait_time: float = time.perf_counter() - started_at
+            self.total_wait_time_in_seconds += wait_time
+            self.max_wait_time_in_seconds = max(self.max_wait_time_in_seconds, wait_time)
+            if self.checkout_wait is not None:
+                self.checkout_wait.observe(wait_time)
+
+        self.checkouts += 1
+        return connection
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool: InstrumentedQueuePool = cast(InstrumentedQueuePool, super().recreate())
+        pool.checkout_wait = self.checkout_wait
+        return pool
+
+    def statistics(self) -> ConnectionPoolStatistics:
+        """
+        Provides current values of pool counters.
+
+        :return: Counters snapshot.
+        """
+        return ConnectionPoolStatistics(
+            size=self.size(),
+            checked_out=self.checkedout(),
+            # Overflow counts down from negative pool size until pool is filled
+            overflow=max(0, self.overflow()),
+            checkouts=self.checkouts,
+            timeouts=self.timeouts,
+            total_wait_time_in_seconds=self.total_wait_time_in_seconds,
+            max_wait_time_in_seconds=self.max_wait_time_in_seconds
+        )
+
+
+def create_database_engine(
+    db_settings: DbSettings,
+    checkout_wait: Optional[Histogram] = None,
+    **kwargs: Any
+) -> AsyncEngine:
+    """
+    Creates database engine with connection pool configured by settings.
+
+    :param db_settings: Database settings of application.
+    :param checkout_wait: Histogram of time waited for connections from pool, if it's recorded.
+    :param kwargs: Additional arguments of engine.
+    :return: Engine, which pool is instance of InstrumentedQueuePool.
+    """
+    connect_args: dict[str, Any] = {
+        "prepared_statement_cache_size": db_settings.prepared_statement_cache_size
+    }
+    if db_settings.statement_timeout_in_milliseconds > 0:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(db_settings.statement_timeout_in_milliseconds)
+        }
+
+    if db_settings.transaction_pooling:
+        # Consequent transactions may run on different server connections behind PgBouncer,
+        # so statements can't stay prepared between them and their names must not clash
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
+    engine: AsyncEngine = create_async_engine(
+        db_settings.connection_string,
+        poolclass=InstrumentedQueuePool,
+        pool_size=db_settings.pool_size,
+        max_overflow=db_settings.pool_max_overflow,
+        pool_timeout=db_settings.pool_timeout_in_seconds,
+        pool_recycle=db_settings.pool_recycle_in_seconds,
+        pool_pre_ping=db_settings.pool_pre_ping,
+        connect_args=connect_args,
+        **kwargs
+    )
+    cast(InstrumentedQueuePool, engine.pool).checkout_wait = checkout_wait
+    return engine
+
+
+def pool_statistics(engine: AsyncEngine) -> ConnectionPoolStatistics:
+    """
+    Provides counters of engine connection pool.
+
+    :param engine: Engine created by create_database_engine.
+    :return: Counters snapshot.
+    :raise TypeError: If engine has pool of another kind.
+    """
+    if not isinstance(engine.pool, InstrumentedQueuePool):
+        raise TypeError("Engine connection pool is not instrumented")
+
+    return engine.pool.statistics()
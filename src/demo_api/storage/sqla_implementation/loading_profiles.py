@@ -0,0 +1,38 @@
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+from sqlalchemy.orm.interfaces import ORMOption
+
+from demo_api.storage.sqla_implementation.tables import (
+    AssignedRolesTable,
+    CredentialsTable,
+    ResourceTable,
+    RolesPermissionsTable,
+    RolesTable,
+    UserTable,
+)
+
+# Mappers don't load relationships on their own, and accessing one that query hasn't loaded raises,
+# so every query states what its DTO needs with one of these profiles
+
+# Users with permissions and roles, as used for authentication and listing of users
+USER_DETAILS_PROFILE: tuple[ORMOption, ...] = (
+    joinedload(UserTable.user_permissions, innerjoin=True),
+    selectinload(UserTable.assigned_roles)
+    .joinedload(AssignedRolesTable.role)
+    .load_only(RolesTable.role_name),
+    raiseload("*"),
+)
+
+# Only credentials of active users, for checking and changing passwords
+USER_CREDENTIALS_PROFILE: tuple[ORMOption, ...] = (
+    load_only(UserTable.user_id),
+    joinedload(UserTable.credentials, innerjoin=True).load_only(CredentialsTable.password, CredentialsTable.salt),
+    raiseload("*"),
+)
+
+# Resources with permissions of roles on them, as returned by listings and lookups
+RESOURCE_DETAILS_PROFILE: tuple[ORMOption, ...] = (
+    selectinload(ResourceTable.roles_permissions)
+    .joinedload(RolesPermissionsTable.role)
+    .load_only(RolesTable.role_name),
+    raiseload("*"),
+)
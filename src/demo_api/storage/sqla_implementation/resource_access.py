@@ -0,0 +1,114 @@
+from typing import Any, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, Delete, Select, delete, func, or_, select
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from demo_api.storage.sqla_implementation.tables import (
+    AssignedRolesTable,
+    ResourceTable,
+    RolesPermissionsTable,
+    UserResourceAccessTable,
+)
+
+UsersScope = Union[UUID, Select[tuple[UUID]]]
+ResourcesScope = Union[int, Select[tuple[int]]]
+
+# Key of transaction level advisory lock, which serializes refreshes of access
+RESOURCE_ACCESS_LOCK_KEY: int = 7_301_015
+
+
+async def grant_author_access(session: AsyncSession, user_id: UUID, resource_id: int) -> None:
+    """
+    Gives author full access to created resource.
+
+    :param session: SQLAlchemy session.
+    :param user_id: Author of resource.
+    :param resource_id: ID of created resource.
+    :return: Nothing.
+    """
+    session.add(UserResourceAccessTable(user_id=user_id, resource_id=resource_id, can_view=True, can_edit=True))
+    await session.flush()
+
+
+async def refresh_resource_access(
+    session: AsyncSession,
+    users: UsersScope,
+    resources: ResourcesScope,
+    excluded_role_id: Optional[int] = None
+) -> None:
+    """
+    Recomputes access of users to resources from permissions of their roles.
+
+    Must be called in the same transaction as changes of roles or permissions.
+    Access of authors to their resources is never changed.
+
+    Refreshes are serialized until commit: under READ COMMITTED concurrent refresh doesn't see
+    uncommitted changes of another one and could keep access revoked by them. Waiting refresh sees
+    every change committed before it. Locking only changed roles isn't enough, since access to
+    a resource is computed from all roles of a user.
+
+    :param session: SQLAlchemy session.
+    :param users: User or query of users, whose access might have changed.
+    :param resources: Resource or query of resources, access to which might have changed.
+    :param excluded_role_id: Role, which is about to be deleted and must not grant access anymore.
+    :return: Nothing.
+    """
+    authored_by_user: ColumnElement[bool] = (
+        select(ResourceTable.resource_id)
+        .where(
+            ResourceTable.resource_id == UserResourceAccessTable.resource_id,
+            ResourceTable.author_id == UserResourceAccessTable.user_id
+        )
+        .exists()
+    )
+    query_revoke: Delete = delete(UserResourceAccessTable).where(
+        _in_scope(UserResourceAccessTable.user_id, users),
+        _in_scope(UserResourceAccessTable.resource_id, resources),
+        ~authored_by_user
+    )
+
+    can_view: ColumnElement[Any] = func.bool_or(RolesPermissionsTable.can_view_resource)
+    can_edit: ColumnElement[Any] = func.bool_or(RolesPermissionsTable.can_edit_resource)
+    query_granted: Select[tuple[UUID, int, bool, bool]] = (
+        select(AssignedRolesTable.user_id, RolesPermissionsTable.resource_id, can_view, can_edit)
+        .join(RolesPermissionsTable, RolesPermissionsTable.role_id == AssignedRolesTable.role_id)
+        .join(ResourceTable, ResourceTable.resource_id == RolesPermissionsTable.resource_id)
+        .where(
+            _in_scope(AssignedRolesTable.user_id, users),
+            _in_scope(RolesPermissionsTable.resource_id, resources),
+            ResourceTable.author_id != AssignedRolesTable.user_id
+        )
+        .group_by(AssignedRolesTable.user_id, RolesPermissionsTable.resource_id)
+        .having(or_(can_view, can_edit))
+    )
+    if excluded_role_id is not None:
+        query_granted = query_granted.where(AssignedRolesTable.role_id != excluded_role_id)
+
+    query_grant: Insert = insert(UserResourceAccessTable).from_select(
+        ["user_id", "resource_id", "can_view", "can_edit"],
+        query_granted
+    )
+    query_grant = query_grant.on_conflict_do_update(
+        index_elements=[UserResourceAccessTable.user_id, UserResourceAccessTable.resource_id],
+        set_={
+            "can_view": query_grant.excluded.can_view,
+            "can_edit": query_grant.excluded.can_edit
+        }
+    )
+
+    await session.execute(select(func.pg_advisory_xact_lock(RESOURCE_ACCESS_LOCK_KEY)))
+    await session.execute(query_revoke)
+    await session.execute(query_grant)
+
+
+def _in_scope(
+    column: InstrumentedAttribute[Any],
+    scope: Union[UsersScope, ResourcesScope]
+) -> ColumnElement[bool]:
+    if isinstance(scope, Select):
+        return column.in_(scope)
+
+    return column == scope
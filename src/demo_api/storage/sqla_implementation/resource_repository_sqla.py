@@ -1,23 +1,47 @@
-from typing import Sequence
+from typing import Any, AsyncGenerator, Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy import CompoundSelect, Insert, Select, Update, and_, insert, or_, select, union_all
+from sqlalchemy import (
+    JSON,
+    ColumnElement,
+    Exists,
+    Integer,
+    Row,
+    ScalarSelect,
+    Select,
+    SQLColumnExpression,
+    Update,
+    any_,
+    func,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, Insert, insert
 from sqlalchemy.exc import IntegrityError, NoResultFound
-from sqlalchemy.sql.selectable import ExecutableReturnsRows
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 
 from demo_api.dto import Resource, ResourceDetails, ResourcePermissionsDetails, ResourcePermissionsUpdate, User
 from demo_api.storage.exceptions import DataIntegrityError, NotFoundError
 from demo_api.storage.protocol import ResourceRepository
+from demo_api.storage.sqla_implementation.loading_profiles import RESOURCE_DETAILS_PROFILE
+from demo_api.storage.sqla_implementation.resource_access import grant_author_access, refresh_resource_access
 from demo_api.storage.sqla_implementation.tables import (
     AssignedRolesTable,
     ResourceTable,
     RolesPermissionsTable,
     RolesTable,
+    UserResourceAccessTable,
 )
 from demo_api.storage.sqla_implementation.transaction import TransactionSQLA
 
 
 class ResourceRepositorySQLA(ResourceRepository):
+    # How many rows are fetched from server-side cursor at once while exporting
+    export_batch_size: int = 1000
+
     def __init__(self, transaction: TransactionSQLA):
         self.transaction: TransactionSQLA = transaction
 
@@ -27,14 +51,16 @@ class ResourceRepositorySQLA(ResourceRepository):
                 author_id=author.user_id,
                 content=content
             )
-            tr.add(new_resource)
 
             try:
-                await tr.commit()
+                async with tr.begin_nested():
+                    tr.add(new_resource)
 
             except IntegrityError as err:
                 raise DataIntegrityError(f"User {author.user_id} likely doesn't exist") from err
 
+            await grant_author_access(tr, author.user_id, new_resource.resource_id)
+
         return Resource(
             resource_id=new_resource.resource_id,
             author_id=author.user_id,
@@ -42,26 +68,65 @@ class ResourceRepositorySQLA(ResourceRepository):
         )
 
     async def edit_resource(self, resource_id: int, content: str) -> Resource:
+        query: Update = (
+            update(ResourceTable)
+            .where(ResourceTable.resource_id == resource_id)
+            .values(content=content)
+            .returning(ResourceTable.resource_id, ResourceTable.author_id, ResourceTable.content)
+            .execution_options(synchronize_session=False)
+        )
+
         async with self.transaction as tr:
-            try:
-                resource: ResourceTable = await tr.get_one(ResourceTable, resource_id)
+            resource: Optional[Row[Any]] = (await tr.execute(query)).one_or_none()
 
-            except NoResultFound:
-                raise NotFoundError(f"Resource with {resource_id} not found")
+        if resource is None:
+            raise NotFoundError(f"Resource with {resource_id} not found")
+
+        return Resource(
+            resource_id=resource.resource_id,
+            author_id=resource.author_id,
+            content=resource.content
+        )
+
+    async def edit_resource_if_editable(self, resource_id: int, user_id: UUID, content: str) -> Resource:
+        query: Update = (
+            update(ResourceTable)
+            .where(
+                ResourceTable.resource_id == resource_id,
+                or_(
+                    ResourceTable.author_id == user_id,
+                    self._granted_by_roles(user_id, RolesPermissionsTable.can_edit_resource)
+                )
+            )
+            .values(content=content)
+            .returning(ResourceTable.resource_id, ResourceTable.author_id, ResourceTable.content)
+            .execution_options(synchronize_session=False)
+        )
+
+        async with self.transaction as tr:
+            resource: Optional[Row[Any]] = (await tr.execute(query)).one_or_none()
+            if resource is None:
+                # Only failed edits pay for telling missing resource from forbidden one
+                existing_resource_id: Optional[int] = await tr.scalar(
+                    select(ResourceTable.resource_id).where(ResourceTable.resource_id == resource_id)
+                )
+                if existing_resource_id is None:
+                    raise NotFoundError(f"Resource with {resource_id} not found")
 
-            resource.content = content
-            await tr.commit()
+                raise PermissionError(f"User {user_id} can't edit resource {resource_id}")
 
         return Resource(
             resource_id=resource.resource_id,
             author_id=resource.author_id,
-            content=str(resource.content)
+            content=resource.content
         )
 
     async def get_resource_by_id(self, resource_id: int) -> ResourceDetails:
         async with self.transaction as tr:
             try:
-                resource: ResourceTable = await tr.get_one(ResourceTable, resource_id)
+                resource: ResourceTable = await tr.get_one(
+                    ResourceTable, resource_id, options=RESOURCE_DETAILS_PROFILE
+                )
 
             except NoResultFound:
                 raise NotFoundError(f"Resource with {resource_id} not found")
@@ -82,138 +147,289 @@ class ResourceRepositorySQLA(ResourceRepository):
             roles_permissions=permissions_details
         )
 
-    async def list_resources(self, limit: int = 100, offset: int = 0) -> list[ResourceDetails]:
-        query: Select[tuple[ResourceTable]] = (
-            select(ResourceTable)
-            .limit(limit).offset(offset)
-            .order_by(ResourceTable.resource_id.desc())
+    async def get_resource_if_viewable(self, resource_id: int, user_id: UUID) -> ResourceDetails:
+        query: Select[tuple[int, UUID, str, bool]] = (
+            select(
+                ResourceTable.resource_id,
+                ResourceTable.author_id,
+                ResourceTable.content,
+                or_(
+                    ResourceTable.author_id == user_id,
+                    self._granted_by_roles(
+                        user_id,
+                        RolesPermissionsTable.can_view_resource,
+                        RolesPermissionsTable.can_edit_resource
+                    )
+                ).label("is_viewable")
+            )
+            .where(ResourceTable.resource_id == resource_id)
         )
-        resources: list[ResourceDetails] = []
 
         async with self.transaction as tr:
-            resources_records: Sequence[ResourceTable] = (await tr.scalars(query)).all()
-
-            for resource_record in resources_records:
-                permissions_details: list[ResourcePermissionsDetails] = [
-                    ResourcePermissionsDetails(
-                        role_id=role_permissions.role_id,
-                        role_name=role_permissions.role.role_name,
-                        can_edit_resource=role_permissions.can_edit_resource,
-                        can_view_resource=role_permissions.can_view_resource
-                    )
-                    for role_permissions in resource_record.roles_permissions
-                ]
-                resource: ResourceDetails = ResourceDetails(
-                    resource_id=resource_record.resource_id,
-                    author_id=resource_record.author_id,
-                    content=resource_record.content,
-                    roles_permissions=permissions_details
-                )
-                resources.append(resource)
+            resource: Optional[Row[tuple[int, UUID, str, bool]]] = (await tr.execute(query)).one_or_none()
+            if resource is None:
+                raise NotFoundError(f"Resource with {resource_id} not found")
 
-        return resources
+            if not resource.is_viewable:
+                raise PermissionError(f"User {user_id} can't view resource {resource_id}")
 
-    async def list_available_resources(
-        self, user_id: UUID, limit: int = 100, offset: int = 0
-    ) -> list[ResourceDetails]:
-        query_by_author: Select[tuple[ResourceTable]] = (
-            select(ResourceTable)
-            .where(ResourceTable.author_id == user_id)
-        )
-        query_user_specific_roles: Select[tuple[ResourceTable]] = (
-            select(ResourceTable)
-            .join(
-                RolesPermissionsTable,
-                RolesPermissionsTable.resource_id == ResourceTable.resource_id
-            )
-            .join(
-                RolesTable,
-                RolesTable.role_id == RolesPermissionsTable.role_id
-            )
-            .join(
-                AssignedRolesTable,
-                AssignedRolesTable.role_id == RolesTable.role_id
-            )
-            .where(
-                and_(
-                    AssignedRolesTable.user_id == user_id,
-                    or_(
-                        RolesPermissionsTable.can_edit_resource.is_(True),
-                        RolesPermissionsTable.can_view_resource.is_(True)
-                    )
-                )
+            permissions_details: list[ResourcePermissionsDetails] = await self._get_permissions_details(
+                tr, resource_id
             )
+
+        return ResourceDetails(
+            resource_id=resource.resource_id,
+            author_id=resource.author_id,
+            content=resource.content,
+            roles_permissions=permissions_details
+        )
+
+    async def is_resource_author(self, resource_id: int, user_id: UUID) -> bool:
+        query: Exists = (
+            select(ResourceTable.resource_id)
+            .where(ResourceTable.resource_id == resource_id, ResourceTable.author_id == user_id)
+            .exists()
         )
 
-        query_matching: CompoundSelect[tuple[ResourceTable]] = (
-            union_all(query_by_author, query_user_specific_roles)
+        async with self.transaction as tr:
+            return bool(await tr.scalar(select(query)))
+
+    async def list_resources(
+        self, limit: int = 100, offset: int = 0, after_resource_id: Optional[int] = None
+    ) -> list[ResourceDetails]:
+        # Read-only listing selects only columns of DTO, without building ORM entities
+        query: Select[Any] = (
+            select(*self._resource_details_columns())
+            .limit(limit).offset(offset)
+            .order_by(ResourceTable.resource_id.desc())
+        )
+        if after_resource_id is not None:
+            query = query.where(ResourceTable.resource_id < after_resource_id)
+
+        async with self.transaction as tr:
+            resources_records: Sequence[Row[Any]] = (await tr.execute(query)).all()
+
+        return [self._resource_details(resource_record) for resource_record in resources_records]
+
+    async def export_resources(self) -> AsyncGenerator[ResourceDetails, None]:
+        query: Select[Any] = (
+            select(*self._resource_details_columns())
             .order_by(ResourceTable.resource_id.desc())
+            .execution_options(yield_per=self.export_batch_size)
+        )
+
+        async with self.transaction as tr:
+            # Rows are read through server-side cursor, one batch at a time
+            resources_records: AsyncResult[Any] = await tr.stream(query)
+            try:
+                async for resources_batch in resources_records.partitions():
+                    for resource_record in resources_batch:
+                        yield self._resource_details(resource_record)
+
+            finally:
+                await resources_records.close()
+
+    async def list_available_resources(
+        self, user_id: UUID, limit: int = 100, offset: int = 0, after_resource_id: Optional[int] = None
+    ) -> list[ResourceDetails]:
+        # Access is kept up to date by changes of resources, roles and permissions
+        query: Select[Any] = (
+            select(*self._resource_details_columns())
+            .join(UserResourceAccessTable, UserResourceAccessTable.resource_id == ResourceTable.resource_id)
+            .where(UserResourceAccessTable.user_id == user_id)
+            .order_by(UserResourceAccessTable.resource_id.desc())
             .limit(limit)
             .offset(offset)
         )
-        query: ExecutableReturnsRows = (
-            select(ResourceTable).from_statement(query_matching)
+        if after_resource_id is not None:
+            query = query.where(UserResourceAccessTable.resource_id < after_resource_id)
+
+        async with self.transaction as tr:
+            resources_records: Sequence[Row[Any]] = (await tr.execute(query)).all()
+
+        return [self._resource_details(resource_record) for resource_record in resources_records]
+
+    async def filter_existing_resources(self, resource_ids: Sequence[int]) -> list[int]:
+        query: Select[tuple[int]] = (
+            select(ResourceTable.resource_id)
+            .where(ResourceTable.resource_id == any_(self._ids_array(resource_ids)))
         )
-        resources: list[ResourceDetails] = []
 
         async with self.transaction as tr:
-            resources_records: Sequence[ResourceTable] = (await tr.scalars(query)).all()
-
-            for resource_record in resources_records:
-                permissions_details: list[ResourcePermissionsDetails] = [
-                    ResourcePermissionsDetails(
-                        role_id=role_permissions.role_id,
-                        role_name=role_permissions.role.role_name,
-                        can_edit_resource=role_permissions.can_edit_resource,
-                        can_view_resource=role_permissions.can_view_resource
-                    )
-                    for role_permissions in resource_record.roles_permissions
-                ]
-                resource: ResourceDetails = ResourceDetails(
-                    resource_id=resource_record.resource_id,
-                    author_id=resource_record.author_id,
-                    content=resource_record.content,
-                    roles_permissions=permissions_details
-                )
-                resources.append(resource)
+            return list((await tr.scalars(query)).all())
 
-        return resources
+    async def list_resources_access(
+        self, user_id: UUID, resource_ids: Sequence[int]
+    ) -> list[tuple[int, bool, bool]]:
+        query: Select[tuple[int, bool, bool]] = (
+            select(
+                UserResourceAccessTable.resource_id,
+                UserResourceAccessTable.can_view,
+                UserResourceAccessTable.can_edit
+            )
+            .where(
+                UserResourceAccessTable.user_id == user_id,
+                UserResourceAccessTable.resource_id == any_(self._ids_array(resource_ids))
+            )
+        )
+
+        async with self.transaction as tr:
+            return [
+                (resource_id, can_view, can_edit)
+                for resource_id, can_view, can_edit in await tr.execute(query)
+            ]
 
     async def set_roles_permissions_on_resource(
         self,
         resource_id: int,
         resource_permissions: ResourcePermissionsUpdate
     ) -> bool:
-        query_insert: Insert = insert(RolesPermissionsTable).values(
-            {
+        return await self.set_roles_permissions_on_resources([(resource_id, resource_permissions)])
+
+    async def set_roles_permissions_on_resources(
+        self,
+        resources_permissions: Sequence[tuple[int, ResourcePermissionsUpdate]]
+    ) -> bool:
+        # Same role and resource can't be changed twice by one statement, so last change wins
+        rows: dict[tuple[int, int], dict[str, Any]] = {
+            (resource_permissions.role_id, resource_id): {
                 "role_id": resource_permissions.role_id,
                 "resource_id": resource_id,
                 "can_view_resource": resource_permissions.can_view_resource,
                 "can_edit_resource": resource_permissions.can_edit_resource
             }
+            for resource_id, resource_permissions in resources_permissions
+        }
+        if not rows:
+            return True
+
+        query_upsert: Insert = insert(RolesPermissionsTable).values(list(rows.values()))
+        query_upsert = query_upsert.on_conflict_do_update(
+            index_elements=[RolesPermissionsTable.role_id, RolesPermissionsTable.resource_id],
+            set_={
+                "can_view_resource": query_upsert.excluded.can_view_resource,
+                "can_edit_resource": query_upsert.excluded.can_edit_resource
+            }
+        )
+        role_ids: list[int] = list({role_id for role_id, _ in rows})
+        resource_ids: list[int] = list({resource_id for _, resource_id in rows})
+        users_with_roles: Select[tuple[UUID]] = (
+            select(AssignedRolesTable.user_id)
+            .where(AssignedRolesTable.role_id == any_(self._ids_array(role_ids)))
+        )
+        changed_resources: Select[tuple[int]] = (
+            select(ResourceTable.resource_id)
+            .where(ResourceTable.resource_id == any_(self._ids_array(resource_ids)))
         )
+
         async with self.transaction as tr:
             try:
-                await tr.execute(query_insert)
-                await tr.commit()
-                return True
+                async with tr.begin_nested():
+                    await tr.execute(query_upsert)
+                    await refresh_resource_access(tr, users_with_roles, changed_resources)
 
             except IntegrityError:
-                await tr.rollback()
+                # Either role or resource doesn't exist
+                return False
 
-            query_update: Update = Update(RolesPermissionsTable).values(
-                {
-                    "resource_id": resource_id,
-                    "can_view_resource": resource_permissions.can_view_resource,
-                    "can_edit_resource": resource_permissions.can_edit_resource
-                }
-            ).where(RolesPermissionsTable.role_id == resource_permissions.role_id)
+        return True
 
-            try:
-                await tr.execute(query_update)
-                await tr.commit()
-                return True
+    @staticmethod
+    def _ids_array(ids: Sequence[int]) -> ColumnElement[list[int]]:
+        # Bound as one array, so statement stays the same for any amount of identifiers
+        return literal(list(ids), ARRAY(Integer))
 
-            except IntegrityError:
-                await tr.rollback()
-                return False
+    @staticmethod
+    def _resource_details(resource_record: Row[Any]) -> ResourceDetails:
+        """
+        Builds resource details from row of resource details columns.
+
+        :param resource_record: Row selected with resource details columns.
+        :return: Resource details.
+        """
+        return ResourceDetails(
+            resource_id=resource_record.resource_id,
+            author_id=resource_record.author_id,
+            content=resource_record.content,
+            roles_permissions=[
+                ResourcePermissionsDetails(**role_permissions)
+                for role_permissions in resource_record.roles_permissions
+            ]
+        )
+
+    @staticmethod
+    def _resource_details_columns() -> tuple[SQLColumnExpression[Any], ...]:
+        """
+        Columns of resource details, which rows are turned into ResourceDetails by _resource_details.
+
+        :return: Labeled columns, with permissions of roles aggregated into JSON by database.
+        """
+        roles_permissions: ScalarSelect[Any] = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        func.json_build_object(
+                            "role_id", RolesPermissionsTable.role_id,
+                            "role_name", RolesTable.role_name,
+                            "can_edit_resource", RolesPermissionsTable.can_edit_resource,
+                            "can_view_resource", RolesPermissionsTable.can_view_resource
+                        )
+                    ),
+                    literal([], JSON)
+                )
+            )
+            .join(RolesTable, RolesTable.role_id == RolesPermissionsTable.role_id)
+            .where(RolesPermissionsTable.resource_id == ResourceTable.resource_id)
+            .correlate(ResourceTable)
+            .scalar_subquery()
+        )
+
+        return (
+            ResourceTable.resource_id,
+            ResourceTable.author_id,
+            ResourceTable.content,
+            roles_permissions.label("roles_permissions"),
+        )
+
+    @staticmethod
+    def _granted_by_roles(user_id: UUID, *permissions: InstrumentedAttribute[bool]) -> Exists:
+        """
+        Builds condition, which is true if any of users roles has any of permissions on resource.
+
+        :param user_id: Users identifier.
+        :param permissions: Permission columns of roles permissions table.
+        :return: Condition correlated to resource table of enclosing statement.
+        """
+        return (
+            select(RolesPermissionsTable.role_id)
+            .join(AssignedRolesTable, AssignedRolesTable.role_id == RolesPermissionsTable.role_id)
+            .where(
+                RolesPermissionsTable.resource_id == ResourceTable.resource_id,
+                AssignedRolesTable.user_id == user_id,
+                or_(*(permission.is_(True) for permission in permissions))
+            )
+            .exists()
+        )
+
+    @staticmethod
+    async def _get_permissions_details(tr: AsyncSession, resource_id: int) -> list[ResourcePermissionsDetails]:
+        query: Select[tuple[int, str, bool, bool]] = (
+            select(
+                RolesPermissionsTable.role_id,
+                RolesTable.role_name,
+                RolesPermissionsTable.can_edit_resource,
+                RolesPermissionsTable.can_view_resource
+            )
+            .join(RolesTable, RolesTable.role_id == RolesPermissionsTable.role_id)
+            .where(RolesPermissionsTable.resource_id == resource_id)
+        )
+
+        return [
+            ResourcePermissionsDetails(
+                role_id=role_id,
+                role_name=role_name,
+                can_edit_resource=can_edit_resource,
+                can_view_resource=can_view_resource
+            )
+            for role_id, role_name, can_edit_resource, can_view_resource in await tr.execute(query)
+        ]
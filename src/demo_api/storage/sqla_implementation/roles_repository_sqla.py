@@ -1,14 +1,15 @@
-from typing import Sequence
+from typing import Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy import Select, select
-from sqlalchemy.exc import IntegrityError, NoResultFound
-from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import Row, Select, Update, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql.dml import ReturningDelete
 
 from demo_api.dto import CreateRoleRequest, Role
 from demo_api.storage.exceptions import NotFoundError
 from demo_api.storage.protocol import RolesRepository
-from demo_api.storage.sqla_implementation.tables import AssignedRolesTable, RolesTable
+from demo_api.storage.sqla_implementation.resource_access import refresh_resource_access
+from demo_api.storage.sqla_implementation.tables import AssignedRolesTable, RolesPermissionsTable, RolesTable
 from demo_api.storage.sqla_implementation.transaction import TransactionSQLA
 
 
@@ -30,73 +31,83 @@ class RolesRepositorySQLA(RolesRepository):
         async with self.transaction as tr:
             new_role: RolesTable = RolesTable(role_name=role.role_name)
             tr.add(new_role)
-            await tr.commit()
+            await tr.flush()
 
         return Role(role_id=new_role.role_id, role_name=new_role.role_name)
 
     async def update_role(self, updated_role: Role) -> Role:
-        async with self.transaction as tr:
-            try:
-                current_role: RolesTable = await tr.get_one(
-                    RolesTable, updated_role.role_id
-                )
+        query: Update = (
+            update(RolesTable)
+            .where(RolesTable.role_id == updated_role.role_id)
+            .values(role_name=updated_role.role_name)
+            .returning(RolesTable.role_id, RolesTable.role_name)
+            .execution_options(synchronize_session=False)
+        )
 
-            except NoResultFound as err:
-                raise NotFoundError("Role was not found") from err
+        async with self.transaction as tr:
+            role: Optional[Row[tuple[int, str]]] = (await tr.execute(query)).one_or_none()
 
-            current_role.role_name = updated_role.role_name
-            await tr.commit()
+        if role is None:
+            raise NotFoundError("Role was not found")
 
-        return Role(role_id=current_role.role_id, role_name=str(current_role.role_name))
+        return Role(role_id=role.role_id, role_name=role.role_name)
 
     async def delete_role(self, role_id: int) -> bool:
+        query: ReturningDelete[tuple[int]] = (
+            delete(RolesTable)
+            .where(RolesTable.role_id == role_id)
+            .returning(RolesTable.role_id)
+            .execution_options(synchronize_session=False)
+        )
+
         async with self.transaction as tr:
-            try:
-                current_role: RolesTable = await tr.get_one(
-                    RolesTable, role_id
+            # Access is revoked while assignments and permissions of role still exist,
+            # and together with deletion it's rolled back, if role is missing
+            async with tr.begin_nested():
+                await refresh_resource_access(
+                    tr,
+                    select(AssignedRolesTable.user_id).where(AssignedRolesTable.role_id == role_id),
+                    self._role_resources(role_id),
+                    excluded_role_id=role_id
                 )
-
-            except NoResultFound as err:
-                raise NotFoundError("Role was not found") from err
-
-            try:
-                await tr.delete(current_role)
-                await tr.commit()
-
-            except StaleDataError:
-                return False
+                deleted_role_id: Optional[int] = await tr.scalar(query)
+                if deleted_role_id is None:
+                    raise NotFoundError("Role was not found")
 
         return True
 
     async def assign_role_to_user(self, user_id: UUID, role_id: int) -> bool:
         async with self.transaction as tr:
             role_assignment = AssignedRolesTable(user_id=user_id, role_id=role_id)
-            tr.add(role_assignment)
 
             try:
-                await tr.commit()
+                async with tr.begin_nested():
+                    tr.add(role_assignment)
 
             except IntegrityError:
                 return False
 
+            await refresh_resource_access(tr, user_id, self._role_resources(role_id))
+
         return True
 
     async def remove_role_from_user(self, user_id: UUID, role_id: int) -> bool:
-        async with self.transaction as tr:
-            try:
-                current_role_assignment: AssignedRolesTable = await tr.get_one(
-                    AssignedRolesTable, {"user_id": user_id, "role_id": role_id}
-                )
-
-            except NoResultFound as err:
-                raise NotFoundError("Role was not found") from err
+        query: ReturningDelete[tuple[int]] = (
+            delete(AssignedRolesTable)
+            .where(AssignedRolesTable.user_id == user_id, AssignedRolesTable.role_id == role_id)
+            .returning(AssignedRolesTable.role_id)
+            .execution_options(synchronize_session=False)
+        )
 
-            await tr.delete(current_role_assignment)
+        async with self.transaction as tr:
+            removed_role_id: Optional[int] = await tr.scalar(query)
+            if removed_role_id is None:
+                raise NotFoundError("Role was not found")
 
-            try:
-                await tr.commit()
-
-            except (IntegrityError, StaleDataError):
-                return False
+            await refresh_resource_access(tr, user_id, self._role_resources(role_id))
 
         return True
+
+    @staticmethod
+    def _role_resources(role_id: int) -> Select[tuple[int]]:
+        return select(RolesPermissionsTable.resource_id).where(RolesPermissionsTable.role_id == role_id)
@@ -5,6 +5,7 @@ from .roles_permissions import RolesPermissionsTable
 from .roles_table import RolesTable
 from .sessions_table import SessionsTable
 from .user_permissions_table import UserPermissionsTable
+from .user_resource_access_table import UserResourceAccessTable
 from .user_table import UserTable
 from .base_table import BaseTable
 
@@ -15,6 +16,7 @@ __all__ = (
     "RolesPermissionsTable",
     "RolesTable",
     "UserPermissionsTable",
+    "UserResourceAccessTable",
     "UserTable",
     "SessionsTable",
     "BaseTable"
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, Uuid
+from sqlalchemy import ForeignKey, Index, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base_table import BaseTable
@@ -19,7 +19,11 @@ class AssignedRolesTable(BaseTable):
     )
 
     role: Mapped["RolesTable"] = relationship(
-        lazy="joined"
+        lazy="raise"
     )
 
     __tablename__ = "assigned_roles"
+    __table_args__ = (
+        # Primary key serves lookups by user, while this one serves lookups by role
+        Index("ix_assigned_roles_role_id", "role_id", "user_id"),
+    )
@@ -16,8 +16,9 @@ class CredentialsTable(BaseTable):
         String(255),
         unique=True, index=True, nullable=False
     )
+    # Stored as pbkdf2_<algorithm>$<iterations>$<hash>
     password: Mapped[Optional[str]] = mapped_column(
-        String(64), nullable=True
+        String(255), nullable=True
     )
     salt: Mapped[str] = mapped_column(String(32))
 
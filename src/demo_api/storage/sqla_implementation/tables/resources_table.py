@@ -1,7 +1,7 @@
 from __future__ import annotations
 from uuid import UUID
 
-from sqlalchemy import ForeignKey, String, Uuid
+from sqlalchemy import ForeignKey, Index, String, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .roles_permissions import RolesPermissionsTable
@@ -21,8 +21,12 @@ class ResourceTable(BaseTable):
     )
 
     roles_permissions: Mapped[list[RolesPermissionsTable]] = relationship(
-        lazy="selectin",
+        lazy="raise",
         cascade="all, delete-orphan",
         back_populates="resource"
     )
     __tablename__ = "resource"
+    __table_args__ = (
+        # Resources of author are listed newest first
+        Index("ix_resource_author_id", "author_id", "resource_id"),
+    )
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base_table import BaseTable
@@ -24,7 +24,7 @@ class RolesPermissionsTable(BaseTable):
     can_edit_resource: Mapped[bool]
 
     role: Mapped[RolesTable] = relationship(
-        lazy="joined",
+        lazy="raise",
         back_populates="resources_permissions"
     )
     resource: Mapped[ResourceTable] = relationship(
@@ -33,3 +33,11 @@ class RolesPermissionsTable(BaseTable):
     )
 
     __tablename__ = "roles_permissions"
+    __table_args__ = (
+        # Permissions of a resource are checked without reading table itself
+        Index(
+            "ix_roles_permissions_resource_id",
+            "resource_id",
+            postgresql_include=["role_id", "can_view_resource", "can_edit_resource"]
+        ),
+    )
@@ -1,7 +1,8 @@
 import datetime
+from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import DateTime, ForeignKey, String, Uuid, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, Uuid, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base_table import BaseTable
@@ -17,9 +18,21 @@ class SessionsTable(BaseTable):
     created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     session_id: Mapped[str] = mapped_column(String(32), primary_key=True)
     is_alive: Mapped[bool] = mapped_column(default=True)
+    terminated_at: Mapped[Optional[datetime.datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
     user: Mapped[UserTable] = relationship(
-        lazy="joined"
+        lazy="raise"
     )
 
     __tablename__ = "session"
+    __table_args__ = (
+        # Used for incremental fetching of terminated sessions
+        Index("ix_session_terminated_at", "terminated_at", "session_id"),
+        # Sessions are looked up without user, and only alive ones are of interest
+        Index(
+            "ix_session_alive_session_id",
+            "session_id",
+            postgresql_include=["user_id"],
+            postgresql_where=text("is_alive IS TRUE")
+        ),
+    )
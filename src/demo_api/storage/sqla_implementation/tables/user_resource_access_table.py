@@ -0,0 +1,27 @@
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base_table import BaseTable
+
+
+class UserResourceAccessTable(BaseTable):
+    """
+    Access of users to resources, derived from authorship and permissions of assigned roles.
+
+    Has a row only for resources, which user may view or edit.
+    """
+    user_id: Mapped[UUID] = mapped_column(
+        Uuid,
+        ForeignKey("user.user_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    resource_id: Mapped[int] = mapped_column(
+        ForeignKey("resource.resource_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    can_view: Mapped[bool]
+    can_edit: Mapped[bool]
+
+    __tablename__ = "user_resource_access"
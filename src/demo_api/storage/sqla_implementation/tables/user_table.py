@@ -29,7 +29,7 @@ class UserTable(BaseTable):
         cascade="all, delete-orphan"
     )
     user_permissions: Mapped[UserPermissionsTable] = relationship(
-        lazy="joined",
+        lazy="raise",
         cascade="all, delete-orphan"
     )
     assigned_roles: Mapped[list[AssignedRolesTable]] = relationship(
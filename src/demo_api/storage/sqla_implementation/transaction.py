@@ -1,6 +1,7 @@
 from inspect import Traceback
-from typing import Any
+from typing import Any, Callable
 
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from demo_api.storage.protocol import TransactionManager
@@ -9,14 +10,24 @@ from demo_api.storage.protocol import TransactionManager
 class TransactionSQLA(TransactionManager[AsyncSession]):
     """
     Manages SQLAlchemy ORM session.
+
+    By default, every entered context gets its own session, which is committed on exit.
+    Transaction created with commit_on_exit set to False is a unit of work: it lazily opens one session,
+    shares it between all contexts, and is committed or rolled back once by its owner.
+
+    Callbacks registered with after_commit are run once changes are committed,
+    so in unit of work they wait for its commit and are dropped if it's rolled back.
     """
 
-    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession]):
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession], commit_on_exit: bool = True):
         self.sessionmaker: async_sessionmaker[AsyncSession] = sessionmaker
+        self.commit_on_exit: bool = commit_on_exit
         self.current_session: AsyncSession | None = None
+        self._after_commit: list[Callable[[], None]] = []
 
     async def __aenter__(self) -> AsyncSession:
-        self.current_session = self.sessionmaker()
+        if self.commit_on_exit or self.current_session is None:
+            self.current_session = self.sessionmaker()
 
         return self.current_session
 
@@ -26,6 +37,69 @@ class TransactionSQLA(TransactionManager[AsyncSession]):
         exc_value: Exception | Any | None,
         traceback: Traceback | Any
     ) -> None:
+        if not self.commit_on_exit:
+            return None
+
+        if exc_type is None:
+            await self.commit()
+
+        await self.close()
+        return None
+
+    async def commit(self) -> None:
+        if self.current_session is not None:
+            await self.current_session.commit()
+
+        callbacks: list[Callable[[], None]] = self._after_commit
+        self._after_commit = []
+        for callback in callbacks:
+            callback()
+
+    async def rollback(self) -> None:
+        self._after_commit.clear()
+        if self.current_session is not None:
+            await self.current_session.rollback()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        if self.commit_on_exit:
+            # Every context is committed on exit, so changes made so far are already committed
+            callback()
+            return
+
+        self._after_commit.append(callback)
+
+    async def release_connection(self) -> None:
+        """
+        Returns connection into pool while it's not needed, for example while password is being hashed.
+        Session opens new transaction when it's used again.
+
+        Transaction is closed instead of being committed, so it must not have written anything yet,
+        which keeps unit of work all-or-nothing. Objects loaded so far stay usable.
+
+        :return: Nothing.
+        :raise RuntimeError: If transaction has changes, which would be lost.
+        """
+        session: AsyncSession | None = self.current_session
+        if session is None or not session.in_transaction():
+            return
+
+        if (
+            session.new or session.dirty or session.deleted or
+            # Server assigns transaction ID only once transaction writes something
+            await session.scalar(select(func.txid_current_if_assigned())) is not None
+        ):
+            raise RuntimeError("Connection of transaction with uncommitted changes can't be released")
+
+        # Unlike rollback, closing detaches loaded objects without expiring them
+        await session.close()
+
+    async def close(self) -> None:
+        """
+        Closes current session, rolling back anything that was not committed.
+
+        :return: Nothing.
+        """
+        self._after_commit.clear()
         if self.current_session is not None:
             await self.current_session.close()
-        return None
+            self.current_session = None
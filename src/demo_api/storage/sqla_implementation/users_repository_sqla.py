@@ -1,27 +1,48 @@
+import asyncio
+import logging
 import secrets
-from typing import Sequence
+from concurrent.futures import Executor
+from datetime import datetime
+from typing import Any, AsyncGenerator, Optional, Sequence
 from uuid import UUID
 
-from sqlalchemy import Select, Update, and_, select, update
+from sqlalchemy import (
+    JSON, ColumnElement, DateTime, Row, ScalarSelect, Select, SQLColumnExpression, Update, and_, func, literal, select,
+    tuple_, update,
+)
 from sqlalchemy.exc import IntegrityError, NoResultFound
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, selectinload
-from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
 
 from demo_api.dto import HashingSettings, Role, SessionData, User, UserAuthentication, UserDetailed, UserPermissions
 from demo_api.dto.user_registration import UserRegistration
 from demo_api.dto.user_update import UserUpdate
 from demo_api.storage.exceptions import DataIntegrityError, NotFoundError
-from demo_api.storage.protocol import UsersRepository
+from demo_api.storage.protocol import PasswordHashingMetrics, UsersRepository
+from demo_api.storage.sqla_implementation.loading_profiles import USER_CREDENTIALS_PROFILE, USER_DETAILS_PROFILE
 from demo_api.storage.sqla_implementation.tables import (
-    CredentialsTable, SessionsTable, UserPermissionsTable, UserTable,
+    AssignedRolesTable, CredentialsTable, RolesTable, SessionsTable, UserPermissionsTable, UserTable,
 )
 from demo_api.storage.sqla_implementation.transaction import TransactionSQLA
 
 
+logger: logging.Logger = logging.getLogger(__name__)
+
+
 class UsersRepositorySQLA(UsersRepository):
-    def __init__(self, transaction: TransactionSQLA):
+    # Rehashing outlives request, so tasks are referenced until they are done
+    _rehash_tasks: set[asyncio.Task[None]] = set()
+    # How many rows are fetched from server-side cursor at once while exporting
+    export_batch_size: int = 1000
+
+    def __init__(
+        self,
+        transaction: TransactionSQLA,
+        hashing_executor: Executor | None = None,
+        hashing_metrics: PasswordHashingMetrics | None = None
+    ):
         self.transaction: TransactionSQLA = transaction
+        self.hashing_executor: Executor | None = hashing_executor
+        self.hashing_metrics: PasswordHashingMetrics | None = hashing_metrics
 
     async def login(
         self, authentication_data: UserAuthentication, hashing_settings: HashingSettings
@@ -30,7 +51,7 @@ class UsersRepositorySQLA(UsersRepository):
             query: Select[tuple[UserTable]] = (
                 select(UserTable)
                 .join(UserTable.credentials)
-                .options(joinedload(UserTable.credentials))
+                .options(*USER_CREDENTIALS_PROFILE)
                 .where(
                     and_(
                         CredentialsTable.email == authentication_data.email,
@@ -45,24 +66,44 @@ class UsersRepositorySQLA(UsersRepository):
             except NoResultFound as err:
                 raise NotFoundError() from err
 
-            if user_data.credentials.password is None:
-                raise ValueError("User is deactivated")
+        if user_data.credentials.password is None:
+            raise ValueError("User is deactivated")
 
-            hashed_input: str = self._hash_password(
-                authentication_data.password,
-                user_data.credentials.salt,
-                hashing_settings
-            )
+        stored_password: str = user_data.credentials.password
+        stored_settings, stored_hash = self._decode_password_hash(stored_password, hashing_settings)
+
+        # Hashing is done outside of transaction to not hold connection while it's running
+        await self.transaction.release_connection()
+        hashed_input: str = await self._hash_password_in_executor(
+            authentication_data.password,
+            user_data.credentials.salt,
+            stored_settings,
+            self.hashing_executor,
+            self.hashing_metrics
+        )
+
+        if not secrets.compare_digest(hashed_input, stored_hash):
+            raise ValueError("Invalid password provided")
 
-            if not secrets.compare_digest(hashed_input, user_data.credentials.password):
-                raise ValueError("Invalid password provided")
+        if stored_password != self._encode_password_hash(hashing_settings, stored_hash):
+            rehash: asyncio.Task[None] = asyncio.create_task(
+                self._rehash_password(
+                    user_data.user_id,
+                    authentication_data.password,
+                    stored_password,
+                    hashing_settings
+                )
+            )
+            self._rehash_tasks.add(rehash)
+            rehash.add_done_callback(self._rehash_tasks.discard)
 
+        async with self.transaction as tr:
             new_user_session: SessionsTable = SessionsTable(
                 user_id=user_data.user_id,
                 session_id=secrets.token_hex(16)
             )
             tr.add(new_user_session)
-            await tr.commit()
+            await tr.flush()
 
         return SessionData(
             user_id=new_user_session.user_id,
@@ -71,25 +112,81 @@ class UsersRepositorySQLA(UsersRepository):
             is_alive=new_user_session.is_alive
         )
 
+    async def _rehash_password(
+        self,
+        user_id: UUID,
+        password: str,
+        previous_password: str,
+        hashing_settings: HashingSettings
+    ) -> None:
+        """
+        Hashes password with current settings, replacing previous hash if it has not been changed meanwhile.
+
+        Runs after request has finished, so it uses its own database session.
+
+        :param user_id: User whose password is rehashed.
+        :param password: Verified password of user.
+        :param previous_password: Stored hash, which password was verified with.
+        :param hashing_settings: Current hashing settings.
+        :return: Nothing.
+        """
+        try:
+            new_salt: str = secrets.token_hex(16)
+            new_password_hash: str = self._encode_password_hash(
+                hashing_settings,
+                await self._hash_password_in_executor(
+                    password,
+                    new_salt,
+                    hashing_settings,
+                    self.hashing_executor,
+                    self.hashing_metrics
+                )
+            )
+
+            async with self.transaction.sessionmaker() as session:
+                await session.execute(
+                    update(CredentialsTable)
+                    .where(
+                        and_(
+                            CredentialsTable.user_id == user_id,
+                            CredentialsTable.password == previous_password
+                        )
+                    )
+                    .values(password=new_password_hash, salt=new_salt)
+                )
+                await session.commit()
+
+        except Exception:
+            # Password will be rehashed on next login
+            logger.exception("Failed to rehash password of user %s", user_id)
+
     async def register_user(
         self,
         user_data: UserRegistration,
         permissions: UserPermissions,
         hashing_settings: HashingSettings
     ) -> User:
+        salt: str = secrets.token_hex(16)
+        await self.transaction.release_connection()
+        hashed_password: str = self._encode_password_hash(
+            hashing_settings,
+            await self._hash_password_in_executor(
+                user_data.password,
+                salt,
+                hashing_settings,
+                self.hashing_executor,
+                self.hashing_metrics
+            )
+        )
+
         async with self.transaction as tr:
-            salt: str = secrets.token_hex(16)
             new_user: UserTable = UserTable(
                 name=user_data.name,
                 surname=user_data.surname,
                 third_name=user_data.third_name,
                 credentials=CredentialsTable(
                     email=user_data.email,
-                    password=self._hash_password(
-                        user_data.password,
-                        salt,
-                        hashing_settings
-                    ),
+                    password=hashed_password,
                     salt=salt
                 ),
                 user_permissions=UserPermissionsTable(
@@ -101,8 +198,8 @@ class UsersRepositorySQLA(UsersRepository):
             )
 
             try:
-                tr.add(new_user)
-                await tr.commit()
+                async with tr.begin_nested():
+                    tr.add(new_user)
 
             except IntegrityError as err:
                 raise DataIntegrityError(
@@ -118,33 +215,25 @@ class UsersRepositorySQLA(UsersRepository):
         )
 
     async def terminate_session(self, session_data: SessionData) -> bool:
-        async with self.transaction as tr:
-            current_session_query: Select[tuple[SessionsTable]] = select(SessionsTable).where(
-                SessionsTable.session_id == session_data.session_id
+        query: Update = (
+            update(SessionsTable)
+            .where(
+                SessionsTable.session_id == session_data.session_id,
+                SessionsTable.is_alive.is_(True)
             )
+            .values(is_alive=False, terminated_at=func.now())
+            .returning(SessionsTable.session_id)
+            .execution_options(synchronize_session=False)
+        )
 
-            try:
-                current_session: SessionsTable = (
-                    await tr.execute(current_session_query)
-                ).scalar_one()
-
-            except NoResultFound:
-                return False
-
-            current_session.is_alive = False
-
-            try:
-                await tr.commit()
-
-            except StaleDataError:
-                return False
+        async with self.transaction as tr:
+            terminated_session_id: Optional[str] = await tr.scalar(query)
 
-        return not current_session.is_alive
+        return terminated_session_id is not None
 
     async def terminate_all_sessions(self, user_id: UUID) -> bool:
         async with self.transaction as tr:
             await self._terminate_all_sessions(user_id, tr)
-            await tr.commit()
 
         return True
 
@@ -158,63 +247,94 @@ class UsersRepositorySQLA(UsersRepository):
         :return: Nothing.
         """
         await session.execute(
-            update(SessionsTable).where(SessionsTable.user_id == user_id)
-            .values(is_alive=False)
+            update(SessionsTable).where(
+                and_(SessionsTable.user_id == user_id, SessionsTable.is_alive.is_(True))
+            )
+            .values(is_alive=False, terminated_at=func.now())
         )
 
+    async def list_terminated_sessions(
+        self,
+        terminated_after: datetime,
+        after_session_id: str = "",
+        limit: int = 10_000
+    ) -> list[tuple[datetime, str]]:
+        query: Select[tuple[datetime | None, str]] = (
+            select(SessionsTable.terminated_at, SessionsTable.session_id)
+            .where(
+                tuple_(SessionsTable.terminated_at, SessionsTable.session_id) >
+                tuple_(literal(terminated_after, DateTime(timezone=True)), literal(after_session_id))
+            )
+            .order_by(SessionsTable.terminated_at, SessionsTable.session_id)
+            .limit(limit)
+        )
+
+        async with self.transaction as tr:
+            terminated_sessions: Sequence[Row[tuple[datetime | None, str]]] = (
+                await tr.execute(query)
+            ).all()
+
+        return [
+            (terminated_at, session_id)
+            for terminated_at, session_id in terminated_sessions
+            if terminated_at is not None
+        ]
+
     async def list_users(
-        self, limit: int = 100, offset: int = 0, include_deactivated: bool = False
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        include_deactivated: bool = False,
+        after_user_id: Optional[UUID] = None
     ) -> list[UserDetailed]:
-        query: Select[tuple[UserTable]] = select(UserTable).options(
-            joinedload(UserTable.user_permissions),
-            selectinload(UserTable.assigned_roles)
-        ).limit(limit).offset(offset)
+        # Read-only listing selects only columns of DTO, without building ORM entities
+        query: Select[Any] = (
+            select(*self._user_details_columns())
+            .join(UserPermissionsTable, UserPermissionsTable.user_id == UserTable.user_id)
+            .order_by(UserTable.user_id)
+            .limit(limit)
+            .offset(offset)
+        )
 
         if not include_deactivated:
             query = query.where(UserTable.is_active)
 
+        if after_user_id is not None:
+            query = query.where(UserTable.user_id > after_user_id)
+
         async with self.transaction as tr:
-            users: list[UserDetailed] = []
-            user_records: Sequence[UserTable] = (await tr.scalars(query)).all()
-
-            for user_record in user_records:
-                user_view: UserDetailed = UserDetailed(
-                    user_id=user_record.user_id,
-                    name=user_record.name,
-                    surname=user_record.surname,
-                    third_name=user_record.third_name,
-                    is_active=user_record.is_active,
-                    roles=[
-                        Role(role_id=assigned_role.role_id, role_name=assigned_role.role.role_name)
-                        for assigned_role in user_record.assigned_roles
-                    ],
-                    user_permissions=UserPermissions(
-                        edit_roles=user_record.user_permissions.edit_roles,
-                        view_all_resources=user_record.user_permissions.view_all_resources,
-                        administrate_users=user_record.user_permissions.administrate_users,
-                        administrate_resources=user_record.user_permissions.administrate_resources,
-                    )
-                )
-                users.append(user_view)
+            user_records: Sequence[Row[Any]] = (await tr.execute(query)).all()
 
-        return users
+        return [self._user_details(user_record) for user_record in user_records]
 
-    @staticmethod
-    def _get_user_query(user_id: UUID) -> Select[tuple[UserTable]]:
-        query: Select[tuple[UserTable]] = (
-            select(UserTable)
-            .options(
-                joinedload(UserTable.user_permissions)
-            )
-            .where(UserTable.user_id == user_id)
+    async def export_users(self, include_deactivated: bool = False) -> AsyncGenerator[UserDetailed, None]:
+        query: Select[Any] = (
+            select(*self._user_details_columns())
+            .join(UserPermissionsTable, UserPermissionsTable.user_id == UserTable.user_id)
+            .order_by(UserTable.user_id)
+            .execution_options(yield_per=self.export_batch_size)
         )
 
-        return query
+        if not include_deactivated:
+            query = query.where(UserTable.is_active)
+
+        async with self.transaction as tr:
+            # Rows are read through server-side cursor, one batch at a time
+            user_records: AsyncResult[Any] = await tr.stream(query)
+            try:
+                async for users_batch in user_records.partitions():
+                    for user_record in users_batch:
+                        yield self._user_details(user_record)
+
+            finally:
+                await user_records.close()
 
     async def get_user(self, user_id: UUID) -> UserDetailed:
         async with self.transaction as tr:
-            query: Select[tuple[UserTable]] = self._get_user_query(user_id).options(
-                selectinload(UserTable.assigned_roles)
+            query: Select[tuple[UserTable]] = (
+                select(UserTable)
+                .options(*USER_DETAILS_PROFILE)
+                .where(UserTable.user_id == user_id)
             )
             try:
                 user_record: UserTable = (await tr.execute(query)).scalar_one()
@@ -245,12 +365,8 @@ class UsersRepositorySQLA(UsersRepository):
     async def get_user_by_session(self, session_id: str) -> UserDetailed:
         query: Select[tuple[UserTable]] = (
             select(UserTable)
-            .options(
-                joinedload(UserTable.user_permissions),
-                selectinload(UserTable.assigned_roles)
-            )
+            .options(*USER_DETAILS_PROFILE)
             .join(SessionsTable)
-            .join(UserPermissionsTable)
             .where(
                 and_(
                     SessionsTable.session_id == session_id,
@@ -294,61 +410,38 @@ class UsersRepositorySQLA(UsersRepository):
             await tr.execute(user_termination)
             await self._terminate_all_sessions(user_id, tr)
 
-            await tr.commit()
-
         return True
 
     async def update_user_details(self, user_details: UserUpdate) -> UserDetailed:
-        async with self.transaction as tr:
-            query: Select[tuple[UserTable]] = (
-                self._get_user_query(user_details.user_id)
-                .join(CredentialsTable)
-                .options(
-                    joinedload(UserTable.credentials),
-                    selectinload(UserTable.assigned_roles)
-                )
+        changed_values: dict[str, Any] = user_details.model_dump(
+            include={"name", "surname", "third_name"}, exclude_none=True
+        )
+        query: Update = (
+            update(UserTable)
+            .where(
+                UserTable.user_id == user_details.user_id,
+                UserPermissionsTable.user_id == UserTable.user_id
+            )
+            # Statement must set something, even if only email is changed
+            .values(changed_values or {"name": UserTable.name})
+            .returning(*self._user_details_columns())
+            .execution_options(synchronize_session=False)
+        )
+        if user_details.email is not None:
+            query = query.add_cte(
+                update(CredentialsTable)
+                .where(CredentialsTable.user_id == user_details.user_id)
+                .values(email=str(user_details.email))
+                .cte("updated_credentials")
             )
 
-            try:
-                user_record: UserTable = (await tr.execute(query)).scalar_one()
-
-            except NoResultFound as err:
-                raise NotFoundError("User with provided ID not found") from err
-
-            if user_details.email is not None:
-                user_record.credentials.email = str(user_details.email)
-
-            if user_details.name is not None:
-                user_record.name = user_details.name
-
-            if user_details.surname is not None:
-                user_record.surname = user_details.surname
-
-            if user_details.third_name is not None:
-                user_record.third_name = user_record.third_name
-
-            await tr.commit()
+        async with self.transaction as tr:
+            user_record: Optional[Row[Any]] = (await tr.execute(query)).one_or_none()
 
-        user_view: UserDetailed = UserDetailed(
-            user_id=user_record.user_id,
-            # Fixes for pycharm type warnings
-            name=str(user_record.name),
-            surname=str(user_record.surname),
-            third_name=str(user_record.third_name),
-            is_active=user_record.is_active,
-            roles=[
-                Role(role_id=assigned_role.role_id, role_name=assigned_role.role.role_name)
-                for assigned_role in user_record.assigned_roles
-            ],
-            user_permissions=UserPermissions(
-                edit_roles=user_record.user_permissions.edit_roles,
-                view_all_resources=user_record.user_permissions.view_all_resources,
-                administrate_users=user_record.user_permissions.administrate_users,
-                administrate_resources=user_record.user_permissions.administrate_resources,
-            )
-        )
+        if user_record is None:
+            raise NotFoundError("User with provided ID not found")
 
-        return user_view
+        return self._user_details(user_record)
 
     async def change_user_password(
         self,
@@ -356,13 +449,25 @@ class UsersRepositorySQLA(UsersRepository):
         new_password: str,
         hashing_settings: HashingSettings
     ) -> bool:
+        new_salt: str = secrets.token_hex(16)
+        await self.transaction.release_connection()
+        new_password_hash: str = self._encode_password_hash(
+            hashing_settings,
+            await self._hash_password_in_executor(
+                new_password,
+                new_salt,
+                hashing_settings,
+                self.hashing_executor,
+                self.hashing_metrics
+            )
+        )
+
         async with self.transaction as tr:
             query: Select[tuple[UserTable]] = (
-                self._get_user_query(user_id)
-                .join(CredentialsTable)
-                .options(joinedload(UserTable.credentials))
-            ).where(
-                UserTable.is_active.is_(True)
+                select(UserTable)
+                .join(UserTable.credentials)
+                .options(*USER_CREDENTIALS_PROFILE)
+                .where(UserTable.user_id == user_id, UserTable.is_active.is_(True))
             )
 
             try:
@@ -371,19 +476,73 @@ class UsersRepositorySQLA(UsersRepository):
             except NoResultFound as err:
                 raise NotFoundError("User with provided ID not found") from err
 
-            new_salt: str = secrets.token_hex(16)
-            user_record.credentials.password = self._hash_password(
-                new_password,
-                new_salt,
-                hashing_settings
-            )
-            user_record.credentials.salt = new_salt
-            await self._terminate_all_sessions(user_id, tr)
-
             try:
-                await tr.commit()
+                async with tr.begin_nested():
+                    user_record.credentials.password = new_password_hash
+                    user_record.credentials.salt = new_salt
+                    await self._terminate_all_sessions(user_id, tr)
 
             except IntegrityError:
                 return False
 
         return True
+
+    @staticmethod
+    def _user_details(user_record: Row[Any]) -> UserDetailed:
+        """
+        Builds user details from row of user details columns.
+
+        :param user_record: Row selected with user details columns.
+        :return: User details.
+        """
+        return UserDetailed(
+            user_id=user_record.user_id,
+            name=user_record.name,
+            surname=user_record.surname,
+            third_name=user_record.third_name,
+            is_active=user_record.is_active,
+            roles=[Role(**role) for role in user_record.roles],
+            user_permissions=UserPermissions(**user_record.user_permissions)
+        )
+
+    @staticmethod
+    def _user_details_columns() -> tuple[SQLColumnExpression[Any], ...]:
+        """
+        Columns of user details, which rows are turned into UserDetailed by _user_details.
+
+        Roles and permissions are aggregated into JSON by database, so query
+        must have user permissions table joined.
+
+        :return: Labeled columns.
+        """
+        roles: ScalarSelect[Any] = (
+            select(
+                func.coalesce(
+                    func.json_agg(
+                        func.json_build_object("role_id", RolesTable.role_id, "role_name", RolesTable.role_name)
+                    ),
+                    literal([], JSON)
+                )
+            )
+            .join(AssignedRolesTable, AssignedRolesTable.role_id == RolesTable.role_id)
+            .where(AssignedRolesTable.user_id == UserTable.user_id)
+            .correlate(UserTable)
+            .scalar_subquery()
+        )
+        user_permissions: ColumnElement[Any] = func.json_build_object(
+            "edit_roles", UserPermissionsTable.edit_roles,
+            "view_all_resources", UserPermissionsTable.view_all_resources,
+            "administrate_users", UserPermissionsTable.administrate_users,
+            "administrate_resources", UserPermissionsTable.administrate_resources,
+            type_=JSON
+        )
+
+        return (
+            UserTable.user_id,
+            UserTable.name,
+            UserTable.surname,
+            UserTable.third_name,
+            UserTable.is_active,
+            roles.label("roles"),
+            user_permissions.label("user_permissions"),
+        )
@@ -1,9 +1,14 @@
 from .resource_use_case import ResourceUseCases
+from .revoked_sessions_filter import RevokedSessionsFilter
 from .roles_use_case import RolesUseCases
+from .session_cache import SessionCache, SessionCacheStatistics
 from .user_use_cases import UserUseCases
 
 __all__ = (
     "UserUseCases",
     "RolesUseCases",
-    "ResourceUseCases"
+    "ResourceUseCases",
+    "SessionCache",
+    "SessionCacheStatistics",
+    "RevokedSessionsFilter"
 )
@@ -1,7 +1,11 @@
+from typing import AsyncGenerator, Collection, Sequence
+from uuid import UUID
+
 from demo_api.dto import (
     Resource,
+    ResourceAccessCheck,
+    ResourceAction,
     ResourceDetails,
-    ResourcePermissionsDetails,
     ResourcePermissionsUpdate,
     User,
     UserDetailed,
@@ -28,7 +32,8 @@ class ResourceUseCases:
         self,
         requested_by: UserDetailed,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        after_resource_id: int | None = None
     ) -> list[ResourceDetails]:
         """
         Lists resources.
@@ -36,19 +41,36 @@ class ResourceUseCases:
         :param requested_by: User who requests all resources view.
         :param limit: Limits how many records to fetch.
         :param offset: How many records to skip.
+        :param after_resource_id: Fetch only resources older than this one.
         :return: List of resources with permissions details.
         :raise PermissionError: If user can't view all resources.
         """
         if not requested_by.user_permissions.view_all_resources:
             raise PermissionError("User can't view all resources")
 
-        return await self.resource_repo.list_resources(limit, offset)
+        return await self.resource_repo.list_resources(limit, offset, after_resource_id)
+
+    def export_resources(self, requested_by: UserDetailed) -> AsyncGenerator[ResourceDetails, None]:
+        """
+        Streams all resources.
+
+        Permissions are checked when called, before anything is fetched.
+
+        :param requested_by: User who requests all resources view.
+        :return: Generator of resources with permissions details.
+        :raise PermissionError: If user can't view all resources.
+        """
+        if not requested_by.user_permissions.view_all_resources:
+            raise PermissionError("User can't view all resources")
+
+        return self.resource_repo.export_resources()
 
     async def list_available_resources(
         self,
         requested_by: UserDetailed,
         limit: int = 100,
-        offset: int = 0
+        offset: int = 0,
+        after_resource_id: int | None = None
     ) -> list[ResourceDetails]:
         """
         Lists resources.
@@ -56,11 +78,12 @@ class ResourceUseCases:
         :param requested_by: User who requests resources view.
         :param limit: Limits how many records to fetch.
         :param offset: How many records to skip.
+        :param after_resource_id: Fetch only resources older than this one.
         :return: List of resources with permissions details.
         :raise PermissionError: If user can't view all resources.
         """
         return await self.resource_repo.list_available_resources(
-            requested_by.user_id, limit, offset
+            requested_by.user_id, limit, offset, after_resource_id
         )
 
     async def edit_resource(self, requested_by: UserDetailed, resource_id: int, content: str) -> Resource:
@@ -74,15 +97,10 @@ class ResourceUseCases:
         :raise NotFoundError: If resource is not in database.
         :raise PermissionError: If user can't edit this resource.
         """
-        resource: ResourceDetails = await self.resource_repo.get_resource_by_id(resource_id)
-        can_user_edit_resource: bool = self._check_resource_permissions_for_editing(
-            resource, requested_by
-        )
-
-        if can_user_edit_resource:
+        if requested_by.user_permissions.administrate_resources:
             return await self.resource_repo.edit_resource(resource_id, content)
 
-        raise PermissionError("User does not have access to editing this resource")
+        return await self.resource_repo.edit_resource_if_editable(resource_id, requested_by.user_id, content)
 
     async def get_resource_by_id(self, requested_by: UserDetailed, resource_id: int) -> ResourceDetails:
         """
@@ -94,15 +112,13 @@ class ResourceUseCases:
         :raise NotFoundError: If resource is not in database.
         :raise PermissionError: If user can't view this resource.
         """
-        resource: ResourceDetails = await self.resource_repo.get_resource_by_id(resource_id)
-        can_user_view_resource: bool = self._check_resource_permissions_for_viewing(
-            resource, requested_by
-        )
-
-        if can_user_view_resource:
+        if (
+            requested_by.user_permissions.administrate_resources or
+            requested_by.user_permissions.view_all_resources
+        ):
             return await self.resource_repo.get_resource_by_id(resource_id)
 
-        raise PermissionError("User does not have access to editing this resource")
+        return await self.resource_repo.get_resource_if_viewable(resource_id, requested_by.user_id)
 
     async def set_roles_permissions_on_resource(
         self,
@@ -120,49 +136,83 @@ class ResourceUseCases:
         :raise PermissionError: If user can't edit this resource because of lacking permissions or
         not being an author of the resource.
         """
-        resource: ResourceDetails = await self.resource_repo.get_resource_by_id(resource_id)
         if (
-            resource.author_id != requested_by.user_id or
-            not requested_by.user_permissions.administrate_resources
+            not requested_by.user_permissions.administrate_resources or
+            not await self.resource_repo.is_resource_author(resource_id, requested_by.user_id)
         ):
             raise PermissionError("User can not edit resource access")
 
         return await self.resource_repo.set_roles_permissions_on_resource(resource_id, resource_permissions)
 
-    @staticmethod
-    def _check_resource_permissions_for_editing(resource: ResourceDetails, user: UserDetailed) -> bool:
-        if user.user_permissions.administrate_resources:
-            return True
-
-        can_edit_via_role: bool = False
-        resource_roles: dict[int, ResourcePermissionsDetails] = {
-            role_permissions.role_id: role_permissions
-            for role_permissions in resource.roles_permissions
-        }
-
-        for role in user.roles:
-            found_role = resource_roles.get(role.role_id)
-            if found_role is not None and found_role.can_edit_resource:
-                can_edit_via_role = True
-                break
-
-        return can_edit_via_role
-
-    @staticmethod
-    def _check_resource_permissions_for_viewing(resource: ResourceDetails, user: UserDetailed) -> bool:
-        if user.user_permissions.administrate_resources:
-            return True
-
-        can_view_via_role: bool = False
-        resource_roles: dict[int, ResourcePermissionsDetails] = {
-            role_permissions.role_id: role_permissions
-            for role_permissions in resource.roles_permissions
-        }
-
-        for role in user.roles:
-            found_role = resource_roles.get(role.role_id)
-            if found_role is not None and found_role.can_edit_resource:
-                can_view_via_role = True
-                break
-
-        return can_view_via_role
+    def authorize_access_check(self, requested_by: UserDetailed, user_id: UUID) -> None:
+        """
+        Checks if user can ask about access of another user.
+
+        :param requested_by: User who requests access check.
+        :param user_id: User whose access is checked.
+        :return: Nothing.
+        :raise PermissionError: If user can't check access of other users.
+        """
+        if requested_by.user_id != user_id and not (
+            requested_by.user_permissions.administrate_resources or
+            requested_by.user_permissions.view_all_resources
+        ):
+            raise PermissionError(f"User {requested_by.user_id} can't check access of other users")
+
+    async def check_resources_access(
+        self,
+        requested_by: UserDetailed,
+        user: UserDetailed,
+        resource_ids: Sequence[int],
+        actions: Collection[ResourceAction]
+    ) -> ResourceAccessCheck:
+        """
+        Checks which of resources user can view or edit, using the same rules as fetching and editing them.
+
+        :param requested_by: User who requests access check.
+        :param user: User whose access is checked.
+        :param resource_ids: IDs of resources to check.
+        :param actions: Actions to check.
+        :return: Resources allowed for every action, in order they were passed.
+        :raise PermissionError: If user can't check access of other users.
+        """
+        self.authorize_access_check(requested_by, user.user_id)
+        if not user.is_active:
+            return ResourceAccessCheck(user_id=user.user_id, allowed={action: [] for action in actions})
+
+        unique_resource_ids: list[int] = list(dict.fromkeys(resource_ids))
+        view_all: bool = (
+            user.user_permissions.administrate_resources or user.user_permissions.view_all_resources
+        )
+        edit_all: bool = user.user_permissions.administrate_resources
+        check_view: bool = "view" in actions and not view_all
+        check_edit: bool = "edit" in actions and not edit_all
+
+        viewable: set[int] = set()
+        editable: set[int] = set()
+        if check_view or check_edit:
+            # Access of user by authorship and current roles is fetched for all resources by one statement
+            for resource_id, can_view, can_edit in await self.resource_repo.list_resources_access(
+                user.user_id, unique_resource_ids
+            ):
+                if can_view or can_edit:
+                    viewable.add(resource_id)
+
+                if can_edit:
+                    editable.add(resource_id)
+
+        existing: set[int] = set()
+        if ("view" in actions and view_all) or ("edit" in actions and edit_all):
+            existing.update(await self.resource_repo.filter_existing_resources(unique_resource_ids))
+
+        allowed: dict[ResourceAction, list[int]] = {}
+        for action in actions:
+            if action == "view":
+                granted: set[int] = existing if view_all else viewable
+
+            else:
+                granted = existing if edit_all else editable
+
+            allowed[action] = [resource_id for resource_id in unique_resource_ids if resource_id in granted]
+
+        return ResourceAccessCheck(user_id=user.user_id, allowed=allowed)
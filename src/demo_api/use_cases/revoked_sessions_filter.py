@@ -0,0 +1,240 @@
+import fcntl
+import hashlib
+import math
+import os
+import struct
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Iterator
+
+
+class RevokedSessionsFilter:
+    """
+    Bloom filter of terminated sessions, kept in shared memory,
+    so every worker process on a host can check sessions without database or inter-process calls.
+
+    Filter has no false negatives: session that is not in filter hasn't been terminated
+    as of last refresh, while positive answers must be confirmed by database.
+    Sessions are stored in one of two generations by epoch of their termination, each epoch
+    being as long as session tokens live. Generation is cleared when it's reused two epochs later,
+    since all tokens of sessions in it have expired by then.
+
+    Writes of all processes are serialized by lock file next to segment, so reused generation
+    can't be cleared after another process has put sessions into it and no bits are lost.
+    Segment is removed when last attached process detaches from it.
+    """
+    # Sessions terminated in transactions that committed later than refresh
+    # are fetched by overlapping next refresh with previous one
+    refresh_overlap_in_seconds: float = 60
+
+    # Magic, bits per generation, hash functions count, epoch length, synchronized until
+    _header: struct.Struct = struct.Struct("<8sQQQd")
+    _generation_epoch: struct.Struct = struct.Struct("<q")
+    _attached_count: struct.Struct = struct.Struct("<q")
+    _magic: bytes = b"RVKSESS2"
+    _attached_count_offset: int = 40
+    _generations_offset: int = 48
+    _bits_offset: int = 64
+
+    def __init__(self, memory: SharedMemory, lock_file: int, owner: bool = False):
+        self.memory: SharedMemory = memory
+        self.owner: bool = owner
+        self._lock_file: int = lock_file
+
+        magic, bits, hash_count, epoch_length = self._header.unpack_from(memory.buf)[:4]
+        if magic != self._magic:
+            raise ValueError(f"Shared memory {memory.name!r} does not contain revoked sessions filter")
+
+        self.bits_per_generation: int = bits
+        self.hash_count: int = hash_count
+        self.epoch_length_in_seconds: int = epoch_length
+        self._generation_size: int = bits // 8
+        self._buffer: memoryview = memory.buf
+        self._generation_offsets: tuple[int, int] = (
+            self._bits_offset, self._bits_offset + self._generation_size
+        )
+
+    @classmethod
+    def open(
+        cls,
+        name: str,
+        capacity: int,
+        false_positive_rate: float,
+        epoch_length_in_seconds: int
+    ) -> "RevokedSessionsFilter":
+        """
+        Creates filter in shared memory or attaches to one created by another process.
+
+        Existing filter with different size is replaced, which happens if configuration has changed.
+        Filter must be closed by every process that opened it.
+
+        :param name: Name of shared memory segment.
+        :param capacity: Expected amount of terminated sessions per epoch.
+        :param false_positive_rate: Expected rate of positive answers for alive sessions at capacity.
+        :param epoch_length_in_seconds: How long session tokens live.
+        :return: Filter ready for use.
+        """
+        bits: int = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2 / 8) * 8
+        hash_count: int = max(1, round(bits / capacity * math.log(2)))
+        header: bytes = cls._header.pack(cls._magic, bits, hash_count, epoch_length_in_seconds, 0)
+
+        lock_file: int = os.open(Path(tempfile.gettempdir()) / f"{name}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            # Segment is created, attached to and removed under lock, so it's never removed while in use
+            with _locked(lock_file):
+                try:
+                    memory: SharedMemory = _open_shared_memory(name)
+
+                except FileNotFoundError:
+                    pass
+
+                else:
+                    if bytes(memory.buf[:cls._header.size - 8]) == header[:-8]:
+                        attached_count: int = cls._attached_count.unpack_from(memory.buf, cls._attached_count_offset)[0]
+                        cls._attached_count.pack_into(memory.buf, cls._attached_count_offset, attached_count + 1)
+                        return cls(memory, lock_file)
+
+                    # Processes still attached to replaced filter must not remove new one when they detach
+                    memory.buf[:len(cls._magic)] = bytes(len(cls._magic))
+                    memory.close()
+                    _unlink_shared_memory(memory)
+
+                memory = _open_shared_memory(name, create=True, size=cls._bits_offset + 2 * bits // 8)
+                cls._attached_count.pack_into(memory.buf, cls._attached_count_offset, 1)
+                for generation in range(2):
+                    cls._generation_epoch.pack_into(memory.buf, cls._generations_offset + generation * 8, -1)
+
+                memory.buf[:cls._header.size] = header
+                return cls(memory, lock_file, owner=True)
+
+        except BaseException:
+            os.close(lock_file)
+            raise
+
+    @property
+    def synchronized_until(self) -> float:
+        """
+        Timestamp of latest termination, which was fetched into filter by any process.
+        It's never moved back.
+        """
+        value: float = self._header.unpack_from(self._buffer)[4]
+        return value
+
+    @synchronized_until.setter
+    def synchronized_until(self, timestamp: float) -> None:
+        # Process that has fetched less than another one doesn't move timestamp back
+        with _locked(self._lock_file):
+            if timestamp > self.synchronized_until:
+                struct.pack_into("<d", self._buffer, self._header.size - 8, timestamp)
+
+    def might_be_revoked(self, session_id: str) -> bool:
+        """
+        Checks if session could have been terminated.
+
+        :param session_id: Session identifier.
+        :return: False if session is surely not terminated, otherwise True.
+        """
+        positions: list[int] = self._positions(session_id)
+        buffer: memoryview = self._buffer
+
+        for offset in self._generation_offsets:
+            for position in positions:
+                if not buffer[offset + (position >> 3)] & (1 << (position & 7)):
+                    break
+
+            else:
+                return True
+
+        return False
+
+    def add(self, session_id: str, terminated_at: datetime) -> None:
+        """
+        Puts terminated session into filter.
+
+        :param session_id: Session identifier.
+        :param terminated_at: When session was terminated.
+        :return: Nothing.
+        """
+        epoch: int = int(terminated_at.timestamp() // self.epoch_length_in_seconds)
+        generation: int = epoch % 2
+        epoch_offset: int = self._generations_offset + generation * 8
+        positions: list[int] = self._positions(session_id)
+
+        with _locked(self._lock_file):
+            generation_epoch: int = self._generation_epoch.unpack_from(self._buffer, epoch_offset)[0]
+            if generation_epoch > epoch:
+                # Tokens of this session have already expired
+                return
+
+            offset: int = self._generation_offsets[generation]
+            if generation_epoch < epoch:
+                self._buffer[offset:offset + self._generation_size] = bytes(self._generation_size)
+                self._generation_epoch.pack_into(self._buffer, epoch_offset, epoch)
+
+            buffer: memoryview = self._buffer
+            for position in positions:
+                buffer[offset + (position >> 3)] |= 1 << (position & 7)
+
+    def close(self) -> None:
+        """
+        Detaches from shared memory, removing it if no other process is attached to it.
+
+        :return: Nothing.
+        """
+        try:
+            with _locked(self._lock_file):
+                attached_count: int = self._attached_count.unpack_from(self._buffer, self._attached_count_offset)[0] - 1
+                self._attached_count.pack_into(self._buffer, self._attached_count_offset, attached_count)
+                replaced: bool = bytes(self._buffer[:len(self._magic)]) != self._magic
+
+                self.memory.close()
+                if attached_count == 0 and not replaced:
+                    _unlink_shared_memory(self.memory)
+
+        finally:
+            os.close(self._lock_file)
+
+    def _positions(self, session_id: str) -> list[int]:
+        digest: bytes = hashlib.blake2b(session_id.encode("utf-8"), digest_size=16).digest()
+        first_hash: int = int.from_bytes(digest[:8], "little")
+        second_hash: int = int.from_bytes(digest[8:], "little") | 1
+        bits: int = self.bits_per_generation
+
+        return [(first_hash + index * second_hash) % bits for index in range(self.hash_count)]
+
+
+@contextmanager
+def _locked(lock_file: int) -> Iterator[None]:
+    fcntl.flock(lock_file, fcntl.LOCK_EX)
+    try:
+        yield
+
+    finally:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _open_shared_memory(name: str, create: bool = False, size: int = 0) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, create=create, size=size, track=False)
+
+    memory: SharedMemory = SharedMemory(name, create=create, size=size)
+    # Segment is used by other workers, so it must not be removed when current process exits
+    resource_tracker.unregister(memory._name, "shared_memory")  # type: ignore[attr-defined]
+    return memory
+
+
+def _unlink_shared_memory(memory: SharedMemory) -> None:
+    if sys.version_info < (3, 13):
+        # Unlinking unregisters segment from resource tracker, so it has to be known to it
+        resource_tracker.register(memory._name, "shared_memory")  # type: ignore[attr-defined]
+
+    try:
+        memory.unlink()
+
+    except FileNotFoundError:
+        pass
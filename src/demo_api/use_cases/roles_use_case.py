@@ -1,3 +1,5 @@
+from functools import partial
+from typing import Any
 from uuid import UUID
 
 from demo_api.dto import (
@@ -5,12 +7,20 @@ from demo_api.dto import (
     Role,
     UserDetailed,
 )
-from demo_api.storage.protocol import RolesRepository
+from demo_api.storage.protocol import RolesRepository, TransactionManager
+from .session_cache import SessionCache
 
 
 class RolesUseCases:
-    def __init__(self, roles_repo: RolesRepository):
+    def __init__(
+        self,
+        roles_repo: RolesRepository,
+        transaction: TransactionManager[Any],
+        session_cache: SessionCache | None = None
+    ):
         self.roles_repo: RolesRepository = roles_repo
+        self.transaction: TransactionManager[Any] = transaction
+        self.session_cache: SessionCache | None = session_cache
 
     async def list_roles(self) -> list[Role]:
         """
@@ -47,7 +57,12 @@ class RolesUseCases:
         if not requested_by.user_permissions.edit_roles:
             raise PermissionError(f"User {requested_by.user_id} can't edit roles")
 
-        return await self.roles_repo.update_role(updated_role)
+        role: Role = await self.roles_repo.update_role(updated_role)
+        # Role names are part of cached users, so all of them may be affected
+        if self.session_cache is not None:
+            self.transaction.after_commit(self.session_cache.clear)
+
+        return role
 
     async def delete_role(self, requested_by: UserDetailed, role_id: int) -> bool:
         """
@@ -62,7 +77,11 @@ class RolesUseCases:
         if not requested_by.user_permissions.edit_roles:
             raise PermissionError(f"User {requested_by.user_id} can't edit roles")
 
-        return await self.roles_repo.delete_role(role_id)
+        deleted: bool = await self.roles_repo.delete_role(role_id)
+        if self.session_cache is not None:
+            self.transaction.after_commit(self.session_cache.clear)
+
+        return deleted
 
     async def assign_role_to_user(self, requested_by: UserDetailed, user_id: UUID, role_id: int) -> bool:
         """
@@ -81,7 +100,11 @@ class RolesUseCases:
         if requested_by.user_id == role_id:
             raise PermissionError("User can't update their own roles")
 
-        return await self.roles_repo.assign_role_to_user(user_id, role_id)
+        assigned: bool = await self.roles_repo.assign_role_to_user(user_id, role_id)
+        if self.session_cache is not None:
+            self.transaction.after_commit(partial(self.session_cache.invalidate_user, user_id))
+
+        return assigned
 
     async def remove_role_from_user(self, requested_by: UserDetailed, user_id: UUID, role_id: int) -> bool:
         """
@@ -100,4 +123,8 @@ class RolesUseCases:
         if requested_by.user_id == role_id:
             raise PermissionError("User can't update their own roles")
 
-        return await self.roles_repo.remove_role_from_user(user_id, role_id)
+        removed: bool = await self.roles_repo.remove_role_from_user(user_id, role_id)
+        if self.session_cache is not None:
+            self.transaction.after_commit(partial(self.session_cache.invalidate_user, user_id))
+
+        return removed
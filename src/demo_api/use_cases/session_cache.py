@@ -0,0 +1,161 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+from uuid import UUID
+
+from demo_api.dto import UserDetailed
+
+
+@dataclass(frozen=True)
+class SessionCacheStatistics:
+    """
+    Snapshot of session cache counters.
+    """
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    size: int
+
+
+class SessionCache:
+    """
+    Bounded LRU cache of users by their session identifiers with expiration of entries.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        alive_time_in_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_size: int = max_size
+        self.alive_time_in_seconds: float = alive_time_in_seconds
+        self.clock: Callable[[], float] = clock
+
+        self._entries: OrderedDict[str, tuple[float, UserDetailed]] = OrderedDict()
+        self._sessions_by_user: dict[UUID, set[str]] = {}
+        self._version: int = 0
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self.invalidations: int = 0
+
+    @property
+    def version(self) -> int:
+        """
+        Version of cache contents, which changes on every invalidation.
+
+        Must be read before fetching user from storage and passed into put,
+        so data fetched before invalidation won't be cached.
+        """
+        return self._version
+
+    def get(self, session_id: str) -> UserDetailed | None:
+        """
+        Fetches cached user by session.
+
+        :param session_id: Session identifier.
+        :return: User or nothing if entry is missing or expired.
+        """
+        entry: tuple[float, UserDetailed] | None = self._entries.get(session_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, user = entry
+        if expires_at <= self.clock():
+            self._remove(session_id)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(session_id)
+        self.hits += 1
+        return user
+
+    def put(self, session_id: str, user: UserDetailed, version: int) -> None:
+        """
+        Caches user for session.
+
+        :param session_id: Session identifier.
+        :param user: User information.
+        :param version: Cache version taken before user was fetched.
+        :return: Nothing.
+        """
+        if self.max_size <= 0 or version != self._version:
+            return
+
+        if session_id in self._entries:
+            self._remove(session_id)
+
+        self._entries[session_id] = (self.clock() + self.alive_time_in_seconds, user)
+        self._sessions_by_user.setdefault(user.user_id, set()).add(session_id)
+
+        while len(self._entries) > self.max_size:
+            oldest_session_id: str = next(iter(self._entries))
+            self._remove(oldest_session_id)
+            self.evictions += 1
+
+    def invalidate_session(self, session_id: str) -> None:
+        """
+        Removes session from cache.
+
+        :param session_id: Session identifier.
+        :return: Nothing.
+        """
+        self._version += 1
+        if session_id in self._entries:
+            self._remove(session_id)
+            self.invalidations += 1
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """
+        Removes all sessions of user from cache.
+
+        :param user_id: User identifier.
+        :return: Nothing.
+        """
+        self._version += 1
+        for session_id in tuple(self._sessions_by_user.get(user_id, ())):
+            self._remove(session_id)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """
+        Removes all sessions from cache.
+
+        :return: Nothing.
+        """
+        self._version += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._sessions_by_user.clear()
+
+    def statistics(self) -> SessionCacheStatistics:
+        """
+        Provides current values of cache counters.
+
+        :return: Counters snapshot.
+        """
+        return SessionCacheStatistics(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            invalidations=self.invalidations,
+            size=len(self._entries)
+        )
+
+    def _remove(self, session_id: str) -> None:
+        _, user = self._entries.pop(session_id)
+        user_sessions: set[str] | None = self._sessions_by_user.get(user.user_id)
+
+        if user_sessions is not None:
+            user_sessions.discard(session_id)
+            if not user_sessions:
+                del self._sessions_by_user[user.user_id]
@@ -1,14 +1,29 @@
+import time
+from datetime import datetime, timezone
+from functools import partial
+from typing import Any, AsyncGenerator
 from uuid import UUID
 
 from demo_api.dto import HashingSettings, SessionData, User, UserAuthentication, UserDetailed, UserPermissions
 from demo_api.dto.user_registration import UserRegistration
 from demo_api.dto.user_update import UserUpdate
-from demo_api.storage.protocol import UsersRepository
+from demo_api.storage.protocol import TransactionManager, UsersRepository
+from .revoked_sessions_filter import RevokedSessionsFilter
+from .session_cache import SessionCache
 
 
 class UserUseCases:
-    def __init__(self, user_repo: UsersRepository):
+    def __init__(
+        self,
+        user_repo: UsersRepository,
+        transaction: TransactionManager[Any],
+        session_cache: SessionCache | None = None,
+        revoked_sessions: RevokedSessionsFilter | None = None
+    ):
         self.user_repo: UsersRepository = user_repo
+        self.transaction: TransactionManager[Any] = transaction
+        self.session_cache: SessionCache | None = session_cache
+        self.revoked_sessions: RevokedSessionsFilter | None = revoked_sessions
 
     async def register_user(
         self,
@@ -99,7 +114,11 @@ class UserUseCases:
         :return: Has session been terminated.
         :raise NotFoundError: If session was not found.
         """
-        return await self.user_repo.terminate_session(session_data)
+        terminated: bool = await self.user_repo.terminate_session(session_data)
+        # Until termination is committed, session is alive for other requests, which could cache it again
+        self.transaction.after_commit(partial(self._forget_session, session_data.session_id, terminated))
+
+        return terminated
 
     async def terminate_all_session(self, requested_by: UserDetailed, terminate_on_user_id: UUID) -> bool:
         """
@@ -110,23 +129,26 @@ class UserUseCases:
         :return: Has sessions been successfully terminated.
         :raises PermissionError: If user requesting termination of all sessions don't have permissions.
         """
-        if requested_by.user_id == terminate_on_user_id:
-            return await self.user_repo.terminate_all_sessions(terminate_on_user_id)
-
-        elif requested_by.user_permissions.administrate_users:
-            return await self.user_repo.terminate_all_sessions(terminate_on_user_id)
-
-        else:
+        if (
+            requested_by.user_id != terminate_on_user_id and
+            not requested_by.user_permissions.administrate_users
+        ):
             raise PermissionError(
                 f"User {requested_by.user_id} can't terminate sessions of user {terminate_on_user_id}"
             )
 
+        terminated: bool = await self.user_repo.terminate_all_sessions(terminate_on_user_id)
+        self._invalidate_cached_user(terminate_on_user_id)
+
+        return terminated
+
     async def list_users(
         self,
         requested_by: UserDetailed,
         limit: int = 100,
         offset: int = 0,
-        include_deactivated: bool = False
+        include_deactivated: bool = False,
+        after_user_id: UUID | None = None
     ) -> list[UserDetailed]:
         """
         Lists registered users in system.
@@ -135,13 +157,34 @@ class UserUseCases:
         :param limit: How many records to fetch.
         :param offset: How many records to skip.
         :param include_deactivated: Specifies if deactivated users are included.
+        :param after_user_id: Fetch only users following this one.
         :return: List of users objects.
         :raises PermissionError: If user has not been authorized to administrate users.
         """
         if not requested_by.user_permissions.administrate_users:
             raise PermissionError(f"User {requested_by.user_id} can't view all users")
 
-        return await self.user_repo.list_users(limit, offset, include_deactivated)
+        return await self.user_repo.list_users(limit, offset, include_deactivated, after_user_id)
+
+    def export_users(
+        self,
+        requested_by: UserDetailed,
+        include_deactivated: bool = False
+    ) -> AsyncGenerator[UserDetailed, None]:
+        """
+        Streams all registered users in system.
+
+        Permissions are checked when called, before anything is fetched.
+
+        :param requested_by: Who requests viewing a list of users.
+        :param include_deactivated: Specifies if deactivated users are included.
+        :return: Generator of users objects.
+        :raises PermissionError: If user has not been authorized to administrate users.
+        """
+        if not requested_by.user_permissions.administrate_users:
+            raise PermissionError(f"User {requested_by.user_id} can't view all users")
+
+        return self.user_repo.export_users(include_deactivated)
 
     async def get_user(self, user_id: UUID) -> UserDetailed:
         """
@@ -161,7 +204,19 @@ class UserUseCases:
         :return: Information about user.
         :raise NotFoundError: If users session is not found amongst active sessions.
         """
-        return await self.user_repo.get_user_by_session(session_id)
+        if self.session_cache is None or self.might_be_revoked(session_id):
+            # Session might be terminated by another worker, so cached user can't be trusted
+            return await self.user_repo.get_user_by_session(session_id)
+
+        cached_user: UserDetailed | None = self.session_cache.get(session_id)
+        if cached_user is not None:
+            return cached_user
+
+        cache_version: int = self.session_cache.version
+        user: UserDetailed = await self.user_repo.get_user_by_session(session_id)
+        self.session_cache.put(session_id, user, cache_version)
+
+        return user
 
     async def terminate_user(self, requested_by: UserDetailed, user_id: UUID) -> bool:
         """
@@ -173,17 +228,16 @@ class UserUseCases:
         :raise NotFoundError: If user was not found.
         :raise PermissionError: If user was not authorized to perform termination.
         """
-        if requested_by.user_id == user_id:
-            return await self.user_repo.terminate_user(user_id)
-
-        elif requested_by.user_permissions.administrate_users:
-            return await self.user_repo.terminate_user(user_id)
-
-        else:
+        if requested_by.user_id != user_id and not requested_by.user_permissions.administrate_users:
             raise PermissionError(
                 f"User {requested_by.user_id} can't terminate user {user_id}"
             )
 
+        terminated: bool = await self.user_repo.terminate_user(user_id)
+        self._invalidate_cached_user(user_id)
+
+        return terminated
+
     async def update_user_details(self, requested_by: UserDetailed, user_details: UserUpdate) -> UserDetailed:
         """
         Updates general information about user.
@@ -194,17 +248,19 @@ class UserUseCases:
         :raise NotFoundError: If user was not found.
         :raise PermissionError: If user was not authorized to perform details update.
         """
-        if requested_by.user_id == user_details.user_id:
-            return await self.user_repo.update_user_details(user_details)
-
-        elif requested_by.user_permissions.administrate_users:
-            return await self.user_repo.update_user_details(user_details)
-
-        else:
+        if (
+            requested_by.user_id != user_details.user_id and
+            not requested_by.user_permissions.administrate_users
+        ):
             raise PermissionError(
                 f"User {requested_by.user_id} can't update details of user {user_details.user_id}"
             )
 
+        updated_user: UserDetailed = await self.user_repo.update_user_details(user_details)
+        self._invalidate_cached_user(user_details.user_id)
+
+        return updated_user
+
     async def change_user_password(
         self,
         requested_by: UserDetailed,
@@ -223,17 +279,72 @@ class UserUseCases:
         :raise NotFoundError: If user is not found in database.
         :raise PermissionError: If user can't update password.
         """
-        if requested_by.user_id == user_id:
-            return await self.user_repo.change_user_password(
-                user_id, new_password, hashing_settings
+        if requested_by.user_id != user_id and not requested_by.user_permissions.administrate_users:
+            raise PermissionError(
+                f"User {requested_by.user_id} can't update password of user {user_id}"
             )
 
-        elif requested_by.user_permissions.administrate_users:
-            return await self.user_repo.change_user_password(
-                user_id, new_password, hashing_settings
-            )
+        changed: bool = await self.user_repo.change_user_password(
+            user_id, new_password, hashing_settings
+        )
+        self._invalidate_cached_user(user_id)
 
-        else:
-            raise PermissionError(
-                f"User {requested_by.user_id} can't update password of user {user_id}"
+        return changed
+
+    def might_be_revoked(self, session_id: str) -> bool:
+        """
+        Checks if session could have been terminated by any worker on host.
+
+        :param session_id: Session identifier.
+        :return: False if session is surely alive as of last refresh, otherwise True.
+        """
+        return self.revoked_sessions is not None and self.revoked_sessions.might_be_revoked(session_id)
+
+    async def refresh_revoked_sessions(self, batch_size: int = 10_000) -> int:
+        """
+        Fetches sessions terminated since last refresh into revoked sessions filter.
+
+        :param batch_size: How many sessions are fetched at once.
+        :return: Amount of fetched sessions.
+        """
+        if self.revoked_sessions is None:
+            return 0
+
+        revoked_sessions: RevokedSessionsFilter = self.revoked_sessions
+        # Sessions terminated earlier than token lifetime ago have no valid tokens
+        terminated_after: datetime = datetime.fromtimestamp(
+            max(
+                revoked_sessions.synchronized_until - revoked_sessions.refresh_overlap_in_seconds,
+                time.time() - revoked_sessions.epoch_length_in_seconds
+            ),
+            tz=timezone.utc
+        )
+        after_session_id: str = ""
+        fetched: int = 0
+
+        while True:
+            terminated_sessions: list[tuple[datetime, str]] = await self.user_repo.list_terminated_sessions(
+                terminated_after, after_session_id, batch_size
             )
+            for terminated_at, session_id in terminated_sessions:
+                revoked_sessions.add(session_id, terminated_at)
+
+            fetched += len(terminated_sessions)
+            if terminated_sessions:
+                terminated_after, after_session_id = terminated_sessions[-1]
+                revoked_sessions.synchronized_until = terminated_after.timestamp()
+
+            if len(terminated_sessions) < batch_size:
+                return fetched
+
+    def _forget_session(self, session_id: str, terminated: bool) -> None:
+        if self.session_cache is not None:
+            self.session_cache.invalidate_session(session_id)
+
+        if terminated and self.revoked_sessions is not None:
+            # Other workers on host see termination right away, without waiting for refresh
+            self.revoked_sessions.add(session_id, datetime.now(tz=timezone.utc))
+
+    def _invalidate_cached_user(self, user_id: UUID) -> None:
+        if self.session_cache is not None:
+            self.transaction.after_commit(partial(self.session_cache.invalidate_user, user_id))
@@ -1,26 +1,103 @@
 import tomllib
 from pathlib import Path
+from typing import Literal, Optional, Self
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+DEFAULT_JWT_KEY_ID: str = "default"
 
 
 class DbSettings(BaseModel):
     connection_string: str
+    pool_size: int = Field(default=10, ge=1)
+    pool_max_overflow: int = Field(default=10, ge=0)
+    pool_timeout_in_seconds: float = Field(default=30, gt=0)
+    pool_recycle_in_seconds: int = Field(default=1800, ge=-1)
+    pool_pre_ping: bool = True
+    prepared_statement_cache_size: int = Field(default=100, ge=0)
+    statement_timeout_in_milliseconds: int = Field(default=0, ge=0)
+    transaction_pooling: bool = False
+
+    @model_validator(mode="after")
+    def check_transaction_pooling(self) -> Self:
+        # Startup parameters are rejected by PgBouncer, unless it's configured to ignore them
+        if self.transaction_pooling and self.statement_timeout_in_milliseconds > 0:
+            raise ValueError(
+                "Statement timeout can't be sent on connection with transaction pooling, "
+                "set it for database role instead"
+            )
+
+        return self
+
+
+class JWTSigningKey(BaseModel):
+    kid: str = Field(min_length=1, max_length=64)
+    algorithm: Literal["HS256", "EdDSA"] = "HS256"
+    secret: Optional[str] = Field(default=None, min_length=1)
+    private_key_file: Optional[Path] = None
+
+    @model_validator(mode="after")
+    def check_key_material(self) -> Self:
+        if self.algorithm == "HS256" and self.secret is None:
+            raise ValueError(f"JWT key {self.kid!r} requires secret for HS256")
+
+        if self.algorithm == "EdDSA" and self.private_key_file is None:
+            raise ValueError(f"JWT key {self.kid!r} requires private key file for EdDSA")
+
+        return self
 
 
 class Security(BaseModel):
     password_hash_algorithm: str
     password_hash_iterations: int = Field(ge=1000, lt=1_000_000)
+    password_hashing_workers: int = Field(default=2, ge=1, le=256)
     jwt_signing_secret: str
+    jwt_signing_keys: list[JWTSigningKey] = Field(default_factory=list)
+    jwt_active_key_id: str = DEFAULT_JWT_KEY_ID
+    jwt_retired_key_ids: list[str] = Field(default_factory=list)
     access_token_alive_time_in_seconds: int = Field(ge=600)
+    stateless_access_tokens: bool = False
+    stateless_access_token_alive_time_in_seconds: int = Field(default=300, ge=10)
+    login_queue_size: int = Field(default=64, ge=0)
+    login_attempts_per_address_per_minute: float = Field(default=60, gt=0)
+    login_attempts_burst_per_address: int = Field(default=20, ge=1)
+    login_attempts_per_email_per_minute: float = Field(default=10, gt=0)
+    login_attempts_burst_per_email: int = Field(default=5, ge=1)
+    login_rate_limit_tracked_keys: int = Field(default=100_000, ge=1)
+    session_cache_size: int = Field(default=10_000, ge=0)
+    session_cache_alive_time_in_seconds: int = Field(default=30, ge=1)
+    revoked_sessions_filter_name: str = Field(default="demo_api_revoked_sessions", min_length=1, max_length=30)
+    revoked_sessions_filter_capacity: int = Field(default=1_000_000, ge=0)
+    revoked_sessions_filter_false_positive_rate: float = Field(default=0.001, gt=0, lt=1)
+    revoked_sessions_refresh_interval_in_seconds: float = Field(default=1, gt=0)
     allowed_cors_domains: list[str]
 
+    @model_validator(mode="after")
+    def check_jwt_keys(self) -> Self:
+        key_ids: list[str] = [DEFAULT_JWT_KEY_ID, *(key.kid for key in self.jwt_signing_keys)]
+        if len(key_ids) != len(set(key_ids)):
+            raise ValueError(f"JWT signing keys must have unique ids, different from {DEFAULT_JWT_KEY_ID!r}")
+
+        if self.jwt_active_key_id not in key_ids:
+            raise ValueError("Active JWT signing key is not configured")
+
+        if self.jwt_active_key_id in self.jwt_retired_key_ids:
+            raise ValueError("Active JWT signing key can't be retired")
+
+        return self
+
+
+class MetricsSettings(BaseModel):
+    enabled: bool = False
+    event_loop_lag_interval_in_seconds: float = Field(default=0.5, gt=0)
+
 
 class AppConfig(BaseModel):
     host: str
     port: int = Field(ge=1, le=65_535)
     db_settings: DbSettings
     security: Security
+    metrics: MetricsSettings = Field(default_factory=MetricsSettings)
 
 
 def load_config(path: Path) -> AppConfig:
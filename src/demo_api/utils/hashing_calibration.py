@@ -0,0 +1,190 @@
+import hashlib
+import os
+import re
+import secrets
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from demo_api.dto import HashingSettings
+from demo_api.storage.protocol import UsersRepository
+from demo_api.utils.config_schema import AppConfig
+
+PBKDF2_ALGORITHMS: tuple[str, ...] = ("sha256", "sha512", "sha3-256", "sha3-512")
+SCRYPT_COSTS: tuple[int, ...] = (2 ** 14, 2 ** 15, 2 ** 16, 2 ** 17)
+SCRYPT_BLOCK_SIZE: int = 8
+
+# Bounds of password_hash_iterations in Security settings
+MIN_ITERATIONS: int = 1000
+MAX_ITERATIONS: int = 999_999
+
+
+@dataclass(frozen=True)
+class CalibrationResult:
+    """
+    Hashing parameters and their cost on current host.
+    """
+    name: str
+    parameters: str
+    latency_in_seconds: float
+    iterations: Optional[int] = None
+
+    @property
+    def hashes_per_second_per_core(self) -> float:
+        return 1 / self.latency_in_seconds
+
+
+def measure_latency(hash_password: Callable[[], object], repeats: int = 3) -> float:
+    """
+    Measures median time of hashing.
+
+    :param hash_password: Function hashing password once.
+    :param repeats: How many times hashing is measured.
+    :return: Median latency in seconds.
+    """
+    latencies: list[float] = []
+    for _ in range(repeats):
+        started_at: float = time.perf_counter()
+        hash_password()
+        latencies.append(time.perf_counter() - started_at)
+
+    return statistics.median(latencies)
+
+
+def calibrate_pbkdf2(
+    algorithm: str,
+    target_latency_in_seconds: float,
+    probe_iterations: int = 50_000
+) -> CalibrationResult:
+    """
+    Finds amount of PBKDF2 iterations, which is hashed in target time.
+
+    :param algorithm: Hash algorithm for PBKDF2.
+    :param target_latency_in_seconds: Desired time of hashing one password.
+    :param probe_iterations: Amount of iterations used to estimate cost of one iteration.
+    :return: Iterations, rounded to thousands and limited by configuration bounds, with their latency.
+    """
+    password: str = secrets.token_urlsafe(12)
+    salt: str = secrets.token_hex(16)
+
+    def hash_with(iterations: int) -> Callable[[], object]:
+        settings: HashingSettings = HashingSettings(algorithm, iterations)
+        return lambda: UsersRepository._hash_password(password, salt, settings)
+
+    iteration_latency: float = measure_latency(hash_with(probe_iterations)) / probe_iterations
+    iterations: int = round(target_latency_in_seconds / iteration_latency / 1000) * 1000
+    iterations = min(MAX_ITERATIONS, max(MIN_ITERATIONS, iterations))
+
+    return CalibrationResult(
+        f"pbkdf2_{algorithm}",
+        f"iterations={iterations}",
+        measure_latency(hash_with(iterations)),
+        iterations
+    )
+
+
+def measure_scrypt(cost: int) -> CalibrationResult:
+    """
+    Measures scrypt latency with specified cost.
+
+    :param cost: CPU and memory cost parameter of scrypt.
+    :return: Parameters with their latency.
+    """
+    password: bytes = secrets.token_bytes(12)
+    salt: bytes = secrets.token_bytes(16)
+    memory: int = 128 * cost * SCRYPT_BLOCK_SIZE
+
+    return CalibrationResult(
+        "scrypt",
+        f"n={cost} r={SCRYPT_BLOCK_SIZE} p=1 memory={memory // 2 ** 20}MiB",
+        measure_latency(
+            lambda: hashlib.scrypt(password, salt=salt, n=cost, r=SCRYPT_BLOCK_SIZE, p=1, maxmem=2 * memory)
+        )
+    )
+
+
+def write_iterations(config_path: Path, iterations: int) -> None:
+    """
+    Replaces amount of hashing iterations in configuration file, keeping the rest of it as is.
+
+    :param config_path: Path to configuration file.
+    :param iterations: New amount of iterations.
+    :return: Nothing.
+    :raise ValueError: If configuration has no iterations setting.
+    """
+    config_text: str = config_path.read_text(encoding="utf-8")
+    updated_text, replacements = re.subn(
+        r"^(password_hash_iterations\s*=\s*)\d+",
+        rf"\g<1>{iterations}",
+        config_text,
+        count=1,
+        flags=re.MULTILINE
+    )
+    if replacements == 0:
+        raise ValueError(f"No password_hash_iterations setting found in {config_path}")
+
+    config_path.write_text(updated_text, encoding="utf-8")
+
+
+def calibrate_hashing(
+    config: AppConfig,
+    config_path: Path,
+    target_latency_in_milliseconds: float,
+    write_config: bool = False
+) -> None:
+    """
+    Benchmarks password hashing on current host and reports parameters hitting target latency.
+
+    :param config: Application configuration.
+    :param config_path: Path to configuration file, which is updated if requested.
+    :param target_latency_in_milliseconds: Desired time of hashing one password.
+    :param write_config: Write calibrated iterations of configured algorithm into configuration file.
+    :return: Nothing.
+    """
+    target_latency: float = target_latency_in_milliseconds / 1000
+    cores: int = os.cpu_count() or 1
+    # Workers can't hash faster than there are cores for them
+    workers: int = min(cores, config.security.password_hashing_workers)
+    print(
+        f"Target latency: {target_latency_in_milliseconds:.0f}ms, "
+        f"cores: {cores}, hashing workers: {config.security.password_hashing_workers}"
+    )
+
+    results: dict[str, CalibrationResult] = {}
+    for algorithm in dict.fromkeys((config.security.password_hash_algorithm, *PBKDF2_ALGORITHMS)):
+        try:
+            results[algorithm] = calibrate_pbkdf2(algorithm, target_latency)
+
+        except ValueError:
+            print(f"Algorithm {algorithm!r} is not supported by PBKDF2 on current host")
+
+    scrypt_results: list[CalibrationResult] = [measure_scrypt(cost) for cost in SCRYPT_COSTS]
+
+    print(f"{'scheme':<18} {'parameters':<38} {'latency':>10} {'logins/s per core':>18} {'logins/s by workers':>20}")
+    for result in (*results.values(), *scrypt_results):
+        print(
+            f"{result.name:<18} {result.parameters:<38} {result.latency_in_seconds * 1000:>8.1f}ms "
+            f"{result.hashes_per_second_per_core:>18.1f} {result.hashes_per_second_per_core * workers:>20.1f}"
+        )
+
+    print("scrypt is reported for comparison only, passwords are stored with PBKDF2")
+
+    chosen: CalibrationResult | None = results.get(config.security.password_hash_algorithm)
+    if chosen is None or chosen.iterations is None:
+        print(f"Configured algorithm {config.security.password_hash_algorithm!r} is not available for calibration")
+        return
+
+    iterations: int = chosen.iterations
+    print(
+        f"Chosen for {config.security.password_hash_algorithm}: "
+        f"password_hash_iterations = {iterations} "
+        f"(currently {config.security.password_hash_iterations})"
+    )
+    if iterations in (MIN_ITERATIONS, MAX_ITERATIONS):
+        print("Iterations are limited by configuration bounds, so target latency is not reached")
+
+    if write_config:
+        write_iterations(config_path, iterations)
+        print(f"Written into {config_path}, existing passwords are rehashed on login")
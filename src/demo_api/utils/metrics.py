@@ -0,0 +1,216 @@
+from bisect import bisect_left
+from typing import Callable, Generic, Iterable, Sequence, TypeVar
+
+# Metrics are only changed from event loop thread, so plain attribute updates are safe without locks,
+# and recording a value costs about as much as incrementing a few attributes
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class Counter:
+    """
+    Value, which only grows.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """
+    Value, which goes up and down.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram:
+    """
+    Distribution of observed values over buckets with fixed upper bounds.
+
+    Only bucket, which value falls into, is incremented, and counts are accumulated when rendered.
+    """
+    __slots__ = ("upper_bounds", "bucket_counts", "sum", "count")
+
+    def __init__(self, upper_bounds: Sequence[float]):
+        self.upper_bounds: tuple[float, ...] = tuple(sorted(upper_bounds))
+        # Last bucket holds values above every bound
+        self.bucket_counts: list[int] = [0] * (len(self.upper_bounds) + 1)
+        self.sum: float = 0.0
+        self.count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+MetricT = TypeVar("MetricT", Counter, Gauge, Histogram)
+
+
+class MetricFamily(Generic[MetricT]):
+    """
+    Metrics with same name, which differ by values of labels.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        kind: str,
+        label_names: Sequence[str],
+        factory: Callable[[], MetricT]
+    ):
+        self.name: str = name
+        self.help_text: str = help_text
+        self.kind: str = kind
+        self.label_names: tuple[str, ...] = tuple(label_names)
+        self._factory: Callable[[], MetricT] = factory
+        self._children: dict[tuple[str, ...], MetricT] = {}
+
+    def labels(self, *label_values: str) -> MetricT:
+        """
+        Provides metric for values of labels, creating it on first use.
+
+        :param label_values: Values in order of label names.
+        :return: Metric of these labels.
+        :raise ValueError: If amount of values doesn't match labels.
+        """
+        child: MetricT | None = self._children.get(label_values)
+        if child is None:
+            if len(label_values) != len(self.label_names):
+                raise ValueError(f"Metric {self.name} expects labels {self.label_names}")
+
+            child = self._factory()
+            self._children[label_values] = child
+
+        return child
+
+    def render(self) -> Iterable[str]:
+        """
+        Renders metrics in Prometheus text format.
+
+        :return: Lines of text.
+        """
+        yield f"# HELP {self.name} {_escape(self.help_text, help_text=True)}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for label_values, child in self._children.items():
+            yield from _render_metric(self.name, list(zip(self.label_names, label_values)), child)
+
+
+class MetricsRegistry:
+    """
+    Metrics of process, which are rendered together.
+    """
+
+    def __init__(self) -> None:
+        self._families: dict[str, MetricFamily[Counter] | MetricFamily[Gauge] | MetricFamily[Histogram]] = {}
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> MetricFamily[Counter]:
+        family: MetricFamily[Counter] = MetricFamily(name, help_text, "counter", label_names, Counter)
+        self._register(family)
+        return family
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> MetricFamily[Gauge]:
+        family: MetricFamily[Gauge] = MetricFamily(name, help_text, "gauge", label_names, Gauge)
+        self._register(family)
+        return family
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        upper_bounds: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        label_names: Sequence[str] = ()
+    ) -> MetricFamily[Histogram]:
+        family: MetricFamily[Histogram] = MetricFamily(
+            name, help_text, "histogram", label_names, lambda: Histogram(upper_bounds)
+        )
+        self._register(family)
+        return family
+
+    def render(self) -> str:
+        """
+        Renders all metrics in Prometheus text format.
+
+        :return: Text of metrics.
+        """
+        return "".join(f"{line}\n" for family in self._families.values() for line in family.render())
+
+    def _register(self, family: MetricFamily[Counter] | MetricFamily[Gauge] | MetricFamily[Histogram]) -> None:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} is already registered")
+
+        self._families[family.name] = family
+
+
+def render_value(name: str, kind: str, help_text: str, value: float) -> str:
+    """
+    Renders single metric without labels in Prometheus text format,
+    for values that are read from elsewhere when metrics are requested.
+
+    :param name: Metric name.
+    :param kind: Metric type, such as counter or gauge.
+    :param help_text: Description of metric.
+    :param value: Current value.
+    :return: Text of metric.
+    """
+    return f"# HELP {name} {_escape(help_text, help_text=True)}\n# TYPE {name} {kind}\n{_sample(name, [], value)}\n"
+
+
+def _render_metric(name: str, labels: list[tuple[str, str]], metric: Counter | Gauge | Histogram) -> Iterable[str]:
+    if not isinstance(metric, Histogram):
+        yield _sample(name, labels, metric.value)
+        return
+
+    cumulative_count: int = 0
+    for upper_bound, bucket_count in zip((*metric.upper_bounds, float("inf")), metric.bucket_counts):
+        cumulative_count += bucket_count
+        yield _sample(f"{name}_bucket", [*labels, ("le", _format(upper_bound))], cumulative_count)
+
+    yield _sample(f"{name}_sum", labels, metric.sum)
+    yield _sample(f"{name}_count", labels, metric.count)
+
+
+def _sample(name: str, labels: Sequence[tuple[str, str]], value: float) -> str:
+    if not labels:
+        return f"{name} {_format(value)}"
+
+    rendered_labels: str = ",".join(f'{label}="{_escape(label_value)}"' for label, label_value in labels)
+    return f"{name}{{{rendered_labels}}} {_format(value)}"
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+
+    return repr(value)
+
+
+def _escape(text: str, help_text: bool = False) -> str:
+    text = text.replace("\\", "\\\\").replace("\n", "\\n")
+    return text if help_text else text.replace('"', '\\"')
+
+
+# Registry of current process, which metrics are defined in modules they are recorded in
+REGISTRY: MetricsRegistry = MetricsRegistry()
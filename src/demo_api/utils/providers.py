@@ -1,13 +1,26 @@
-from dishka import Provider, Scope, provide
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, AsyncIterable, Iterable, Optional
+
+from dishka import Provider, Scope, alias, provide
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 
+from demo_api.api.services.app_metrics import PASSWORD_HASHING
+from demo_api.api.services.jwt_key_ring import JWTKeyRing
+from demo_api.api.services.login_admission import LoginAdmissionController
 from demo_api.dto import HashingSettings
-from demo_api.storage.protocol import ResourceRepository, RolesRepository, UsersRepository
+from demo_api.storage.protocol import (
+    PasswordHashingMetrics,
+    ResourceRepository,
+    RolesRepository,
+    TransactionManager,
+    UsersRepository,
+)
+from demo_api.storage.sqla_implementation.engine import ConnectionPoolStatistics, pool_statistics
 from demo_api.storage.sqla_implementation.resource_repository_sqla import ResourceRepositorySQLA
 from demo_api.storage.sqla_implementation.roles_repository_sqla import RolesRepositorySQLA
 from demo_api.storage.sqla_implementation.transaction import TransactionSQLA
 from demo_api.storage.sqla_implementation.users_repository_sqla import UsersRepositorySQLA
-from demo_api.use_cases import ResourceUseCases, RolesUseCases, UserUseCases
+from demo_api.use_cases import ResourceUseCases, RevokedSessionsFilter, RolesUseCases, SessionCache, UserUseCases
 from demo_api.utils.config_schema import AppConfig
 
 
@@ -20,7 +33,7 @@ class AppConfigProvider(Provider):
         super().__init__()
         self.app_config: AppConfig = app_config
 
-    @provide(scope=Scope.REQUEST)
+    @provide(scope=Scope.APP)
     def get_app_config(self) -> AppConfig:
         return self.app_config
 
@@ -31,6 +44,28 @@ class AppConfigProvider(Provider):
             app_config.security.password_hash_iterations
         )
 
+    @provide(scope=Scope.APP)
+    def get_jwt_key_ring(self, app_config: AppConfig) -> JWTKeyRing:
+        return JWTKeyRing.from_config(app_config.security)
+
+    @provide(scope=Scope.APP)
+    def get_login_admission_controller(self, app_config: AppConfig) -> LoginAdmissionController:
+        return LoginAdmissionController.from_config(app_config.security)
+
+    @provide(scope=Scope.APP)
+    def get_password_hashing_metrics(self, app_config: AppConfig) -> Optional[PasswordHashingMetrics]:
+        if not app_config.metrics.enabled:
+            return None
+
+        return PASSWORD_HASHING
+
+    @provide(scope=Scope.APP)
+    def get_hashing_executor(self) -> Iterable[Executor]:
+        with ProcessPoolExecutor(
+            max_workers=self.app_config.security.password_hashing_workers
+        ) as executor:
+            yield executor
+
 
 class DatabaseSQLAReposProvider(Provider):
     def __init__(self, engine: AsyncEngine):
@@ -44,12 +79,29 @@ class DatabaseSQLAReposProvider(Provider):
         )
 
     @provide(scope=Scope.REQUEST)
-    def get_transaction_manager(self) -> TransactionSQLA:
-        return TransactionSQLA(self.session_maker)
+    async def get_transaction_manager(self) -> AsyncIterable[TransactionSQLA]:
+        # Shared by all repositories of a request and committed once request is handled
+        transaction: TransactionSQLA = TransactionSQLA(self.session_maker, commit_on_exit=False)
+        try:
+            yield transaction
+
+        finally:
+            await transaction.close()
+
+    transaction_manager = alias(source=TransactionSQLA, provides=TransactionManager[Any])
+
+    @provide(scope=Scope.REQUEST)
+    def get_connection_pool_statistics(self) -> ConnectionPoolStatistics:
+        return pool_statistics(self.engine)
 
     @provide(scope=Scope.REQUEST)
-    def get_users_repository(self, transaction: TransactionSQLA) -> UsersRepository:
-        return UsersRepositorySQLA(transaction)
+    def get_users_repository(
+        self,
+        transaction: TransactionSQLA,
+        hashing_executor: Executor,
+        hashing_metrics: Optional[PasswordHashingMetrics]
+    ) -> UsersRepository:
+        return UsersRepositorySQLA(transaction, hashing_executor, hashing_metrics)
 
     @provide(scope=Scope.REQUEST)
     def get_roles_repository(self, transaction: TransactionSQLA) -> RolesRepository:
@@ -61,13 +113,49 @@ class DatabaseSQLAReposProvider(Provider):
 
 
 class UseCaseProvider(Provider):
+    @provide(scope=Scope.APP)
+    def get_session_cache(self, app_config: AppConfig) -> SessionCache:
+        return SessionCache(
+            app_config.security.session_cache_size,
+            app_config.security.session_cache_alive_time_in_seconds
+        )
+
+    @provide(scope=Scope.APP)
+    def get_revoked_sessions_filter(self, app_config: AppConfig) -> Iterable[Optional[RevokedSessionsFilter]]:
+        if app_config.security.revoked_sessions_filter_capacity == 0:
+            yield None
+            return
+
+        revoked_sessions: RevokedSessionsFilter = RevokedSessionsFilter.open(
+            app_config.security.revoked_sessions_filter_name,
+            app_config.security.revoked_sessions_filter_capacity,
+            app_config.security.revoked_sessions_filter_false_positive_rate,
+            app_config.security.access_token_alive_time_in_seconds
+        )
+        try:
+            yield revoked_sessions
+
+        finally:
+            revoked_sessions.close()
+
     @provide(scope=Scope.REQUEST)
-    def get_user_use_case(self, user_repo: UsersRepository) -> UserUseCases:
-        return UserUseCases(user_repo)
+    def get_user_use_case(
+        self,
+        user_repo: UsersRepository,
+        transaction: TransactionManager[Any],
+        session_cache: SessionCache,
+        revoked_sessions: Optional[RevokedSessionsFilter]
+    ) -> UserUseCases:
+        return UserUseCases(user_repo, transaction, session_cache, revoked_sessions)
 
     @provide(scope=Scope.REQUEST)
-    def get_roles_use_case(self, roles_repo: RolesRepository) -> RolesUseCases:
-        return RolesUseCases(roles_repo)
+    def get_roles_use_case(
+        self,
+        roles_repo: RolesRepository,
+        transaction: TransactionManager[Any],
+        session_cache: SessionCache
+    ) -> RolesUseCases:
+        return RolesUseCases(roles_repo, transaction, session_cache)
 
     @provide(scope=Scope.REQUEST)
     def get_resource_use_case(self, resource_repo: ResourceRepository) -> ResourceUseCases:
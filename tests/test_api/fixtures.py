@@ -0,0 +1,52 @@
+import asyncio
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+
+from demo_api.api.server import setup_app
+from demo_api.dto import HashingSettings, User, UserPermissions
+from demo_api.dto.user_registration import UserRegistration
+from demo_api.storage.sqla_implementation.transaction import TransactionSQLA
+from demo_api.storage.sqla_implementation.users_repository_sqla import UsersRepositorySQLA
+from demo_api.utils.config_schema import AppConfig
+from test_storage.fixtures import config, generate_credentials, hashing_settings # noqa: reexported fixtures
+
+
+@pytest.fixture(scope="module")
+def client(config: AppConfig) -> Iterator[TestClient]:
+    # Session cookies are only sent over https
+    with TestClient(setup_app(config), base_url="https://testserver") as client:
+        yield client
+
+
+def register_user(
+    config: AppConfig,
+    hashing_settings: HashingSettings,
+    credentials: UserRegistration,
+    permissions: UserPermissions
+) -> User:
+    async def register() -> User:
+        engine: AsyncEngine = create_async_engine(config.db_settings.connection_string)
+        try:
+            users_repo: UsersRepositorySQLA = UsersRepositorySQLA(
+                TransactionSQLA(async_sessionmaker(engine, expire_on_commit=False))
+            )
+            return await users_repo.register_user(
+                credentials,
+                permissions,
+                hashing_settings
+            )
+
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(register())
+
+
+def login(client: TestClient, credentials: UserRegistration) -> None:
+    response = client.post("/api/login", json={"email": credentials.email, "password": credentials.password})
+    assert response.status_code == 200
+
+
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from demo_api.api.services.authentication_service import (
+    AccessTokenPayload,
+    UserAuthenticatedData,
+    encode_user_access_token,
+    encode_user_session_token,
+)
+from demo_api.api.services.jwt_key_ring import JWTKeyRing
+from demo_api.dto import Role, SessionData, UserDetailed, UserPermissions
+from demo_api.utils.config_schema import AppConfig, load_config
+
+
+@pytest.fixture(scope="module")
+def app_config() -> AppConfig:
+    return load_config(Path(__file__).parent.parent / "test_config.toml")
+
+
+@pytest.fixture()
+def authenticated_data() -> UserAuthenticatedData:
+    user_id = uuid4()
+    return UserAuthenticatedData(
+        user=UserDetailed(
+            user_id=user_id,
+            name="Name",
+            surname="Surname",
+            third_name=None,
+            is_active=True,
+            roles=[Role(role_id=1, role_name="admin")],
+            user_permissions=UserPermissions(administrate_users=True)
+        ),
+        session=SessionData(
+            user_id=user_id,
+            created_at=datetime.now(tz=timezone.utc),
+            session_id="0" * 32,
+            is_alive=True
+        )
+    )
+
+
+def test_access_token_carries_permissions_and_roles(
+    app_config: AppConfig,
+    authenticated_data: UserAuthenticatedData
+):
+    key_ring: JWTKeyRing = JWTKeyRing.from_config(app_config.security)
+    token, _ = encode_user_access_token(app_config, key_ring, authenticated_data)
+
+    payload: AccessTokenPayload = AccessTokenPayload.model_validate(key_ring.decode(token))
+
+    assert payload.user == authenticated_data.user
+    assert payload.session == authenticated_data.session
+
+
+def test_access_token_lifetime_is_separate(
+    app_config: AppConfig,
+    authenticated_data: UserAuthenticatedData
+):
+    key_ring: JWTKeyRing = JWTKeyRing.from_config(app_config.security)
+    _, session_expires_at = encode_user_session_token(app_config, key_ring, authenticated_data.session)
+    _, access_expires_at = encode_user_access_token(app_config, key_ring, authenticated_data)
+
+    assert access_expires_at < session_expires_at
+
+
+def test_session_token_is_not_accepted_as_access_token(
+    app_config: AppConfig,
+    authenticated_data: UserAuthenticatedData
+):
+    key_ring: JWTKeyRing = JWTKeyRing.from_config(app_config.security)
+    token, _ = encode_user_session_token(app_config, key_ring, authenticated_data.session)
+
+    with pytest.raises(ValidationError):
+        AccessTokenPayload.model_validate(key_ring.decode(token))
@@ -0,0 +1,73 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from demo_api.api.server import setup_app
+from demo_api.dto import HashingSettings, User, UserPermissions
+from demo_api.dto.user_registration import UserRegistration
+from demo_api.utils.config_schema import AppConfig
+from .fixtures import *
+
+
+def test_checking_own_access(config: AppConfig, hashing_settings: HashingSettings, client: TestClient):
+    credentials: UserRegistration = generate_credentials()
+    user: User = register_user(config, hashing_settings, credentials, UserPermissions())
+    login(client, credentials)
+    resource_id: int = client.post("/api/resources", params={"content": "Hello world"}).json()["resource_id"]
+
+    response = client.post(
+        "/api/authz/check", json={"resource_ids": [resource_id, -1], "actions": ["view", "edit"]}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "user_id": str(user.user_id),
+        "allowed": {"view": [resource_id], "edit": [resource_id]}
+    }
+
+
+def test_checking_access_of_other_users(config: AppConfig, hashing_settings: HashingSettings, client: TestClient):
+    other_user: User = register_user(config, hashing_settings, generate_credentials(), UserPermissions())
+    credentials: UserRegistration = generate_credentials()
+    register_user(config, hashing_settings, credentials, UserPermissions())
+    login(client, credentials)
+
+    # Existence of users isn't revealed to users, who can't check them
+    for user_id in (other_user.user_id, uuid.uuid4()):
+        response = client.post("/api/authz/check", json={"user_id": str(user_id), "resource_ids": [1]})
+        assert response.status_code == 403
+
+    viewer_credentials: UserRegistration = generate_credentials()
+    register_user(config, hashing_settings, viewer_credentials, UserPermissions(view_all_resources=True))
+    login(client, viewer_credentials)
+
+    response = client.post("/api/authz/check", json={"user_id": str(other_user.user_id), "resource_ids": [1]})
+    assert response.status_code == 200
+    assert response.json() == {"user_id": str(other_user.user_id), "allowed": {"view": []}}
+
+    response = client.post("/api/authz/check", json={"user_id": str(uuid.uuid4()), "resource_ids": [1]})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"resource_ids": []},
+        {"resource_ids": list(range(1001))},
+        {"resource_ids": [1], "actions": []},
+        {"resource_ids": [1], "actions": ["delete"]},
+        {"resource_ids": [1], "user_id": "not a user"},
+    ]
+)
+def test_check_request_is_validated(config: AppConfig, hashing_settings: HashingSettings, client: TestClient, body: dict):
+    credentials: UserRegistration = generate_credentials()
+    register_user(config, hashing_settings, credentials, UserPermissions())
+    login(client, credentials)
+
+    assert client.post("/api/authz/check", json=body).status_code == 422
+
+
+def test_checking_access_requires_session(config: AppConfig):
+    with TestClient(setup_app(config), base_url="https://testserver") as client:
+        assert client.post("/api/authz/check", json={"resource_ids": [1]}).status_code == 401
@@ -0,0 +1,52 @@
+import json
+import uuid
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+
+from demo_api.api.server import setup_app
+from demo_api.api.services.dto_response import DTOResponse
+from demo_api.dto import ResourceDetails, ResourcePermissionsDetails, Role, UserDetailed, UserPermissions
+from demo_api.utils.config_schema import load_config
+
+
+def make_user() -> UserDetailed:
+    return UserDetailed(
+        user_id=uuid.uuid4(),
+        name="Name",
+        surname="Surname",
+        third_name=None,
+        is_active=True,
+        roles=[Role(role_id=1, role_name="role")],
+        user_permissions=UserPermissions(view_all_resources=True)
+    )
+
+
+def test_dto_is_encoded_same_as_by_fastapi():
+    user: UserDetailed = make_user()
+    resources: list[ResourceDetails] = [
+        ResourceDetails(
+            resource_id=resource_id,
+            author_id=user.user_id,
+            content="Привет",
+            roles_permissions=[
+                ResourcePermissionsDetails(role_id=1, role_name="role", can_view_resource=True, can_edit_resource=False)
+            ]
+        )
+        for resource_id in range(3)
+    ]
+
+    for content in (user, resources):
+        response: DTOResponse = DTOResponse(content, headers={"X-Next-Cursor": "cursor"})
+        assert json.loads(response.body) == jsonable_encoder(content)
+        assert response.headers["content-type"] == "application/json"
+        assert response.headers["x-next-cursor"] == "cursor"
+
+
+def test_endpoints_keep_response_models_in_schema():
+    app = setup_app(load_config(Path(__file__).parent.parent / "test_config.toml"))
+    paths: dict = app.openapi()["paths"]
+
+    current_user_schema: dict = paths["/api/users/me"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert current_user_schema["schema"] == {"$ref": "#/components/schemas/UserDetailed"}
+    assert "application/x-ndjson" in paths["/api/users/export"]["get"]["responses"]["200"]["content"]
@@ -0,0 +1,156 @@
+import asyncio
+import json
+from typing import Any
+
+import anyio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from demo_api.dto import HashingSettings, UserPermissions
+from demo_api.dto.user_registration import UserRegistration
+from demo_api.storage.sqla_implementation.engine import ConnectionPoolStatistics
+from demo_api.storage.sqla_implementation.tables.resources_table import ResourceTable
+from demo_api.storage.sqla_implementation.tables.user_table import UserTable
+from demo_api.utils.config_schema import AppConfig
+from .fixtures import *
+
+EXPORTS: list[tuple[str, UserPermissions]] = [
+    ("/api/users/export", UserPermissions(administrate_users=True)),
+    ("/api/resources/export", UserPermissions(view_all_resources=True)),
+]
+
+
+def count_records(config: AppConfig, table: Any) -> int:
+    async def count() -> int:
+        engine: AsyncEngine = create_async_engine(config.db_settings.connection_string)
+        try:
+            async with engine.connect() as connection:
+                records_count: int = (await connection.execute(select(func.count()).select_from(table))).scalar_one()
+                return records_count
+
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(count())
+
+
+def login_with_permissions(
+    config: AppConfig,
+    hashing_settings: HashingSettings,
+    client: TestClient,
+    permissions: UserPermissions
+) -> None:
+    credentials: UserRegistration = generate_credentials()
+    register_user(config, hashing_settings, credentials, permissions)
+    login(client, credentials)
+    # Exported resources must exist
+    assert client.post("/api/resources", params={"content": "Exported"}).status_code == 201
+
+
+async def connection_pool_statistics(app: FastAPI) -> ConnectionPoolStatistics:
+    async with app.state.dishka_container() as request_container:
+        statistics: ConnectionPoolStatistics = await request_container.get(ConnectionPoolStatistics)
+        return statistics
+
+
+@pytest.mark.parametrize("path", [path for path, _ in EXPORTS])
+def test_export_is_forbidden_before_streaming(
+    config: AppConfig,
+    hashing_settings: HashingSettings,
+    client: TestClient,
+    path: str
+):
+    login_with_permissions(config, hashing_settings, client, UserPermissions())
+
+    with client.stream("GET", path) as response:
+        assert response.status_code == 403
+        # Error is returned instead of stream, not after its first lines
+        assert response.headers["content-type"] == "application/json"
+        assert "detail" in json.loads(response.read())
+
+
+@pytest.mark.parametrize(("path", "table"), [("/api/users/export", UserTable), ("/api/resources/export", ResourceTable)])
+def test_export_streams_every_record(
+    config: AppConfig,
+    hashing_settings: HashingSettings,
+    client: TestClient,
+    path: str,
+    table: Any
+):
+    permissions: UserPermissions = dict(EXPORTS)[path]
+    login_with_permissions(config, hashing_settings, client, permissions)
+
+    with client.stream("GET", path, params={"include_deactivated": True}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines: list[str] = list(response.iter_lines())
+
+    assert len(lines) == count_records(config, table)
+    assert all(json.loads(line) for line in lines)
+
+
+@pytest.mark.parametrize(("path", "permissions"), EXPORTS)
+def test_connection_is_released_when_client_disconnects(
+    config: AppConfig,
+    hashing_settings: HashingSettings,
+    client: TestClient,
+    path: str,
+    permissions: UserPermissions
+):
+    login_with_permissions(config, hashing_settings, client, permissions)
+    app: FastAPI = client.app  # type: ignore[assignment]
+    scope: dict[str, Any] = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "https",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"cookie", "; ".join(f"{name}={value}" for name, value in client.cookies.items()).encode()),
+        ],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 443),
+        "state": {},
+    }
+
+    # TestClient reads whole response before returning it, so application is called directly
+    async def export_and_disconnect() -> tuple[list[bytes], ConnectionPoolStatistics, ConnectionPoolStatistics]:
+        first_line_sent: anyio.Event = anyio.Event()
+        requested: bool = False
+        sent: list[bytes] = []
+        statistics: list[ConnectionPoolStatistics] = []
+
+        async def receive() -> dict[str, Any]:
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            await first_line_sent.wait()
+            statistics.append(await connection_pool_statistics(app))
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.body" and message.get("body"):
+                sent.append(message["body"])
+                first_line_sent.set()
+
+        with anyio.fail_after(10):
+            await app(scope, receive, send)
+
+        return sent, statistics[0], await connection_pool_statistics(app)
+
+    sent, streaming_statistics, disconnected_statistics = client.portal.call(export_and_disconnect)  # type: ignore[union-attr]
+
+    # Stream has been stopped while it was fetching
+    assert len(sent) < count_records(config, UserTable if path == "/api/users/export" else ResourceTable)
+    assert streaming_statistics.checked_out == 1
+    assert disconnected_statistics.checked_out == 0
@@ -0,0 +1,124 @@
+import hashlib
+from pathlib import Path
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, NoEncryption, PrivateFormat
+from fastapi.testclient import TestClient
+from jwt import PyJWK
+from pydantic import ValidationError
+
+from demo_api.api.server import setup_app
+from demo_api.api.services.jwt_key_ring import JWTKeyRing
+from demo_api.utils.config_schema import AppConfig, JWTSigningKey, Security, load_config
+
+
+@pytest.fixture(scope="module")
+def security() -> Security:
+    return load_config(Path(__file__).parent.parent / "test_config.toml").security
+
+
+def rotated(security: Security, **changes) -> Security:
+    return Security.model_validate(security.model_dump() | changes)
+
+
+def test_token_is_signed_with_active_key(security: Security):
+    key_ring: JWTKeyRing = JWTKeyRing.from_config(security)
+    token: str = key_ring.encode({"data": "value"})
+
+    assert jwt.get_unverified_header(token)["kid"] == "default"
+    assert key_ring.decode(token)["data"] == "value"
+
+
+def test_legacy_token_without_key_id_is_accepted(security: Security):
+    token: str = jwt.encode(
+        {"data": "value"},
+        hashlib.sha256(security.jwt_signing_secret.encode("utf-8")).hexdigest(),
+        algorithm="HS256"
+    )
+
+    assert JWTKeyRing.from_config(security).decode(token)["data"] == "value"
+
+
+def test_tokens_of_previous_key_are_accepted_after_rotation(security: Security):
+    old_token: str = JWTKeyRing.from_config(security).encode({"data": "old"})
+    key_ring: JWTKeyRing = JWTKeyRing.from_config(
+        rotated(
+            security,
+            jwt_signing_keys=[JWTSigningKey(kid="new", secret="NEW_SECRET").model_dump()],
+            jwt_active_key_id="new"
+        )
+    )
+
+    new_token: str = key_ring.encode({"data": "new"})
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert key_ring.decode(old_token)["data"] == "old"
+    assert key_ring.decode(new_token)["data"] == "new"
+
+
+def test_tokens_of_retired_key_are_rejected(security: Security):
+    old_token: str = JWTKeyRing.from_config(security).encode({"data": "old"})
+    key_ring: JWTKeyRing = JWTKeyRing.from_config(
+        rotated(
+            security,
+            jwt_signing_keys=[JWTSigningKey(kid="new", secret="NEW_SECRET").model_dump()],
+            jwt_active_key_id="new",
+            jwt_retired_key_ids=["default"]
+        )
+    )
+
+    with pytest.raises(jwt.InvalidTokenError):
+        key_ring.decode(old_token)
+
+
+def test_active_key_can_not_be_retired(security: Security):
+    with pytest.raises(ValidationError):
+        rotated(security, jwt_retired_key_ids=["default"])
+
+
+@pytest.fixture()
+def ed25519_key_file(tmp_path: Path) -> Path:
+    key_file: Path = tmp_path / "jwt_ed25519.pem"
+    key_file.write_bytes(
+        Ed25519PrivateKey.generate().private_bytes(
+            Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()
+        )
+    )
+    return key_file
+
+
+def test_eddsa_tokens_are_verifiable_with_published_key(security: Security, ed25519_key_file: Path):
+    key_ring: JWTKeyRing = JWTKeyRing.from_config(
+        rotated(
+            security,
+            jwt_signing_keys=[
+                JWTSigningKey(kid="ed", algorithm="EdDSA", private_key_file=ed25519_key_file).model_dump()
+            ],
+            jwt_active_key_id="ed"
+        )
+    )
+    token: str = key_ring.encode({"data": "value"})
+
+    assert [key["kid"] for key in key_ring.public_keys] == ["ed"]
+    public_key = PyJWK.from_dict(key_ring.public_keys[0])
+    assert jwt.decode(token, public_key, algorithms=["EdDSA"])["data"] == "value"
+    assert key_ring.decode(token)["data"] == "value"
+
+
+def test_json_web_key_set_endpoint(security: Security, ed25519_key_file: Path):
+    config: AppConfig = load_config(Path(__file__).parent.parent / "test_config.toml")
+    config.security = rotated(
+        security,
+        jwt_signing_keys=[
+            JWTSigningKey(kid="ed", algorithm="EdDSA", private_key_file=ed25519_key_file).model_dump()
+        ]
+    )
+
+    with TestClient(setup_app(config)) as client:
+        response = client.get("/api/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert [key["kid"] for key in response.json()["keys"]] == ["ed"]
+    assert "secret" not in response.text
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from demo_api.api.exceptions import HashingQueueFull, TooManyRequests
+from demo_api.api.services.login_admission import LoginAdmissionController, TokenBuckets
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def make_controller(clock: FakeClock, queue_size: int = 1) -> LoginAdmissionController:
+    return LoginAdmissionController(
+        concurrency=1,
+        queue_size=queue_size,
+        per_address=TokenBuckets(rate_per_second=1, burst=2, max_keys=10, clock=clock),
+        per_email=TokenBuckets(rate_per_second=1, burst=2, max_keys=10, clock=clock),
+        clock=clock
+    )
+
+
+def test_token_bucket_refills_over_time(clock: FakeClock):
+    buckets: TokenBuckets = TokenBuckets(rate_per_second=0.5, burst=1, max_keys=10, clock=clock)
+
+    assert buckets.try_acquire("key") == 0
+    assert buckets.try_acquire("key") == pytest.approx(2)
+
+    clock.now = 2
+    assert buckets.try_acquire("key") == 0
+
+
+def test_token_buckets_are_bounded(clock: FakeClock):
+    buckets: TokenBuckets = TokenBuckets(rate_per_second=1, burst=1, max_keys=1, clock=clock)
+
+    buckets.try_acquire("first")
+    buckets.try_acquire("second")
+
+    assert buckets.try_acquire("first") == 0
+
+
+async def test_attempts_are_limited_per_email(clock: FakeClock):
+    controller: LoginAdmissionController = make_controller(clock)
+
+    for address in ("10.0.0.1", "10.0.0.2"):
+        async with controller.admit(address, "user@example.com"):
+            pass
+
+    with pytest.raises(TooManyRequests) as err:
+        async with controller.admit("10.0.0.3", "USER@example.com"):
+            pass
+
+    assert err.value.status_code == 429
+    assert controller.statistics().rate_limited == 1
+
+
+async def test_attempts_over_queue_size_are_rejected(clock: FakeClock):
+    controller: LoginAdmissionController = make_controller(clock)
+    release: asyncio.Event = asyncio.Event()
+
+    async def login(address: str) -> None:
+        async with controller.admit(address, f"{address}@example.com"):
+            await release.wait()
+
+    running: asyncio.Task[None] = asyncio.create_task(login("10.0.0.1"))
+    waiting: asyncio.Task[None] = asyncio.create_task(login("10.0.0.2"))
+    await asyncio.sleep(0)
+    assert controller.statistics().queue_depth == 1
+
+    with pytest.raises(HashingQueueFull):
+        await login("10.0.0.3")
+
+    clock.now = 0.5
+    release.set()
+    await asyncio.gather(running, waiting)
+
+    statistics = controller.statistics()
+    assert statistics.admitted == 2
+    assert statistics.rejected_by_full_queue == 1
+    assert statistics.queue_depth == 0
+    assert statistics.max_wait_time_in_seconds == pytest.approx(0.5)
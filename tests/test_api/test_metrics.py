@@ -0,0 +1,86 @@
+import secrets
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from demo_api.api.server import setup_app
+from demo_api.api.services.app_metrics import (
+    PASSWORD_HASHING,
+    POOL_CHECKOUT_WAIT,
+    REQUEST_DURATION,
+    MetricsMiddleware,
+)
+from demo_api.utils.config_schema import AppConfig, load_config
+
+
+def test_requests_are_labeled_by_route_template():
+    app: FastAPI = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics_test/items/{item_id}")
+    async def get_item(item_id: int) -> int:
+        return item_id
+
+    with TestClient(app) as client:
+        client.get("/metrics_test/items/1")
+        client.get("/metrics_test/items/2")
+        client.get("/metrics_test/missing")
+
+    assert REQUEST_DURATION.labels("GET", "/metrics_test/items/{item_id}", "200").count == 2
+    assert REQUEST_DURATION.labels("GET", "unmatched", "404").count >= 1
+
+
+def test_metrics_endpoint():
+    config: AppConfig = load_config(Path(__file__).parent.parent / "test_config.toml")
+
+    with TestClient(setup_app(config)) as client:
+        client.get("/api/users/me")
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/users/me",status="401"}' in response.text
+    for name in (
+        "http_requests_in_flight",
+        "db_pool_checkout_wait_seconds_count",
+        "db_queries_per_request_count",
+        "password_hashing_duration_seconds_count",
+        "password_hashing_in_progress",
+        "session_cache_hit_ratio",
+        "event_loop_lag_seconds_count",
+    ):
+        assert f"\n{name}" in response.text
+
+
+def test_metrics_can_be_disabled():
+    config: AppConfig = load_config(Path(__file__).parent.parent / "test_config.toml")
+    config.metrics.enabled = False
+
+    recorded: tuple[int, int, int] = (
+        POOL_CHECKOUT_WAIT.count,
+        PASSWORD_HASHING.duration.count,
+        REQUEST_DURATION.labels("POST", "/api/login", "200").count
+    )
+
+    email: str = f"metrics_{secrets.token_hex(4)}@example.com"
+    password: str = f"DemoPass12{secrets.token_urlsafe(5)}"
+    with TestClient(setup_app(config), base_url="https://testserver") as client:
+        assert client.get("/metrics").status_code == 404
+        response = client.post(
+            "/api/register",
+            json={
+                "email": email, "name": "Metrics", "surname": "Disabled", "third_name": None,
+                "password": password, "password_again": password
+            }
+        )
+        assert response.status_code == 201
+        assert client.post("/api/login", json={"email": email, "password": password}).status_code == 200
+        assert client.get("/api/users/me").status_code == 200
+
+    # Disabled application doesn't record requests, database connections and hashing of passwords
+    assert (
+        POOL_CHECKOUT_WAIT.count,
+        PASSWORD_HASHING.duration.count,
+        REQUEST_DURATION.labels("POST", "/api/login", "200").count
+    ) == recorded
@@ -0,0 +1,40 @@
+import uuid
+from pathlib import Path
+
+import pytest
+
+from demo_api.api.exceptions import BadPaginationCursor
+from demo_api.api.services.jwt_key_ring import JWTKeyRing
+from demo_api.api.services.pagination_cursor import ResourcesCursor, UsersCursor, decode_cursor, encode_cursor
+from demo_api.utils.config_schema import load_config
+
+
+@pytest.fixture(scope="module")
+def key_ring() -> JWTKeyRing:
+    return JWTKeyRing.from_config(load_config(Path(__file__).parent.parent / "test_config.toml").security)
+
+
+def test_cursor_round_trip(key_ring: JWTKeyRing):
+    user_id: uuid.UUID = uuid.uuid4()
+    token: str = encode_cursor(key_ring, UsersCursor(after_user_id=user_id))
+
+    cursor: UsersCursor | None = decode_cursor(key_ring, UsersCursor, token)
+    assert cursor is not None and cursor.after_user_id == user_id
+    assert decode_cursor(key_ring, UsersCursor, None) is None
+
+
+def test_cursor_of_other_listing_is_rejected(key_ring: JWTKeyRing):
+    token: str = encode_cursor(key_ring, ResourcesCursor(after_resource_id=10))
+
+    with pytest.raises(BadPaginationCursor):
+        decode_cursor(key_ring, UsersCursor, token)
+
+
+def test_forged_cursor_is_rejected(key_ring: JWTKeyRing):
+    header, payload, signature = encode_cursor(key_ring, ResourcesCursor(after_resource_id=10)).split(".")
+
+    with pytest.raises(BadPaginationCursor):
+        decode_cursor(key_ring, ResourcesCursor, f"{header}.{payload}.{signature[::-1]}")
+
+    with pytest.raises(BadPaginationCursor):
+        decode_cursor(key_ring, ResourcesCursor, "not a cursor")
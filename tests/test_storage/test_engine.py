@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from demo_api.storage.sqla_implementation.engine import (
+    ConnectionPoolStatistics,
+    create_database_engine,
+    pool_statistics
+)
+from demo_api.storage.sqla_implementation.tables import UserTable
+from demo_api.utils.config_schema import DbSettings
+from .fixtures import *
+
+
+async def test_pool_statistics_count_checkouts_and_timeouts(config: AppConfig):
+    db_settings: DbSettings = config.db_settings.model_copy(
+        update={"pool_size": 1, "pool_max_overflow": 0, "pool_timeout_in_seconds": 0.1}
+    )
+    engine: AsyncEngine = create_database_engine(db_settings)
+    try:
+        async with engine.connect() as connection:
+            assert (await connection.execute(select(1))).scalar_one() == 1
+            assert pool_statistics(engine).checked_out == 1
+
+            with pytest.raises(PoolTimeoutError):
+                async with engine.connect():
+                    pass
+
+        statistics: ConnectionPoolStatistics = pool_statistics(engine)
+        assert statistics.size == 1
+        assert statistics.checked_out == 0
+        assert statistics.checkouts == 1
+        assert statistics.timeouts == 1
+        assert statistics.max_wait_time_in_seconds >= 0.1
+
+    finally:
+        await engine.dispose()
+
+
+async def test_transaction_pooling_mode_executes_statements(config: AppConfig):
+    db_settings: DbSettings = config.db_settings.model_copy(update={"transaction_pooling": True})
+    engine: AsyncEngine = create_database_engine(db_settings)
+    try:
+        # Same statement is prepared again under new name on every execution
+        for _ in range(2):
+            async with engine.connect() as connection:
+                await connection.execute(select(UserTable.user_id).limit(1))
+
+    finally:
+        await engine.dispose()
+
+
+def test_statement_timeout_is_rejected_with_transaction_pooling():
+    with pytest.raises(ValueError):
+        DbSettings(
+            connection_string="postgresql+asyncpg://localhost/demo_db",
+            statement_timeout_in_milliseconds=1000,
+            transaction_pooling=True
+        )
@@ -0,0 +1,146 @@
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event
+
+from demo_api.dto import CreateRoleRequest, Resource, ResourcePermissionsUpdate, Role, SessionData, UserAuthentication
+from .fixtures import *
+
+
+async def explain_queries(engine: AsyncEngine, run: Callable[[], Awaitable[Any]]) -> list[dict[str, Any]]:
+    """
+    Runs repository method and explains every query it has issued.
+
+    Sequential scans are disabled, so with tables of test size a query is planned with
+    sequential scan only if no index can serve it.
+    """
+    statements: list[tuple[str, Any]] = []
+
+    def capture(conn, cursor, statement: str, parameters: Any, context, executemany: bool) -> None:
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await run()
+
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans: list[dict[str, Any]] = []
+    async with engine.connect() as connection:
+        await connection.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in statements:
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plans.append(result.scalar_one()[0]["Plan"])
+
+    return plans
+
+
+def plan_nodes(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    nodes: list[dict[str, Any]] = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+
+    return nodes
+
+
+def used_indexes(plans: list[dict[str, Any]]) -> set[str]:
+    return {node["Index Name"] for plan in plans for node in plan_nodes(plan) if "Index Name" in node}
+
+
+def fully_scanned(plans: list[dict[str, Any]]) -> set[str]:
+    """
+    Finds tables read without index condition, either sequentially or by walking whole index.
+    """
+    return {
+        node["Relation Name"]
+        for plan in plans
+        for node in plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan" or (
+            node["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in node
+        )
+    }
+
+
+@pytest.fixture()
+async def resource_with_role(
+    user_repo: UsersRepositorySQLA,
+    roles_repo: RolesRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    new_registered_user: User
+) -> tuple[Resource, Role]:
+    resource: Resource = await resources_repo.create_resource(new_registered_user, "Hello world")
+    role: Role = await roles_repo.create_role(
+        CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}")
+    )
+    await roles_repo.assign_role_to_user(new_registered_user.user_id, role.role_id)
+    await resources_repo.set_roles_permissions_on_resource(
+        resource.resource_id,
+        ResourcePermissionsUpdate(role_id=role.role_id, can_view_resource=True, can_edit_resource=False)
+    )
+
+    return resource, role
+
+
+async def test_session_lookups_use_alive_sessions_index(
+    engine: AsyncEngine,
+    user_repo: UsersRepositorySQLA,
+    user_credentials: UserRegistration,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    session: SessionData = await user_repo.login(
+        UserAuthentication(email=user_credentials.email, password=user_credentials.password),
+        hashing_settings
+    )
+
+    for run in (
+        lambda: user_repo.get_user_by_session(session.session_id),
+        lambda: user_repo.terminate_session(session)
+    ):
+        plans: list[dict[str, Any]] = await explain_queries(engine, run)
+        assert "ix_session_alive_session_id" in used_indexes(plans)
+        assert fully_scanned(plans) == set()
+
+
+async def test_resource_authorization_uses_indexes(
+    engine: AsyncEngine,
+    resources_repo: ResourceRepositorySQLA,
+    new_registered_user: User,
+    resource_with_role: tuple[Resource, Role]
+):
+    resource, _ = resource_with_role
+
+    for run in (
+        lambda: resources_repo.get_resource_if_viewable(resource.resource_id, new_registered_user.user_id),
+        lambda: resources_repo.get_resource_by_id(resource.resource_id)
+    ):
+        plans: list[dict[str, Any]] = await explain_queries(engine, run)
+        assert "ix_roles_permissions_resource_id" in used_indexes(plans)
+        assert fully_scanned(plans) == set()
+
+    # Permissions of edited resource may be reached either from resource or from users roles
+    assert fully_scanned(
+        await explain_queries(
+            engine,
+            lambda: resources_repo.edit_resource_if_editable(
+                resource.resource_id, new_registered_user.user_id, "Edited"
+            )
+        )
+    ) == set()
+
+
+async def test_listing_available_resources_uses_access_index(
+    engine: AsyncEngine,
+    resources_repo: ResourceRepositorySQLA,
+    new_registered_user: User,
+    resource_with_role: tuple[Resource, Role]
+):
+    plans: list[dict[str, Any]] = await explain_queries(
+        engine,
+        lambda: resources_repo.list_available_resources(new_registered_user.user_id)
+    )
+
+    assert "user_resource_access_pkey" in used_indexes(plans)
+    assert fully_scanned(plans) == set()
+
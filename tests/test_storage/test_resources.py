@@ -1,4 +1,7 @@
+import asyncio
+
 from demo_api.dto import CreateRoleRequest, Resource, ResourceDetails, ResourcePermissionsUpdate, Role
+from demo_api.storage.exceptions import NotFoundError
 from .fixtures import *
 
 
@@ -27,6 +30,21 @@ async def test_listing_all_resources(
     assert len(await resources_repo.list_resources()) >= 1
 
 
+async def test_exporting_resources(
+    resources_repo: ResourceRepositorySQLA,
+    new_registered_user: User
+):
+    for i in range(5):
+        await resources_repo.create_resource(author=new_registered_user, content=str(i))
+
+    # Several batches are fetched from cursor
+    resources_repo.export_batch_size = 2
+    exported: list[ResourceDetails] = [resource async for resource in resources_repo.export_resources()]
+
+    assert exported == await resources_repo.list_resources(limit=len(exported) + 1)
+    assert [resource.content for resource in exported[:5]] == ["4", "3", "2", "1", "0"]
+
+
 async def test_listing_author_owned_resources(
     resources_repo: ResourceRepositorySQLA,
     new_registered_user: User
@@ -232,3 +250,263 @@ async def test_role_deletion_effects_on_permission_for_resource(
         for role in accessible_resources[0].roles_permissions
         if any((role.can_edit_resource, role.can_view_resource))
     } == {test_unused_role.role_id}
+
+
+async def test_authorized_viewing_and_editing_of_resource(
+    user_repo: UsersRepositorySQLA,
+    roles_repo: RolesRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    demo_user: User = await register_user(
+        user_repo,
+        generate_credentials(),
+        hashing_settings
+    )
+    data: Resource = await resources_repo.create_resource(
+        author=new_registered_user,
+        content="Hello world"
+    )
+
+    assert await resources_repo.is_resource_author(data.resource_id, new_registered_user.user_id)
+    assert not await resources_repo.is_resource_author(data.resource_id, demo_user.user_id)
+
+    author_view: ResourceDetails = await resources_repo.get_resource_if_viewable(
+        data.resource_id, new_registered_user.user_id
+    )
+    assert author_view.content == "Hello world"
+
+    with pytest.raises(PermissionError):
+        await resources_repo.get_resource_if_viewable(data.resource_id, demo_user.user_id)
+
+    with pytest.raises(NotFoundError):
+        await resources_repo.get_resource_if_viewable(-1, demo_user.user_id)
+
+    new_role: Role = await roles_repo.create_role(
+        CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}")
+    )
+    await roles_repo.assign_role_to_user(demo_user.user_id, new_role.role_id)
+    assert await resources_repo.set_roles_permissions_on_resource(
+        data.resource_id,
+        ResourcePermissionsUpdate(
+            role_id=new_role.role_id,
+            can_view_resource=True,
+            can_edit_resource=False
+        )
+    )
+
+    resource: ResourceDetails = await resources_repo.get_resource_if_viewable(
+        data.resource_id, demo_user.user_id
+    )
+    assert resource.content == "Hello world"
+    assert [role.role_id for role in resource.roles_permissions] == [new_role.role_id]
+
+    with pytest.raises(PermissionError):
+        await resources_repo.edit_resource_if_editable(data.resource_id, demo_user.user_id, "Edited")
+
+    with pytest.raises(NotFoundError):
+        await resources_repo.edit_resource_if_editable(-1, demo_user.user_id, "Edited")
+
+    assert await resources_repo.set_roles_permissions_on_resource(
+        data.resource_id,
+        ResourcePermissionsUpdate(
+            role_id=new_role.role_id,
+            can_view_resource=False,
+            can_edit_resource=True
+        )
+    )
+
+    edited: Resource = await resources_repo.edit_resource_if_editable(
+        data.resource_id, demo_user.user_id, "Edited"
+    )
+    assert edited.content == "Edited"
+    assert (await resources_repo.edit_resource_if_editable(
+        data.resource_id, new_registered_user.user_id, "Edited by author"
+    )).content == "Edited by author"
+    assert (await resources_repo.get_resource_by_id(data.resource_id)).content == "Edited by author"
+
+
+async def test_listing_resources_by_keyset(
+    resources_repo: ResourceRepositorySQLA,
+    new_registered_user: User
+):
+    for i in range(5):
+        await resources_repo.create_resource(author=new_registered_user, content=str(i))
+
+    first_page: list[ResourceDetails] = await resources_repo.list_available_resources(
+        new_registered_user.user_id, limit=2
+    )
+    second_page: list[ResourceDetails] = await resources_repo.list_available_resources(
+        new_registered_user.user_id, limit=2, after_resource_id=first_page[-1].resource_id
+    )
+    assert [resource.content for resource in first_page + second_page] == ["4", "3", "2", "1"]
+
+    all_after: list[ResourceDetails] = await resources_repo.list_resources(
+        limit=2, after_resource_id=second_page[0].resource_id
+    )
+    assert all_after[0].resource_id == second_page[1].resource_id
+    assert all_after[0].resource_id > all_after[1].resource_id
+
+
+async def test_available_resources_follow_roles_changes(
+    user_repo: UsersRepositorySQLA,
+    roles_repo: RolesRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    demo_user: User = await register_user(
+        user_repo,
+        generate_credentials(),
+        hashing_settings
+    )
+    data: Resource = await resources_repo.create_resource(
+        author=new_registered_user,
+        content="Hello world"
+    )
+    viewer_role: Role = await roles_repo.create_role(
+        CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}")
+    )
+    editor_role: Role = await roles_repo.create_role(
+        CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}")
+    )
+    for role in (viewer_role, editor_role):
+        await roles_repo.assign_role_to_user(demo_user.user_id, role.role_id)
+        await roles_repo.assign_role_to_user(new_registered_user.user_id, role.role_id)
+        assert await resources_repo.set_roles_permissions_on_resource(
+            data.resource_id,
+            ResourcePermissionsUpdate(
+                role_id=role.role_id,
+                can_view_resource=True,
+                can_edit_resource=role is editor_role
+            )
+        )
+
+    # Resource granted by several roles is listed once
+    assert [
+        resource.resource_id
+        for resource in await resources_repo.list_available_resources(demo_user.user_id)
+    ] == [data.resource_id]
+    assert len(await resources_repo.list_available_resources(new_registered_user.user_id)) == 1
+
+    await roles_repo.remove_role_from_user(demo_user.user_id, viewer_role.role_id)
+    assert len(await resources_repo.list_available_resources(demo_user.user_id)) == 1
+
+    assert await resources_repo.set_roles_permissions_on_resource(
+        data.resource_id,
+        ResourcePermissionsUpdate(
+            role_id=editor_role.role_id,
+            can_view_resource=False,
+            can_edit_resource=False
+        )
+    )
+    assert len(await resources_repo.list_available_resources(demo_user.user_id)) == 0
+
+    await roles_repo.assign_role_to_user(demo_user.user_id, viewer_role.role_id)
+    assert len(await resources_repo.list_available_resources(demo_user.user_id)) == 1
+
+    # Author keeps access, after roles granting it are removed
+    await roles_repo.remove_role_from_user(new_registered_user.user_id, viewer_role.role_id)
+    await roles_repo.delete_role(editor_role.role_id)
+    assert len(await resources_repo.list_available_resources(new_registered_user.user_id)) == 1
+
+
+async def test_concurrent_roles_changes_keep_access_consistent(
+    session_maker: async_sessionmaker[AsyncSession],
+    user_repo: UsersRepositorySQLA,
+    roles_repo: RolesRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    demo_user: User = await register_user(user_repo, generate_credentials(), hashing_settings)
+    data: Resource = await resources_repo.create_resource(author=new_registered_user, content="Hello world")
+    role: Role = await roles_repo.create_role(CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}"))
+    await roles_repo.assign_role_to_user(demo_user.user_id, role.role_id)
+
+    removing: TransactionSQLA = TransactionSQLA(session_maker, commit_on_exit=False)
+    granting: TransactionSQLA = TransactionSQLA(session_maker, commit_on_exit=False)
+    try:
+        await RolesRepositorySQLA(removing).remove_role_from_user(demo_user.user_id, role.role_id)
+
+        # Role is still assigned in snapshot of granting transaction, until removal is committed
+        grant: asyncio.Task[bool] = asyncio.create_task(
+            ResourceRepositorySQLA(granting).set_roles_permissions_on_resource(
+                data.resource_id,
+                ResourcePermissionsUpdate(role_id=role.role_id, can_view_resource=True, can_edit_resource=False)
+            )
+        )
+        await asyncio.sleep(0.2)
+        assert not grant.done()
+
+        await removing.commit()
+        assert await grant
+        await granting.commit()
+
+    finally:
+        await removing.close()
+        await granting.close()
+
+    assert await resources_repo.list_available_resources(demo_user.user_id) == []
+
+
+async def test_updating_role_permissions_keeps_other_resources(
+    roles_repo: RolesRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    new_registered_user: User
+):
+    first: Resource = await resources_repo.create_resource(author=new_registered_user, content="First")
+    second: Resource = await resources_repo.create_resource(author=new_registered_user, content="Second")
+    new_role: Role = await roles_repo.create_role(
+        CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}")
+    )
+    other_role: Role = await roles_repo.create_role(
+        CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}")
+    )
+
+    assert await resources_repo.set_roles_permissions_on_resources(
+        [
+            (first.resource_id, ResourcePermissionsUpdate(
+                role_id=new_role.role_id, can_view_resource=True, can_edit_resource=False
+            )),
+            (second.resource_id, ResourcePermissionsUpdate(
+                role_id=new_role.role_id, can_view_resource=True, can_edit_resource=False
+            )),
+            (second.resource_id, ResourcePermissionsUpdate(
+                role_id=other_role.role_id, can_view_resource=False, can_edit_resource=False
+            )),
+            (second.resource_id, ResourcePermissionsUpdate(
+                role_id=other_role.role_id, can_view_resource=True, can_edit_resource=True
+            ))
+        ]
+    )
+    assert await resources_repo.set_roles_permissions_on_resource(
+        first.resource_id,
+        ResourcePermissionsUpdate(role_id=new_role.role_id, can_view_resource=False, can_edit_resource=True)
+    )
+
+    assert await roles_permissions(resources_repo, first.resource_id) == {(new_role.role_id, False, True)}
+    assert await roles_permissions(resources_repo, second.resource_id) == {
+        (new_role.role_id, True, False), (other_role.role_id, True, True)
+    }
+
+    assert not await resources_repo.set_roles_permissions_on_resources(
+        [
+            (first.resource_id, ResourcePermissionsUpdate(
+                role_id=new_role.role_id, can_view_resource=True, can_edit_resource=True
+            )),
+            (-1, ResourcePermissionsUpdate(
+                role_id=new_role.role_id, can_view_resource=True, can_edit_resource=True
+            ))
+        ]
+    )
+    assert await roles_permissions(resources_repo, first.resource_id) == {(new_role.role_id, False, True)}
+
+
+async def roles_permissions(resources_repo: ResourceRepositorySQLA, resource_id: int) -> set[tuple[int, bool, bool]]:
+    resource: ResourceDetails = await resources_repo.get_resource_by_id(resource_id)
+    return {
+        (role_permissions.role_id, role_permissions.can_view_resource, role_permissions.can_edit_resource)
+        for role_permissions in resource.roles_permissions
+    }
@@ -0,0 +1,184 @@
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import InvalidRequestError
+
+from demo_api.dto import (
+    CreateRoleRequest,
+    Resource,
+    ResourceDetails,
+    ResourcePermissionsDetails,
+    ResourcePermissionsUpdate,
+    Role,
+    SessionData,
+    UserAuthentication,
+    UserDetailed,
+    UserUpdate,
+)
+from demo_api.storage.exceptions import NotFoundError
+from demo_api.storage.sqla_implementation.tables import SessionsTable
+from .fixtures import *
+
+
+@contextmanager
+def issued_statements(engine: AsyncEngine) -> Iterator[list[str]]:
+    """
+    Collects statements issued within block, except transaction control.
+    """
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement: str, parameters: Any, context, executemany: bool) -> None:
+        if not statement.lstrip().upper().startswith(("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK", "COMMIT")):
+            statements.append(statement.strip())
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+def kinds(statements: list[str]) -> list[str]:
+    return [statement.split(maxsplit=1)[0].upper() for statement in statements]
+
+
+async def test_mutations_take_single_statement(
+    engine: AsyncEngine,
+    user_repo: UsersRepositorySQLA,
+    roles_repo: RolesRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    user_credentials: UserRegistration,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    role: Role = await roles_repo.create_role(CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}"))
+    resource: Resource = await resources_repo.create_resource(new_registered_user, "Hello world")
+    await roles_repo.assign_role_to_user(new_registered_user.user_id, role.role_id)
+    session: SessionData = await user_repo.login(
+        UserAuthentication(email=user_credentials.email, password=user_credentials.password),
+        hashing_settings
+    )
+
+    with issued_statements(engine) as statements:
+        renamed: Role = await roles_repo.update_role(Role(role_id=role.role_id, role_name=f"{role.role_name} 2"))
+    assert kinds(statements) == ["UPDATE"]
+    assert renamed.role_name == f"{role.role_name} 2"
+
+    with issued_statements(engine) as statements:
+        assert (await resources_repo.edit_resource(resource.resource_id, "Edited")).content == "Edited"
+    assert kinds(statements) == ["UPDATE"]
+
+    with issued_statements(engine) as statements:
+        updated: UserDetailed = await user_repo.update_user_details(
+            UserUpdate(
+                user_id=new_registered_user.user_id,
+                email=f"demo_email{secrets.token_urlsafe(16)}@example.com",
+                name="Hello",
+                surname=None,
+                third_name=None
+            )
+        )
+    assert kinds(statements) == ["WITH"]
+    assert updated.name == "Hello"
+    assert updated.surname == new_registered_user.surname
+    assert updated.roles == [renamed]
+
+    with issued_statements(engine) as statements:
+        assert await user_repo.terminate_session(session)
+        assert not await user_repo.terminate_session(session)
+    assert kinds(statements) == ["UPDATE", "UPDATE"]
+
+    # Besides removal itself only access to resources is refreshed under lock, without loading anything
+    with issued_statements(engine) as statements:
+        assert await roles_repo.remove_role_from_user(new_registered_user.user_id, role.role_id)
+    assert kinds(statements) == ["DELETE", "SELECT", "DELETE", "INSERT"]
+    assert "pg_advisory_xact_lock" in statements[1]
+
+    with issued_statements(engine) as statements:
+        assert await roles_repo.delete_role(role.role_id)
+    assert kinds(statements) == ["SELECT", "DELETE", "INSERT", "DELETE"]
+
+    with pytest.raises(NotFoundError):
+        await roles_repo.delete_role(role.role_id)
+
+
+async def test_queries_load_only_relationships_of_their_profile(
+    engine: AsyncEngine,
+    session: AsyncSession,
+    user_repo: UsersRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    user_credentials: UserRegistration,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    with issued_statements(engine) as statements:
+        session_data: SessionData = await user_repo.login(
+            UserAuthentication(email=user_credentials.email, password=user_credentials.password),
+            hashing_settings
+        )
+    login_query: str = statements[0]
+    assert "credentials" in login_query
+    assert "user_permissions" not in login_query and "role" not in login_query
+
+    with issued_statements(engine) as statements:
+        await user_repo.get_user_by_session(session_data.session_id)
+    # User with permissions, then roles of user
+    assert kinds(statements) == ["SELECT", "SELECT"]
+    assert "user_permissions" in statements[0] and "credentials" not in statements[0]
+    assert "role" in statements[1] and "credentials" not in statements[1]
+
+    resource: Resource = await resources_repo.create_resource(new_registered_user, "Hello world")
+    with issued_statements(engine) as statements:
+        await resources_repo.get_resource_by_id(resource.resource_id)
+    assert kinds(statements) == ["SELECT", "SELECT"]
+    assert "roles_permissions" not in statements[0]
+
+    # Relationships, which query didn't ask for, aren't loaded implicitly
+    user_session: SessionsTable = (
+        await session.scalars(select(SessionsTable).where(SessionsTable.session_id == session_data.session_id))
+    ).one()
+    with pytest.raises(InvalidRequestError):
+        user_session.user
+
+
+async def test_listings_are_single_projected_statements(
+    engine: AsyncEngine,
+    user_repo: UsersRepositorySQLA,
+    roles_repo: RolesRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    new_registered_user: User
+):
+    role: Role = await roles_repo.create_role(CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}"))
+    resource: Resource = await resources_repo.create_resource(new_registered_user, "Hello world")
+    await roles_repo.assign_role_to_user(new_registered_user.user_id, role.role_id)
+    await resources_repo.set_roles_permissions_on_resource(
+        resource.resource_id,
+        ResourcePermissionsUpdate(role_id=role.role_id, can_view_resource=True, can_edit_resource=False)
+    )
+    expected_permissions: ResourcePermissionsDetails = ResourcePermissionsDetails(
+        role_id=role.role_id, role_name=role.role_name, can_view_resource=True, can_edit_resource=False
+    )
+
+    with issued_statements(engine) as statements:
+        users: list[UserDetailed] = await user_repo.list_users(limit=1_000_000)
+    assert kinds(statements) == ["SELECT"]
+    listed_user: UserDetailed = next(user for user in users if user.user_id == new_registered_user.user_id)
+    assert listed_user == await user_repo.get_user(new_registered_user.user_id)
+    assert listed_user.roles == [role]
+
+    with issued_statements(engine) as statements:
+        resources: list[ResourceDetails] = await resources_repo.list_resources(
+            limit=1, after_resource_id=resource.resource_id + 1
+        )
+    assert kinds(statements) == ["SELECT"]
+    assert resources == [await resources_repo.get_resource_by_id(resource.resource_id)]
+    assert resources[0].roles_permissions == [expected_permissions]
+
+    with issued_statements(engine) as statements:
+        available: list[ResourceDetails] = await resources_repo.list_available_resources(
+            new_registered_user.user_id, limit=1, after_resource_id=resource.resource_id + 1
+        )
+    assert kinds(statements) == ["SELECT"]
+    assert available == resources
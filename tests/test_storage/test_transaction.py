@@ -0,0 +1,96 @@
+from sqlalchemy import select
+
+from demo_api.dto import SessionData, UserAuthentication, UserDetailed
+from demo_api.storage.exceptions import NotFoundError
+from demo_api.storage.sqla_implementation.tables import SessionsTable
+from demo_api.use_cases import SessionCache, UserUseCases
+from .fixtures import *
+
+
+async def test_after_commit_callbacks_wait_for_unit_of_work(session_maker: async_sessionmaker[AsyncSession]):
+    called: list[str] = []
+    unit_of_work: TransactionSQLA = TransactionSQLA(session_maker, commit_on_exit=False)
+
+    unit_of_work.after_commit(lambda: called.append("rolled back"))
+    await unit_of_work.rollback()
+    unit_of_work.after_commit(lambda: called.append("committed"))
+    assert called == []
+
+    await unit_of_work.commit()
+    await unit_of_work.close()
+    assert called == ["committed"]
+
+    # Outside of unit of work changes are committed when context exits
+    TransactionSQLA(session_maker).after_commit(lambda: called.append("immediately"))
+    assert called == ["committed", "immediately"]
+
+
+async def test_released_connection_keeps_unit_of_work_atomic(
+    session_maker: async_sessionmaker[AsyncSession],
+    user_repo: UsersRepositorySQLA,
+    user_credentials: UserRegistration,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    session_data: SessionData = await user_repo.login(
+        UserAuthentication(email=user_credentials.email, password=user_credentials.password),
+        hashing_settings
+    )
+    unit_of_work: TransactionSQLA = TransactionSQLA(session_maker, commit_on_exit=False)
+    try:
+        async with unit_of_work as tr:
+            user_session: SessionsTable = (
+                await tr.scalars(select(SessionsTable).where(SessionsTable.session_id == session_data.session_id))
+            ).one()
+
+        # Nothing is written yet, so connection is released without committing
+        await unit_of_work.release_connection()
+        assert user_session.is_alive
+        assert not (await unit_of_work.__aenter__()).in_transaction()
+
+        await UsersRepositorySQLA(unit_of_work).terminate_session(session_data)
+        with pytest.raises(RuntimeError):
+            await unit_of_work.release_connection()
+
+        await unit_of_work.rollback()
+
+    finally:
+        await unit_of_work.close()
+
+    # Termination wasn't committed by releasing connection
+    assert (await user_repo.get_user_by_session(session_data.session_id)).user_id == new_registered_user.user_id
+
+
+async def test_logout_invalidates_cache_after_commit(
+    session_maker: async_sessionmaker[AsyncSession],
+    user_repo: UsersRepositorySQLA,
+    transaction: TransactionSQLA,
+    user_credentials: UserRegistration,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    session_data: SessionData = await user_repo.login(
+        UserAuthentication(email=user_credentials.email, password=user_credentials.password),
+        hashing_settings
+    )
+    session_cache: SessionCache = SessionCache(100, 30)
+    unit_of_work: TransactionSQLA = TransactionSQLA(session_maker, commit_on_exit=False)
+    logout: UserUseCases = UserUseCases(UsersRepositorySQLA(unit_of_work), unit_of_work, session_cache)
+    concurrent_request: UserUseCases = UserUseCases(user_repo, transaction, session_cache)
+    try:
+        assert await logout.terminate_session(session_data)
+
+        # Termination is not committed yet, so concurrent request still sees session alive and caches it
+        cached: UserDetailed = await concurrent_request.get_user_by_session(session_data.session_id)
+        assert cached.user_id == new_registered_user.user_id
+        assert session_cache.get(session_data.session_id) is not None
+
+        await unit_of_work.commit()
+
+    finally:
+        await unit_of_work.close()
+
+    assert session_cache.get(session_data.session_id) is None
+    with pytest.raises(NotFoundError):
+        await concurrent_request.get_user_by_session(session_data.session_id)
+
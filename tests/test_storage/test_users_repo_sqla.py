@@ -1,6 +1,11 @@
+import asyncio
+
+from sqlalchemy import select
+
 from demo_api.dto import SessionData, UserAuthentication, UserDetailed
 from demo_api.dto.user_update import UserUpdate
 from demo_api.storage.exceptions import NotFoundError
+from demo_api.storage.sqla_implementation.tables import CredentialsTable
 from .fixtures import *
 
 
@@ -233,6 +238,23 @@ async def test_fetching_many_users(
     assert len(await user_repo.list_users(limit=10)) == 10
 
 
+async def test_exporting_users(
+    user_repo: UsersRepositorySQLA,
+    new_registered_user: User
+):
+    await user_repo.terminate_user(new_registered_user.user_id)
+    # Several batches are fetched from cursor
+    user_repo.export_batch_size = 2
+
+    exported: list[UserDetailed] = [user async for user in user_repo.export_users(include_deactivated=True)]
+    assert exported == await user_repo.list_users(limit=len(exported) + 1, include_deactivated=True)
+    assert new_registered_user.user_id in {user.user_id for user in exported}
+
+    active: list[UserDetailed] = [user async for user in user_repo.export_users()]
+    assert active == await user_repo.list_users(limit=len(active) + 1)
+    assert new_registered_user.user_id not in {user.user_id for user in active}
+
+
 async def test_terminating_user(
     user_repo: UsersRepositorySQLA,
     user_credentials: UserRegistration,
@@ -347,3 +369,40 @@ async def test_updating_user_data(
 
     updated_details: UserDetailed = await user_repo.update_user_details(update_details)
     assert updated_details == await user_repo.get_user(user.user_id)
+
+
+async def test_password_is_rehashed_with_new_settings_on_login(
+    user_repo: UsersRepositorySQLA,
+    user_credentials: UserRegistration,
+    hashing_settings: HashingSettings,
+    session: AsyncSession
+):
+    user: User = await user_repo.register_user(
+        user_credentials,
+        UserPermissions(),
+        hashing_settings
+    )
+    new_settings: HashingSettings = HashingSettings(
+        hashing_settings.hash_algorithm,
+        hashing_settings.iterations_count + 1000
+    )
+    authentication: UserAuthentication = UserAuthentication(
+        email=user_credentials.email,
+        password=user_credentials.password
+    )
+
+    await user_repo.login(authentication, new_settings)
+    await asyncio.gather(*UsersRepositorySQLA._rehash_tasks)
+
+    stored_password: str | None = (
+        await session.execute(
+            select(CredentialsTable.password).where(CredentialsTable.user_id == user.user_id)
+        )
+    ).scalar_one()
+    assert stored_password is not None
+    assert stored_password.startswith(
+        f"pbkdf2_{new_settings.hash_algorithm}${new_settings.iterations_count}$"
+    )
+
+    # Both old and new settings verify password with settings it is stored with
+    await user_repo.login(authentication, hashing_settings)
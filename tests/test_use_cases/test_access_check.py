@@ -0,0 +1,147 @@
+from dataclasses import replace
+
+from demo_api.dto import (
+    CreateRoleRequest,
+    Resource,
+    ResourceAccessCheck,
+    ResourcePermissionsUpdate,
+    Role,
+    UserDetailed,
+)
+from demo_api.use_cases import ResourceUseCases
+from test_storage.fixtures import *
+
+
+async def test_checking_access_to_many_resources(
+    user_repo: UsersRepositorySQLA,
+    roles_repo: RolesRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    demo_user: User = await register_user(user_repo, generate_credentials(), hashing_settings)
+    authored: Resource = await resources_repo.create_resource(author=demo_user, content="Authored")
+    viewable: Resource = await resources_repo.create_resource(author=new_registered_user, content="Viewable")
+    editable: Resource = await resources_repo.create_resource(author=new_registered_user, content="Editable")
+    hidden: Resource = await resources_repo.create_resource(author=new_registered_user, content="Hidden")
+
+    new_role: Role = await roles_repo.create_role(
+        CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}")
+    )
+    await roles_repo.assign_role_to_user(demo_user.user_id, new_role.role_id)
+    for resource, can_edit in ((viewable, False), (editable, True)):
+        assert await resources_repo.set_roles_permissions_on_resource(
+            resource.resource_id,
+            ResourcePermissionsUpdate(role_id=new_role.role_id, can_view_resource=not can_edit, can_edit_resource=can_edit)
+        )
+
+    use_case: ResourceUseCases = ResourceUseCases(resources_repo)
+    user: UserDetailed = await user_repo.get_user(demo_user.user_id)
+    resource_ids: list[int] = [
+        hidden.resource_id, editable.resource_id, viewable.resource_id, authored.resource_id, -1, viewable.resource_id
+    ]
+    result: ResourceAccessCheck = await use_case.check_resources_access(user, user, resource_ids, ["view", "edit"])
+
+    assert result.allowed == {
+        "view": [editable.resource_id, viewable.resource_id, authored.resource_id],
+        "edit": [editable.resource_id, authored.resource_id]
+    }
+
+    with pytest.raises(PermissionError):
+        await use_case.check_resources_access(
+            user, await user_repo.get_user(new_registered_user.user_id), resource_ids, ["view"]
+        )
+
+    viewer: UserDetailed = replace(user, user_permissions=UserPermissions(view_all_resources=True))
+    assert (await use_case.check_resources_access(viewer, viewer, resource_ids, ["view", "edit"])).allowed == {
+        "view": [hidden.resource_id, editable.resource_id, viewable.resource_id, authored.resource_id],
+        "edit": [editable.resource_id, authored.resource_id]
+    }
+
+
+async def test_revocations_by_other_workers_are_seen_right_away(
+    session_maker: async_sessionmaker[AsyncSession],
+    user_repo: UsersRepositorySQLA,
+    roles_repo: RolesRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    demo_user: User = await register_user(user_repo, generate_credentials(), hashing_settings)
+    data: Resource = await resources_repo.create_resource(author=new_registered_user, content="Hello world")
+    new_role: Role = await roles_repo.create_role(
+        CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}")
+    )
+    await roles_repo.assign_role_to_user(demo_user.user_id, new_role.role_id)
+    assert await resources_repo.set_roles_permissions_on_resource(
+        data.resource_id,
+        ResourcePermissionsUpdate(role_id=new_role.role_id, can_view_resource=True, can_edit_resource=True)
+    )
+
+    # User is kept as it was authenticated before revocations, same as one from session cache or access token
+    user: UserDetailed = await user_repo.get_user(demo_user.user_id)
+    use_case: ResourceUseCases = ResourceUseCases(resources_repo)
+    other_worker: ResourceRepositorySQLA = ResourceRepositorySQLA(TransactionSQLA(session_maker))
+    assert (await use_case.get_resource_by_id(user, data.resource_id)).content == "Hello world"
+    assert (await use_case.edit_resource(user, data.resource_id, "Edited")).content == "Edited"
+
+    assert await other_worker.set_roles_permissions_on_resource(
+        data.resource_id,
+        ResourcePermissionsUpdate(role_id=new_role.role_id, can_view_resource=True, can_edit_resource=False)
+    )
+    with pytest.raises(PermissionError):
+        await use_case.edit_resource(user, data.resource_id, "Edited again")
+
+    assert await RolesRepositorySQLA(TransactionSQLA(session_maker)).remove_role_from_user(
+        demo_user.user_id, new_role.role_id
+    )
+    assert new_role.role_id in [role.role_id for role in user.roles]
+    with pytest.raises(PermissionError):
+        await use_case.get_resource_by_id(user, data.resource_id)
+
+
+async def test_checking_access_sees_revocations_by_other_workers(
+    session_maker: async_sessionmaker[AsyncSession],
+    user_repo: UsersRepositorySQLA,
+    roles_repo: RolesRepositorySQLA,
+    resources_repo: ResourceRepositorySQLA,
+    hashing_settings: HashingSettings,
+    new_registered_user: User
+):
+    demo_user: User = await register_user(user_repo, generate_credentials(), hashing_settings)
+    first: Resource = await resources_repo.create_resource(author=new_registered_user, content="First")
+    second: Resource = await resources_repo.create_resource(author=new_registered_user, content="Second")
+    new_role: Role = await roles_repo.create_role(
+        CreateRoleRequest(role_name=f"demo_role {secrets.token_urlsafe(4)}")
+    )
+    await roles_repo.assign_role_to_user(demo_user.user_id, new_role.role_id)
+    assert await resources_repo.set_roles_permissions_on_resources(
+        [
+            (resource.resource_id, ResourcePermissionsUpdate(
+                role_id=new_role.role_id, can_view_resource=True, can_edit_resource=True
+            ))
+            for resource in (first, second)
+        ]
+    )
+
+    user: UserDetailed = await user_repo.get_user(demo_user.user_id)
+    use_case: ResourceUseCases = ResourceUseCases(resources_repo)
+    resource_ids: list[int] = [first.resource_id, second.resource_id]
+    assert (await use_case.check_resources_access(user, user, resource_ids, ["view", "edit"])).allowed == {
+        "view": resource_ids, "edit": resource_ids
+    }
+
+    assert await ResourceRepositorySQLA(TransactionSQLA(session_maker)).set_roles_permissions_on_resource(
+        first.resource_id,
+        ResourcePermissionsUpdate(role_id=new_role.role_id, can_view_resource=True, can_edit_resource=False)
+    )
+    assert (await use_case.check_resources_access(user, user, resource_ids, ["view", "edit"])).allowed == {
+        "view": resource_ids, "edit": [second.resource_id]
+    }
+
+    await RolesRepositorySQLA(TransactionSQLA(session_maker)).remove_role_from_user(
+        demo_user.user_id, new_role.role_id
+    )
+    assert (await use_case.check_resources_access(user, user, resource_ids, ["view", "edit"])).allowed == {
+        "view": [], "edit": []
+    }
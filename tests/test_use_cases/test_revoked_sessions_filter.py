@@ -0,0 +1,150 @@
+import multiprocessing
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+from multiprocessing.synchronize import Barrier
+from typing import Iterator
+
+import pytest
+
+from demo_api.use_cases import RevokedSessionsFilter
+
+EPOCH_LENGTH: int = 3600
+
+
+@pytest.fixture()
+def filter_name() -> str:
+    return f"test_{uuid.uuid4().hex[:16]}"
+
+
+@pytest.fixture()
+def revoked_sessions(filter_name: str) -> Iterator[RevokedSessionsFilter]:
+    revoked_sessions: RevokedSessionsFilter = RevokedSessionsFilter.open(filter_name, 1000, 0.001, EPOCH_LENGTH)
+    yield revoked_sessions
+    revoked_sessions.close()
+
+
+def test_added_session_is_revoked(revoked_sessions: RevokedSessionsFilter):
+    session_id: str = secrets.token_hex(16)
+    revoked_sessions.add(session_id, datetime.now(tz=timezone.utc))
+
+    assert revoked_sessions.might_be_revoked(session_id)
+    assert not revoked_sessions.might_be_revoked(secrets.token_hex(16))
+
+
+def test_filter_is_shared_with_attached_process(revoked_sessions: RevokedSessionsFilter, filter_name: str):
+    attached: RevokedSessionsFilter = RevokedSessionsFilter.open(filter_name, 1000, 0.001, EPOCH_LENGTH)
+    try:
+        session_id: str = secrets.token_hex(16)
+        attached.add(session_id, datetime.now(tz=timezone.utc))
+        attached.synchronized_until = 42.0
+
+        assert not attached.owner
+        assert revoked_sessions.might_be_revoked(session_id)
+        assert revoked_sessions.synchronized_until == 42.0
+
+    finally:
+        attached.close()
+
+
+def add_sessions(filter_name: str, workers_count: int, worker: int, started_at: datetime, barrier: Barrier) -> None:
+    revoked_sessions: RevokedSessionsFilter = RevokedSessionsFilter.open(filter_name, 1000, 0.001, EPOCH_LENGTH)
+    try:
+        for epoch in range(20):
+            # Processes move to next epoch together, so they reuse generation at the same time
+            barrier.wait()
+            terminated_at: datetime = started_at + timedelta(seconds=epoch * EPOCH_LENGTH)
+            for index in range(250):
+                revoked_sessions.add(f"{worker}-{epoch}-{index}", terminated_at)
+
+            barrier.wait()
+            assert all(
+                revoked_sessions.might_be_revoked(f"{other_worker}-{epoch}-{index}")
+                for other_worker in range(workers_count)
+                for index in range(250)
+            )
+
+    except BaseException:
+        # Other processes must not wait for failed one
+        barrier.abort()
+        raise
+
+    finally:
+        revoked_sessions.close()
+
+
+def test_sessions_added_by_concurrent_processes_are_revoked(filter_name: str):
+    revoked_sessions: RevokedSessionsFilter = RevokedSessionsFilter.open(filter_name, 1000, 0.001, EPOCH_LENGTH)
+    try:
+        context = multiprocessing.get_context("spawn")
+        workers_count: int = 4
+        started_at: datetime = datetime.now(tz=timezone.utc)
+        barrier: Barrier = context.Barrier(workers_count)
+        workers: list[multiprocessing.process.BaseProcess] = [
+            context.Process(target=add_sessions, args=(filter_name, workers_count, worker, started_at, barrier))
+            for worker in range(workers_count)
+        ]
+        for worker_process in workers:
+            worker_process.start()
+
+        # Every process checks that no session of other processes was lost in each epoch
+        for worker_process in workers:
+            worker_process.join(timeout=60)
+            assert worker_process.exitcode == 0
+
+    finally:
+        revoked_sessions.close()
+
+
+def test_filter_is_kept_until_last_process_detaches(filter_name: str):
+    session_id: str = secrets.token_hex(16)
+    owner: RevokedSessionsFilter = RevokedSessionsFilter.open(filter_name, 1000, 0.001, EPOCH_LENGTH)
+    attached: RevokedSessionsFilter = RevokedSessionsFilter.open(filter_name, 1000, 0.001, EPOCH_LENGTH)
+    owner.add(session_id, datetime.now(tz=timezone.utc))
+    owner.close()
+
+    # Restarted worker attaches to filter that is still used by others
+    restarted: RevokedSessionsFilter = RevokedSessionsFilter.open(filter_name, 1000, 0.001, EPOCH_LENGTH)
+    try:
+        assert not restarted.owner
+        assert restarted.might_be_revoked(session_id)
+
+    finally:
+        attached.close()
+        restarted.close()
+
+    reopened: RevokedSessionsFilter = RevokedSessionsFilter.open(filter_name, 1000, 0.001, EPOCH_LENGTH)
+    try:
+        assert reopened.owner
+        assert not reopened.might_be_revoked(session_id)
+
+    finally:
+        reopened.close()
+
+
+def test_sessions_of_expired_epoch_are_dropped(revoked_sessions: RevokedSessionsFilter):
+    terminated_at: datetime = datetime.now(tz=timezone.utc)
+    old_session_id: str = secrets.token_hex(16)
+    previous_epoch_session_id: str = secrets.token_hex(16)
+
+    revoked_sessions.add(old_session_id, terminated_at)
+    revoked_sessions.add(previous_epoch_session_id, terminated_at + timedelta(seconds=EPOCH_LENGTH))
+    revoked_sessions.add(secrets.token_hex(16), terminated_at + timedelta(seconds=2 * EPOCH_LENGTH))
+    # Terminations that arrive after their generation was reused are ignored
+    revoked_sessions.add(secrets.token_hex(16), terminated_at)
+
+    assert not revoked_sessions.might_be_revoked(old_session_id)
+    assert revoked_sessions.might_be_revoked(previous_epoch_session_id)
+
+
+def test_filter_with_different_size_is_replaced(revoked_sessions: RevokedSessionsFilter, filter_name: str):
+    session_id: str = secrets.token_hex(16)
+    revoked_sessions.add(session_id, datetime.now(tz=timezone.utc))
+
+    resized: RevokedSessionsFilter = RevokedSessionsFilter.open(filter_name, 2000, 0.001, EPOCH_LENGTH)
+    try:
+        assert resized.owner
+        assert not resized.might_be_revoked(session_id)
+
+    finally:
+        resized.close()
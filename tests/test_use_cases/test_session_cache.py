@@ -0,0 +1,89 @@
+import uuid
+
+import pytest
+
+from demo_api.dto import UserDetailed, UserPermissions
+from demo_api.use_cases import SessionCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_user() -> UserDetailed:
+    return UserDetailed(
+        user_id=uuid.uuid4(),
+        name="Test",
+        surname="User",
+        third_name=None,
+        is_active=True,
+        roles=[],
+        user_permissions=UserPermissions()
+    )
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture()
+def cache(clock: FakeClock) -> SessionCache:
+    return SessionCache(max_size=2, alive_time_in_seconds=10, clock=clock)
+
+
+def test_cached_session_is_returned(cache: SessionCache):
+    user: UserDetailed = make_user()
+    assert cache.get("session") is None
+
+    cache.put("session", user, cache.version)
+
+    assert cache.get("session") is user
+    assert cache.statistics().hits == 1
+    assert cache.statistics().misses == 1
+
+
+def test_session_expires(cache: SessionCache, clock: FakeClock):
+    cache.put("session", make_user(), cache.version)
+    clock.now = 10
+
+    assert cache.get("session") is None
+    assert cache.statistics().expirations == 1
+    assert cache.statistics().size == 0
+
+
+def test_least_recently_used_session_is_evicted(cache: SessionCache):
+    cache.put("first", make_user(), cache.version)
+    cache.put("second", make_user(), cache.version)
+    cache.get("first")
+    cache.put("third", make_user(), cache.version)
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.statistics().evictions == 1
+
+
+def test_user_invalidation_removes_all_sessions(cache: SessionCache):
+    user: UserDetailed = make_user()
+    cache.put("first", user, cache.version)
+    cache.put("second", user, cache.version)
+
+    cache.invalidate_user(user.user_id)
+
+    assert cache.get("first") is None
+    assert cache.get("second") is None
+    assert cache.statistics().invalidations == 2
+
+
+def test_data_fetched_before_invalidation_is_not_cached(cache: SessionCache):
+    user: UserDetailed = make_user()
+    version: int = cache.version
+    cache.invalidate_session("session")
+
+    cache.put("session", user, version)
+
+    assert cache.get("session") is None
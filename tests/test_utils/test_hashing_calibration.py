@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+
+from demo_api.utils.hashing_calibration import MIN_ITERATIONS, calibrate_pbkdf2, write_iterations
+
+
+def test_iterations_are_written_into_config(tmp_path: Path):
+    config_path: Path = tmp_path / "config.toml"
+    config_path.write_text(
+        '[security]\npassword_hash_algorithm = "sha256"\npassword_hash_iterations = 500000\n'
+    )
+
+    write_iterations(config_path, 120000)
+
+    assert config_path.read_text() == (
+        '[security]\npassword_hash_algorithm = "sha256"\npassword_hash_iterations = 120000\n'
+    )
+
+
+def test_config_without_iterations_is_not_changed(tmp_path: Path):
+    config_path: Path = tmp_path / "config.toml"
+    config_path.write_text('[security]\npassword_hash_algorithm = "sha256"\n')
+
+    with pytest.raises(ValueError):
+        write_iterations(config_path, 120000)
+
+
+def test_calibrated_iterations_are_within_config_bounds():
+    result = calibrate_pbkdf2("sha256", target_latency_in_seconds=0.0001, probe_iterations=1000)
+
+    assert result.iterations == MIN_ITERATIONS
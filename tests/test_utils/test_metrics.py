@@ -0,0 +1,45 @@
+import pytest
+
+from demo_api.utils.metrics import MetricsRegistry, render_value
+
+
+def test_histogram_is_rendered_with_cumulative_buckets():
+    registry: MetricsRegistry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", upper_bounds=(0.1, 1)).labels()
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value)
+
+    assert registry.render() == (
+        "# HELP latency_seconds Latency\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{le="0.1"} 2\n'
+        'latency_seconds_bucket{le="1"} 3\n'
+        'latency_seconds_bucket{le="+Inf"} 4\n'
+        "latency_seconds_sum 3.65\n"
+        "latency_seconds_count 4\n"
+    )
+
+
+def test_labels_are_escaped_and_reused():
+    registry: MetricsRegistry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", label_names=("route",))
+    requests.labels('/a"b\\').inc()
+    requests.labels('/a"b\\').inc(2)
+
+    assert 'requests_total{route="/a\\"b\\\\"} 3\n' in registry.render()
+    with pytest.raises(ValueError):
+        requests.labels()
+
+
+def test_metric_names_are_unique():
+    registry: MetricsRegistry = MetricsRegistry()
+    registry.gauge("size", "Size")
+
+    with pytest.raises(ValueError):
+        registry.counter("size", "Size")
+
+
+def test_value_is_rendered_without_labels():
+    assert render_value("ratio", "gauge", "Hit ratio", 0.25) == (
+        "# HELP ratio Hit ratio\n# TYPE ratio gauge\nratio 0.25\n"
+    )